@@ -0,0 +1,80 @@
+"""
+Throughput, latency and memory benchmarks of the client against the bundled
+mock server. Nothing leaves the machine and no credentials are needed.
+
+    $ python benchmarks/bench_client.py --latency 0.01 --requests 500
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from pycodechef import Codechef, Instrumentation  # noqa: E402
+from pycodechef.mock_server import MockServer  # noqa: E402
+
+
+def percentile(values, q):
+    values = sorted(values)
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def run(name, fn, metrics):
+    tracemalloc.start()
+    start = time.perf_counter()
+    count = fn()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    latencies = metrics.pop('latencies')
+    print('{:<28} {:>7} req {:>9.1f} req/s  p50 {:>7.2f} ms  p99 {:>7.2f} ms  peak {:>8.1f} KiB  ({} items)'.format(
+        name, len(latencies), len(latencies) / elapsed, percentile(latencies, 0.5) * 1000,
+        percentile(latencies, 0.99) * 1000, peak / 1024.0, count))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--latency', type=float, default=0.005, help='server latency in seconds')
+    parser.add_argument('--requests', type=int, default=300, help='requests for the single call benchmark')
+    parser.add_argument('--ranklist-size', type=int, default=20000)
+    parser.add_argument('--bulk', type=int, default=1000, help='handles for the bulk benchmark')
+    parser.add_argument('--workers', type=int, default=16)
+    args = parser.parse_args(argv)
+
+    collected = {'latencies': []}
+    instrumentation = Instrumentation()
+    instrumentation.add_hook(after=lambda info: collected['latencies'].append(info.elapsed))
+
+    def measure(name, fn):
+        collected['latencies'] = []
+        run(name, fn, collected)
+
+    with MockServer(latency=args.latency, ranklist_size=args.ranklist_size) as server:
+        client = Codechef('bench', 'bench', base_url=server.url, pool_maxsize=args.workers,
+                          instrumentation=instrumentation, coalesce=False)
+        client.auth.token()
+
+        def single():
+            for i in range(args.requests):
+                client.get_user('user{}'.format(i))
+            return args.requests
+
+        def scan():
+            return sum(1 for _ in client.iter_rankings('CON100', prefetch=4))
+
+        def bulk():
+            handles = ['user{}'.format(i) for i in range(args.bulk)]
+            return len(client.get_users(handles, max_workers=args.workers))
+
+        measure('single get_user', single)
+        measure('paginated iter_rankings', scan)
+        measure('bulk get_users', bulk)
+        client.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -4,4 +4,22 @@ __author__ = 'Arpit Choudhary'
 __license__ = 'MIT'
 __copyright__ = 'Copyright 2018 Arpit Choudhary'
 
-from .client import Codechef
+from .client import Codechef, make_session
+from .aio import AsyncCodechef
+from .exceptions import CodechefError, APIError, AuthenticationError, CircuitOpenError, MalformedResponseError, PollTimeoutError, RateLimitError
+from .cache import CachePolicy, MemoryCache, SQLiteCache
+from .ratelimit import RateLimiter
+from .resilience import CircuitBreaker, Hedger
+from .bulk import BulkResult
+from .models import ContestSummary, RankingRow, RankingTable, RatingRow, RatingTable, UserProfile
+from .tracker import RanklistTracker
+from .ide import BatchRunner, RunJob
+from .instrumentation import Instrumentation, Metrics, SpanExporter
+from .problem_index import ProblemIndex
+from .sets import SetSyncResult
+from .todo import TodoSyncResult
+from .crawler import SubmissionCrawler
+from .warmup import ContestWarmup
+from .leaderboard import Leaderboard
+from .watch import UserChange, Watcher
+from . import cassette
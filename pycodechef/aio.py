@@ -0,0 +1,148 @@
+"""
+asyncio client mirroring the endpoint methods of Codechef
+"""
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from .client import Codechef
+
+
+ENDPOINTS = (
+    'get_contest_problem',
+    'get_contest_details',
+    'get_contest_list',
+    'get_country_list',
+    'run_code',
+    'get_status_code',
+    'get_institutions',
+    'get_languages',
+    'get_problems_by_category',
+    'get_problems_by_tags',
+    'get_rankings',
+    'get_ratings',
+    'add_set',
+    'delete_set',
+    'get_set_details',
+    'add_member_set',
+    'delete_member_set',
+    'get_member_set',
+    'update_set',
+    'get_submissions',
+    'get_submission_details',
+    'add_problem_todo',
+    'delete_todo_all',
+    'delete_problem_todo',
+    'get_todo_list',
+    'get_user_list',
+    'whoami',
+    'get_user',
+    'get_users',
+    'get_contest_problems',
+    'get_submission_details_many',
+    'sync_set',
+    'sync_sets',
+    'sync_todo',
+    'add_todo_many',
+    'delete_todo_many',
+)
+
+READ_PREFIXES = ('get_', 'whoami')
+
+
+class AsyncCodechef(object):
+    '''
+    Awaitable counterpart of Codechef.
+
+    Requests run on a bounded worker pool sharing one pooled session, so up to
+    max_concurrency requests are in flight at once. Cancelling a pending call
+    drops it before it reaches the network.
+
+    Every method of ENDPOINTS is mirrored, bulk ones returning their whole
+    list (ordered=False is not supported). The iter_* generators are not.
+    '''
+
+    def __init__(self, client_id, client_secret, max_concurrency=100, coalesce=True, **kwargs):
+        '''
+        :param client_id: client_id is the string obtained from Codechef for the application
+        :param client_secret: client_secret is the string obtained from Codechef for the application
+        :param max_concurrency: Integer. Maximum number of requests in flight
+        :param coalesce: Boolean. Concurrent identical read calls share one request and one result
+        :param kwargs: passed on to Codechef, eg. session, timeout, max_retries
+        '''
+        kwargs.setdefault('pool_maxsize', max_concurrency)
+        kwargs.setdefault('coalesce', coalesce)
+        self.max_concurrency = max_concurrency
+        self.coalesce = coalesce
+        self.coalesced = 0
+        self._in_flight = {}
+        self.client = Codechef(client_id, client_secret, **kwargs)
+        self._executor = ThreadPoolExecutor(max_concurrency)
+        self._semaphore = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+    async def authenticate(self):
+        '''
+        acquires the OAuth token without blocking the event loop
+        '''
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self.client.auth.token)
+
+    async def close(self):
+        '''
+        closes the session and shuts the worker pool down
+        '''
+        self.client.close()
+        self._executor.shutdown(wait=False)
+
+    async def _call(self, name, *args, **kwargs):
+        '''
+        runs a Codechef method on the worker pool, sharing identical
+        in-flight read calls
+        :param name: String. Name of the Codechef method
+        '''
+        if not self.coalesce or not name.startswith(READ_PREFIXES):
+            return await self._run(name, args, kwargs)
+        key = repr((name, args, sorted(kwargs.items())))
+        entry = self._in_flight.get(key)
+        if entry is None:
+            entry = self._in_flight[key] = [asyncio.ensure_future(self._run(name, args, kwargs)), 0]
+            entry[0].add_done_callback(lambda task: self._in_flight.get(key) is entry and self._in_flight.pop(key))
+        else:
+            self.coalesced += 1
+        entry[1] += 1
+        try:
+            return await asyncio.shield(entry[0])
+        finally:
+            entry[1] -= 1
+            if not entry[1] and not entry[0].done():
+                # every caller was cancelled
+                entry[0].cancel()
+
+    async def _run(self, name, args, kwargs):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            method = getattr(self.client, name)
+            if kwargs.get('ordered') is False:
+                raise ValueError('ordered=False is not supported, await the whole list')
+            return await loop.run_in_executor(self._executor, functools.partial(method, *args, **kwargs))
+
+
+def _make_endpoint(name):
+    async def endpoint(self, *args, **kwargs):
+        return await self._call(name, *args, **kwargs)
+    endpoint.__name__ = name
+    endpoint.__qualname__ = 'AsyncCodechef.' + name
+    endpoint.__doc__ = getattr(Codechef, name).__doc__
+    return endpoint
+
+
+for _name in ENDPOINTS:
+    setattr(AsyncCodechef, _name, _make_endpoint(_name))
@@ -0,0 +1,167 @@
+"""
+OAuth token management
+"""
+import json
+import os
+import tempfile
+import threading
+import time
+
+from .exceptions import AuthenticationError
+
+
+TOKEN_URL = 'https://api.codechef.com/oauth/token'
+SCOPE = 'public set todo submission'
+
+
+class TokenManager(object):
+    '''
+    Thread-safe holder of the access token.
+
+    The token is fetched lazily on first use, refreshed shortly before it
+    expires, and optionally shared between processes through a json file.
+    '''
+
+    def __init__(self, session, client_id, client_secret, token_url=TOKEN_URL, scope=SCOPE, cache_path=None, refresh_margin=60, timeout=None):
+        '''
+        :param session: requests.Session or transport.Transport. Sends the token requests
+        :param client_id: String. client_id obtained from Codechef
+        :param client_secret: String. client_secret obtained from Codechef
+        :param token_url: String. OAuth token endpoint
+        :param scope: String. Space separated scopes requested
+        :param cache_path: String. File where tokens are shared between processes
+        :param refresh_margin: Integer. Seconds before expiry at which the token is refreshed
+        :param timeout: Float or (connect, read) tuple. Timeout of token requests
+        '''
+        self.session = session
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.token_url = token_url
+        self.scope = scope
+        self.cache_path = cache_path
+        self.refresh_margin = refresh_margin
+        self.timeout = timeout
+        self.access_token = None
+        self.refresh_token = None
+        self.expires_at = 0.0
+        self._lock = threading.RLock()
+
+    def _valid(self):
+        return self.access_token is not None and time.time() < self.expires_at - self.refresh_margin
+
+    def token(self):
+        '''
+        returns a valid access token, fetching or refreshing it when needed
+        '''
+        if self._valid():
+            return self.access_token
+        with self._lock:
+            if self._valid():
+                return self.access_token
+            if self._load() and self._valid():
+                return self.access_token
+            if self.refresh_token:
+                try:
+                    return self.refresh()
+                except AuthenticationError:
+                    pass
+            return self.fetch()
+
+    def set_token(self, access_token, refresh_token=None, expires_in=3600):
+        '''
+        installs an externally obtained token
+        '''
+        with self._lock:
+            self.access_token = access_token
+            self.refresh_token = refresh_token
+            self.expires_at = time.time() + expires_in
+
+    def fetch(self):
+        '''
+        requests a new token with the client_credentials grant
+        '''
+        return self._grant({
+            'grant_type': 'client_credentials',
+            'scope': self.scope,
+            'client_id': self.client_id,
+            'client_secret': self.client_secret,
+        })
+
+    def refresh(self):
+        '''
+        exchanges the refresh token for a new access token
+        '''
+        with self._lock:
+            if not self.refresh_token:
+                return self.fetch()
+            return self._grant({
+                'grant_type': 'refresh_token',
+                'refresh_token': self.refresh_token,
+                'client_id': self.client_id,
+                'client_secret': self.client_secret,
+            })
+
+    def invalidate(self, stale_token):
+        '''
+        refreshes after the api rejected stale_token. Concurrent callers
+        holding the same stale token share a single refresh.
+        :param stale_token: String. Token the api answered 401 to
+        '''
+        with self._lock:
+            if self.access_token != stale_token:
+                return self.access_token
+            self.expires_at = 0.0
+            try:
+                return self.refresh()
+            except AuthenticationError:
+                return self.fetch()
+
+    def _grant(self, payload):
+        headers = {
+            'content-Type': 'application/json',
+        }
+        response = self.session.request('POST', self.token_url, headers=headers, data=json.dumps(payload), timeout=self.timeout)
+        try:
+            body = response.json()
+        except ValueError:
+            body = None
+        if not isinstance(body, dict) or body.get('status') != 'OK':
+            raise AuthenticationError('{} grant failed'.format(payload['grant_type']), body)
+        data = body['result']['data']
+        self.set_token(data['access_token'], data.get('refresh_token'), int(data.get('expires_in', 3600)))
+        self._store()
+        return self.access_token
+
+    def _load(self):
+        if not self.cache_path:
+            return False
+        try:
+            with open(self.cache_path) as f:
+                entry = json.load(f).get(self.client_id)
+        except (IOError, OSError, ValueError):
+            return False
+        if not entry:
+            return False
+        self.access_token = entry['access_token']
+        self.refresh_token = entry.get('refresh_token')
+        self.expires_at = entry['expires_at']
+        return True
+
+    def _store(self):
+        if not self.cache_path:
+            return
+        try:
+            with open(self.cache_path) as f:
+                entries = json.load(f)
+        except (IOError, OSError, ValueError):
+            entries = {}
+        entries[self.client_id] = {
+            'access_token': self.access_token,
+            'refresh_token': self.refresh_token,
+            'expires_at': self.expires_at,
+        }
+        directory = os.path.dirname(os.path.abspath(self.cache_path))
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix='.token-')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(entries, f)
+        os.replace(tmp, self.cache_path)
@@ -0,0 +1,51 @@
+"""
+bulk fetching of many keys on a bounded worker pool
+"""
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from .exceptions import APIError
+
+
+BulkResult = namedtuple('BulkResult', ['key', 'result', 'error'])
+BulkResult.__doc__ = '''
+outcome of one key of a bulk call, error is the exception raised or None
+'''
+
+
+def _fetch_one(fetch, key):
+    try:
+        result = fetch(key)
+    except Exception as err:
+        return BulkResult(key, None, err)
+    if isinstance(result, dict) and result.get('status') == 'error':
+        return BulkResult(key, result, APIError('request for {!r} failed'.format(key), result))
+    return BulkResult(key, result, None)
+
+
+def fetch_many(fetch, keys, max_workers=8, ordered=True):
+    '''
+    calls fetch once per distinct key on a worker pool
+    :param fetch: Callable. Takes one key and returns its result
+    :param keys: Iterable. Keys to fetch, duplicates are fetched once
+    :param max_workers: Integer. Maximum number of requests in flight
+    :param ordered: Boolean. Return a list of BulkResult in input order, otherwise
+        a generator yielding them as they complete
+    '''
+    unique = list(OrderedDict.fromkeys(keys))
+    if ordered:
+        with ThreadPoolExecutor(max_workers) as executor:
+            return list(executor.map(lambda key: _fetch_one(fetch, key), unique))
+    return _as_completed(fetch, unique, max_workers)
+
+
+def _as_completed(fetch, keys, max_workers):
+    executor = ThreadPoolExecutor(max_workers)
+    futures = [executor.submit(_fetch_one, fetch, key) for key in keys]
+    try:
+        for future in as_completed(futures):
+            yield future.result()
+    finally:
+        for future in futures:
+            future.cancel()
+        executor.shutdown(wait=False)
@@ -0,0 +1,243 @@
+"""
+response cache used under Codechef._GET
+"""
+import json
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from urllib.parse import urlencode, urlsplit
+
+
+def cache_key(url, params=None):
+    '''
+    builds a cache key from url and normalized query parameters
+    :param url: String. endpoint url
+    :param params: query parameters given
+    '''
+    if not params:
+        return url
+    if isinstance(params, dict):
+        params = params.items()
+    return url + '?' + urlencode(sorted((str(k), str(v)) for k, v in params))
+
+
+def scope_prefix(url):
+    '''
+    returns the url prefix of the resource family a url belongs to, eg.
+    https://api.codechef.com/sets/members/add -> https://api.codechef.com/sets/
+    :param url: String. endpoint url
+    '''
+    parts = urlsplit(url)
+    segment = parts.path.lstrip('/').split('/', 1)[0]
+    return '{}://{}/{}/'.format(parts.scheme, parts.netloc, segment)
+
+
+def contest_ttl(response):
+    '''
+    long ttl for contests that have ended, short one otherwise
+    :param response: Dict. get_contest_details response
+    '''
+    try:
+        end = response['result']['data']['content']['endDate']
+        ended = datetime.strptime(end, '%Y-%m-%d %H:%M:%S') < datetime.now()
+    except (KeyError, TypeError, ValueError):
+        ended = False
+    return 86400 if ended else 60
+
+
+DEFAULT_TTLS = (
+    (r'^/country', 86400),
+    (r'^/language', 86400),
+    (r'^/institution', 86400),
+    (r'^/contests/[^/]+/problems/', 3600),
+    (r'^/contests/[^/]+$', contest_ttl),
+)
+
+
+class CachePolicy(object):
+    '''
+    maps endpoint paths to a ttl in seconds
+    '''
+
+    def __init__(self, ttls=DEFAULT_TTLS, default=None):
+        '''
+        :param ttls: Iterable of (path regex, ttl) pairs. ttl is seconds or a callable taking the response. First match wins
+        :param default: Integer. ttl for paths matching no rule, None to not cache them
+        '''
+        self.rules = [(re.compile(pattern), ttl) for pattern, ttl in ttls]
+        self.default = default
+
+    def ttl(self, url, response):
+        '''
+        ttl for a response, None if it must not be cached
+        :param url: String. endpoint url
+        :param response: Dict. decoded response
+        '''
+        if not isinstance(response, dict) or response.get('status') != 'OK':
+            return None
+        path = urlsplit(url).path
+        for pattern, ttl in self.rules:
+            if pattern.search(path):
+                return ttl(response) if callable(ttl) else ttl
+        return self.default
+
+
+class BaseCache(object):
+    '''
+    interface of cache backends, keeps hit/miss statistics
+    '''
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        raise NotImplementedError
+
+    def get_stale(self, key):
+        '''
+        value of key even if it has expired, None if it is not cached.
+        Expired entries are kept until evicted so they can be served stale
+        '''
+        return None
+
+    def set(self, key, value, ttl):
+        raise NotImplementedError
+
+    def invalidate(self, prefix):
+        '''
+        drops every entry whose key starts with prefix
+        '''
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def stats(self):
+        '''
+        returns hit/miss statistics
+        '''
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_ratio': float(self.hits) / total if total else 0.0,
+            'size': len(self),
+        }
+
+
+class MemoryCache(BaseCache):
+    '''
+    in-memory LRU cache with per-entry expiry. Cached responses are shared
+    between callers and should be treated as read-only.
+    '''
+
+    def __init__(self, maxsize=1024):
+        '''
+        :param maxsize: Integer. Maximum number of entries kept
+        '''
+        super(MemoryCache, self).__init__()
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] < time.time():
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def get_stale(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            return None if entry is None else entry[1]
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._data[key] = (time.time() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, prefix):
+        with self._lock:
+            for key in [k for k in self._data if k.startswith(prefix)]:
+                del self._data[key]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class SQLiteCache(BaseCache):
+    '''
+    on-disk cache backed by sqlite, entries survive restarts
+    '''
+
+    def __init__(self, path, maxsize=100000):
+        '''
+        :param path: String. Path of the sqlite database file
+        :param maxsize: Integer. Maximum number of entries kept, least recently used are evicted
+        '''
+        super(SQLiteCache, self).__init__()
+        self.path = path
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute('CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value TEXT, expires REAL, accessed REAL)')
+            self._conn.execute('CREATE INDEX IF NOT EXISTS cache_accessed ON cache (accessed)')
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM cache').fetchone()[0]
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute('SELECT value, expires FROM cache WHERE key = ?', (key,)).fetchone()
+            if row is None or row[1] < now:
+                self.misses += 1
+                return None
+            with self._conn:
+                self._conn.execute('UPDATE cache SET accessed = ? WHERE key = ?', (now, key))
+            self.hits += 1
+        return json.loads(row[0])
+
+    def get_stale(self, key):
+        with self._lock:
+            row = self._conn.execute('SELECT value FROM cache WHERE key = ?', (key,)).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def set(self, key, value, ttl):
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute('INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?)', (key, json.dumps(value), now + ttl, now))
+            excess = self._conn.execute('SELECT COUNT(*) FROM cache').fetchone()[0] - self.maxsize
+            if excess > 0:
+                self._conn.execute('DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY accessed LIMIT ?)', (excess,))
+                self.evictions += excess
+
+    def invalidate(self, prefix):
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM cache WHERE substr(key, 1, ?) = ?', (len(prefix), prefix))
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM cache')
+
+    def close(self):
+        self._conn.close()
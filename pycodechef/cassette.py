@@ -0,0 +1,202 @@
+"""
+record and replay of http traffic for deterministic offline runs.
+
+A cassette is two files: path holds the recorded responses back to back and
+path + '.idx' maps each request key to the offset and length of its
+responses. Replay memory-maps the data file, so only the index is loaded.
+Token grants are recorded with their tokens redacted and replay whatever
+the credentials, so a cassette holds no secret and CI needs none.
+
+    c = Codechef(id, secret, adapter=cassette.record('run.cassette'))
+    c = Codechef(id, secret, adapter=cassette.replay('run.cassette'))
+"""
+import hashlib
+import json
+import mmap
+import os
+import threading
+import time
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.models import Response
+from requests.structures import CaseInsensitiveDict
+
+from .exceptions import CodechefError
+
+
+TOKEN_PATH = '/oauth/token'
+SECRET_FIELDS = ('access_token', 'refresh_token')
+REDACTED = 'redacted'
+
+
+class CassetteMiss(CodechefError):
+    '''
+    replayed request was never recorded
+    '''
+
+
+def request_key(method, url, body=None):
+    '''
+    identity of a request: verb, path with sorted query and a digest of the
+    body. The host is left out so a cassette replays against any base_url.
+    Token grants are keyed on their path only, their body holds the
+    credentials and a cassette must replay with any of them
+    :param method: String. HTTP verb
+    :param url: String. Full url
+    :param body: Bytes or String. Request body
+    '''
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    key = '{} {}'.format(method, urlunsplit(('', '', parts.path, query, '')))
+    if body and not parts.path.endswith(TOKEN_PATH):
+        if not isinstance(body, bytes):
+            body = body.encode('utf-8')
+        key += ' ' + hashlib.sha1(body).hexdigest()
+    return key
+
+
+def redact(body):
+    '''
+    token response body with the values of SECRET_FIELDS replaced, so no
+    live token is written to a cassette
+    :param body: Bytes. Response body
+    '''
+    def scrub(value):
+        if isinstance(value, dict):
+            return dict((k, REDACTED if k in SECRET_FIELDS and v else scrub(v)) for k, v in value.items())
+        if isinstance(value, list):
+            return [scrub(v) for v in value]
+        return value
+    try:
+        content = json.loads(body.decode('utf-8'))
+    except ValueError:
+        return body
+    return json.dumps(scrub(content)).encode('utf-8')
+
+
+class Recorder(BaseAdapter):
+    '''
+    adapter sending requests through another adapter and appending every
+    response to a cassette
+    '''
+
+    def __init__(self, path, adapter=None):
+        '''
+        :param path: String. Cassette path, appended to if it exists
+        :param adapter: requests adapter that sends the requests, defaults to HTTPAdapter()
+        '''
+        super(Recorder, self).__init__()
+        self.path = path
+        self.adapter = adapter or HTTPAdapter()
+        self._data = open(path, 'ab')
+        self._index = open(path + '.idx', 'a')
+        self._lock = threading.Lock()
+
+    def send(self, request, **kwargs):
+        start = time.time()
+        response = self.adapter.send(request, **kwargs)
+        body = response.content
+        if urlsplit(request.url).path.endswith(TOKEN_PATH):
+            body = redact(body)
+        header = json.dumps({
+            'status': response.status_code,
+            'reason': response.reason,
+            'headers': dict(response.headers),
+            'elapsed': time.time() - start,
+        }, separators=(',', ':')).encode('utf-8')
+        record = header + b'\n' + body
+        key = request_key(request.method, request.url, request.body)
+        with self._lock:
+            offset = self._data.tell()
+            self._data.write(record)
+            self._data.flush()
+            self._index.write('{}\t{}\t{}\n'.format(key, offset, len(record)))
+            self._index.flush()
+        return response
+
+    def close(self):
+        self.adapter.close()
+        self._data.close()
+        self._index.close()
+
+
+class Player(BaseAdapter):
+    '''
+    adapter answering requests from a cassette. Requests recorded several
+    times (eg. ide status polls) replay their responses in order, then repeat
+    the last one
+    '''
+
+    def __init__(self, path, simulate_latency=False):
+        '''
+        :param path: String. Cassette path
+        :param simulate_latency: Boolean. Sleep as long as the original request took
+        '''
+        super(Player, self).__init__()
+        self.path = path
+        self.simulate_latency = simulate_latency
+        self.index = {}
+        self._positions = {}
+        self._lock = threading.Lock()
+        with open(path + '.idx') as f:
+            for line in f:
+                key, offset, length = line.rstrip('\n').rsplit('\t', 2)
+                self.index.setdefault(key, []).append((int(offset), int(length)))
+        self._file = open(path, 'rb')
+        size = os.fstat(self._file.fileno()).st_size
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
+
+    def __len__(self):
+        return sum(len(entries) for entries in self.index.values())
+
+    def send(self, request, **kwargs):
+        key = request_key(request.method, request.url, request.body)
+        entries = self.index.get(key)
+        if not entries:
+            raise CassetteMiss('not recorded: ' + key)
+        with self._lock:
+            position = self._positions.get(key, 0)
+            self._positions[key] = min(position + 1, len(entries) - 1)
+        offset, length = entries[position]
+        record = self._map[offset:offset + length]
+        split = record.index(b'\n')
+        meta = json.loads(record[:split].decode('utf-8'))
+        if self.simulate_latency:
+            time.sleep(meta['elapsed'])
+
+        response = Response()
+        response.status_code = meta['status']
+        response.reason = meta['reason']
+        response.headers = CaseInsensitiveDict(meta['headers'])
+        response.headers.pop('Content-Encoding', None)
+        response._content = record[split + 1:]
+        response.url = request.url
+        response.request = request
+        response.encoding = 'utf-8'
+        return response
+
+    def close(self):
+        if self._file.closed:
+            return
+        if self._map:
+            self._map.close()
+        self._file.close()
+
+
+def record(path, adapter=None):
+    '''
+    adapter recording traffic to path, pass it as Codechef(adapter=...)
+    :param path: String. Cassette path
+    :param adapter: requests adapter that sends the requests
+    '''
+    return Recorder(path, adapter)
+
+
+def replay(path, simulate_latency=False):
+    '''
+    adapter replaying traffic from path, pass it as Codechef(adapter=...)
+    :param path: String. Cassette path
+    :param simulate_latency: Boolean. Sleep as long as the original request took
+    '''
+    return Player(path, simulate_latency)
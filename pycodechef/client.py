@@ -1,7 +1,62 @@
 """
 This is python wrapper for Codechef API v1.0.0
 """
+import threading
+import time
+from contextlib import contextmanager
+
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .auth import TokenManager
+from .bulk import fetch_many
+from .cache import CachePolicy, cache_key, scope_prefix
+from .decoders import get_decoder
+from .exceptions import APIError, CircuitOpenError, MalformedResponseError, RateLimitError
+from .pagination import paginate
+from .ratelimit import RateLimiter
+from .resilience import OPEN, CircuitBreaker, Hedger
+from .sets import sync_set, sync_sets
+from .singleflight import SingleFlight
+from .todo import add_todos, delete_todos, sync_todo
+from .transport import ACCEPT_ENCODING, HTTPXTransport, RequestsTransport
+
+
+BASE_URL = 'https://api.codechef.com'
+DEFAULT_TIMEOUT = (5, 30)
+IDEMPOTENT_METHODS = frozenset(['GET', 'HEAD', 'PUT', 'DELETE', 'OPTIONS'])
+RETRY_STATUSES = (500, 502, 503, 504)
+
+
+def make_session(pool_connections=10, pool_maxsize=10, max_retries=3, backoff_factor=0.3, adapter=None, status_forcelist=RETRY_STATUSES):
+    '''
+    builds a pooled keep-alive session for the api
+    :param pool_connections: Integer. Number of connection pools to cache
+    :param pool_maxsize: Integer. Maximum number of connections kept alive per pool
+    :param max_retries: Integer. Retries for idempotent verbs on connection errors and the statuses of status_forcelist
+    :param backoff_factor: Float. Backoff factor between retries
+    :param adapter: requests.adapters.HTTPAdapter. Mounted as is instead of building one
+    '''
+    if adapter is None:
+        retry_kwargs = {
+            'total': max_retries,
+            'connect': max_retries,
+            'read': max_retries,
+            'backoff_factor': backoff_factor,
+            'status_forcelist': status_forcelist,
+            'raise_on_status': False,
+        }
+        try:
+            retries = Retry(allowed_methods=IDEMPOTENT_METHODS, **retry_kwargs)
+        except TypeError:
+            # urllib3 < 1.26
+            retries = Retry(method_whitelist=IDEMPOTENT_METHODS, **retry_kwargs)
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=retries)
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
 
 
 class Codechef(object):
@@ -11,59 +66,303 @@ class Codechef(object):
 
     __attrs__ = ['client_id', 'client_secret', 'access_token']
 
-    def __init__(self, client_id, client_secret):
+    def __init__(self, client_id, client_secret, session=None, adapter=None, pool_connections=10, pool_maxsize=10, max_retries=3, timeout=DEFAULT_TIMEOUT, cache=None, cache_policy=None, rate_limiter=None, token_cache=None, coalesce=True, instrumentation=None, base_url=BASE_URL, decoder=None, response_format='json', transport=None, circuit_breaker=None, hedge=None):
         '''
         :param client_id: client_id is the string obtained from Codechef for the application
         :param client_secret: client_secret is the string obtained from Codechef for the application
+        :param session: requests.Session. Pre-built session to use instead of creating one. It is not closed by the client
+        :param adapter: requests.adapters.HTTPAdapter. Adapter to mount on the session created by the client
+        :param pool_connections: Integer. Number of connection pools to cache
+        :param pool_maxsize: Integer. Maximum number of keep-alive connections per pool
+        :param max_retries: Integer. Retries for idempotent verbs (GET, PUT, DELETE)
+        :param timeout: Float or (connect, read) tuple. Timeout applied to every request
+        :param cache: cache.BaseCache. Cache for GET responses, eg. MemoryCache() or SQLiteCache(path)
+        :param cache_policy: cache.CachePolicy. ttl per endpoint, defaults to caching rarely changing data only
+        :param rate_limiter: ratelimit.RateLimiter. Throttles requests per endpoint family, True for the default limits
+        :param token_cache: String. Path of a file sharing the access token between processes
+        :param coalesce: Boolean. Concurrent identical GETs share one request and one (read-only) result
+        :param instrumentation: instrumentation.Instrumentation. Hooks and exporters called around every request
+        :param base_url: String. Root of the api, eg. the url of a local mock server
+        :param decoder: String or Callable. json backend (orjson, ujson, json) or function decoding bytes, defaults to the fastest installed
+        :param response_format: String. json to decode responses, bytes or memoryview to return the undecoded body
+        :param transport: transport.Transport, 'requests' (default) or 'http2'. 'http2' multiplexes requests over one connection and needs httpx
+        :param circuit_breaker: resilience.CircuitBreaker. Fails fast on endpoints that keep failing, True for the defaults
+        :param hedge: resilience.Hedger. Duplicates GETs slower than a latency percentile, True for the defaults
         '''
         self.client_id = client_id
         self.client_secret = client_secret
-        headers = {
-            'content-Type': 'application/json',
-        }
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.cache = cache
+        self.cache_policy = cache_policy or CachePolicy()
+        self.rate_limiter = RateLimiter() if rate_limiter is True else rate_limiter
+        self.singleflight = SingleFlight() if coalesce else None
+        self.circuit_breaker = CircuitBreaker() if circuit_breaker is True else circuit_breaker
+        self.hedger = Hedger() if hedge is True else hedge
+        self.instrumentation = instrumentation
+        self.decoder = decoder if callable(decoder) else get_decoder(decoder)
+        if response_format not in ('json', 'bytes', 'memoryview'):
+            raise ValueError('response_format must be json, bytes or memoryview')
+        self.response_format = response_format
+        self.session = None
+        if transport is None or transport == 'requests':
+            self._owns_transport = session is None
+            if session is None:
+                # the rate limiter retries 5xx itself, retrying them in urllib3 too would multiply the attempts
+                status_forcelist = () if self.rate_limiter is not None else RETRY_STATUSES
+                session = make_session(pool_connections, pool_maxsize, max_retries, adapter=adapter, status_forcelist=status_forcelist)
+            self.session = session
+            transport = RequestsTransport(session)
+        elif transport == 'http2':
+            self._owns_transport = True
+            transport = HTTPXTransport(True, pool_maxsize, max_retries)
+        elif isinstance(transport, str):
+            raise ValueError('transport must be requests, http2 or a Transport')
+        else:
+            self._owns_transport = False
+        self.transport = transport
+        self.auth = TokenManager(transport, client_id, client_secret, self.base_url + '/oauth/token', cache_path=token_cache, timeout=timeout)
+        self._local = threading.local()
 
-        data = '{{"grant_type":"client_credentials" , "scope":"public set todo submission", "client_id":"{}","client_secret":"{}"}}'.format(client_id, client_secret)
+    @property
+    def access_token(self):
+        '''
+        valid access token, fetched on first use and refreshed before expiry
+        '''
+        return self.auth.token()
 
-        response = requests.post('https://api.codechef.com/oauth/token', headers=headers, data=data)
-        response = response.json()
+    @access_token.setter
+    def access_token(self, value):
+        self.auth.set_token(value)
 
-        if response['status'] == "OK":
-            # print('Fetching access token...')
-            self.access_token = response['result']['data']['access_token']
-        else:
-            print('Error', response)
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        '''
+        closes the underlying transport if it was created by the client
+        '''
+        if self._owns_transport:
+            self.transport.close()
+        if self.hedger is not None:
+            self.hedger.close()
+
+    @contextmanager
+    def fresh(self):
+        '''
+        GETs made by the current thread inside the block skip the cache read and
+        store their response, so cached entries are refreshed while other
+        threads keep being served the old ones
+        '''
+        previous = getattr(self._local, 'fresh', False)
+        self._local.fresh = True
+        try:
+            yield self
+        finally:
+            self._local.fresh = previous
+
+    def stream(self, url, params=None, chunk_size=65536):
+        '''
+        GETs a url and yields its body in chunks without buffering it, eg. to
+        write a large page straight to disk. Bypasses the cache, coalescing and the rate limiter
+        :param url: String. endpoint url, or path relative to base_url eg. /rankings/COOK99
+        :param params: query parameters given
+        :param chunk_size: Integer. Bytes per chunk
+        '''
+        if url.startswith('/'):
+            url = self.base_url + url
+        response = self._send('GET', url, params, stream=True)
+        try:
+            if response.status_code >= 400:
+                raise APIError('GET {} failed with {}'.format(url, response.status_code), response.content[:200])
+            for chunk in response.iter_content(chunk_size):
+                yield chunk
+        finally:
+            response.close()
 
     def _refresh(self):
         '''
         refreshes access_token
-        currently not tested if it works
         '''
-        headers = {
-            'content-Type': 'application/json',
-        }
-        data = '{{"grant_type":"refresh_token" , "refresh_token":"{}", "client_id":"{}","client_secret":"{}"}}'.format(self.access_token, self.client_id, self.client_secret)
-        response = requests.post('https://api.codechef.com/oauth/token', headers=headers, data=data)
+        return self.auth.refresh()
 
-    def _GET(self, url, params=None):
+    def _send(self, method, url, params=None, data=None, info=None, stream=False):
         '''
-        fetch from api
+        sends a request through the transport and returns the raw response
+        :param method: String. HTTP verb
         :param url: String. endpoint to fetch
         :param params: query parameters given
+        :param data: form data given
+        :param info: instrumentation.RequestInfo. Updated with attempts and retries when given
+        :param stream: Boolean. Leave the body unread
         '''
-        token = "Bearer {}".format(self.access_token)
+        access_token = self.auth.token()
         headers = {
             'Accept': 'application/json',
-            'Authorization': token,
+            'Accept-Encoding': ACCEPT_ENCODING,
+            'Authorization': "Bearer {}".format(access_token),
         }
-        if params:
-            response = requests.get(url, headers=headers, params=params)
-        else:
-            response = requests.get(url, headers=headers)
+        response = self.transport.request(method, url, params, data, headers, self.timeout, stream)
+        if response.status_code == 401:
+            response.close()
+            headers['Authorization'] = "Bearer {}".format(self.auth.invalidate(access_token))
+            response = self.transport.request(method, url, params, data, headers, self.timeout, stream)
+            if info is not None:
+                info.retries += 1
+        if info is not None:
+            info.attempts += 1
+            retries = getattr(getattr(response, 'raw', None), 'retries', None)
+            if retries is not None:
+                info.retries += len(retries.history)
+        return response
 
+    def _request(self, method, url, params=None, data=None):
+        '''
+        sends a request within the rate limits and decodes the response
+        :param method: String. HTTP verb
+        :param url: String. endpoint to fetch
+        :param params: query parameters given
+        :param data: form data given
+        '''
+        info = None
+        if self.instrumentation is not None:
+            info = self.instrumentation.start(method, url)
         try:
-            return response.json()
+            try:
+                response = self._transmit(method, url, params, data, info)
+            except RateLimitError as err:
+                err.response = self._throttled_body(err.response)
+                raise
+            if self.cache is not None and method != 'GET':
+                self.cache.invalidate(scope_prefix(url))
+            return self._decode(response, info)
+        except Exception as err:
+            if info is not None:
+                info.error = err
+            raise
+        finally:
+            if info is not None:
+                info.retries += max(info.attempts - 1, 0)
+                self.instrumentation.finish(info)
+
+    def _transmit(self, method, url, params=None, data=None, info=None):
+        '''
+        sends a request through the circuit breaker, rate limiter and hedger and returns the raw response
+        :param method: String. HTTP verb
+        :param url: String. endpoint to fetch
+        :param params: query parameters given
+        :param data: form data given
+        :param info: instrumentation.RequestInfo. Updated with the circuit state and hedging when given
+        '''
+        def send():
+            if self.rate_limiter is None:
+                return self._send(method, url, params, data, info)
+            return self.rate_limiter.call(url, lambda: self._send(method, url, params, data, info), method in IDEMPOTENT_METHODS)
+
+        breaker = self.circuit_breaker
+        if breaker is not None:
+            try:
+                state = breaker.before(url)
+            except CircuitOpenError:
+                state = OPEN
+                raise
+            finally:
+                if info is not None:
+                    info.circuit = state
+        try:
+            if self.hedger is not None and method == 'GET':
+                response, hedged = self.hedger.call(url, send)
+                if info is not None:
+                    info.hedged = hedged
+            else:
+                response = send()
+        except Exception:
+            if breaker is not None:
+                breaker.record(url, False)
+            raise
+        if breaker is not None:
+            breaker.record(url, response.status_code < 500)
+        return response
+
+    def _throttled_body(self, response):
+        '''
+        decoded body of the last throttled response, its first bytes when it is not json
+        '''
+        try:
+            return self._decode(response)
+        except MalformedResponseError as err:
+            return err.response
+
+    def _decode(self, response, info=None):
+        '''
+        decodes a response body, or returns it undecoded in bytes/memoryview format
+        :param response: requests.Response
+        :param info: instrumentation.RequestInfo. Updated with status, size and decode time when given
+        '''
+        content = response.content
+        if info is not None:
+            info.status = response.status_code
+            info.bytes = len(content)
+        if self.response_format == 'bytes':
+            return content
+        if self.response_format == 'memoryview':
+            return memoryview(content)
+        start = time.perf_counter() if info is not None else None
+        try:
+            return self.decoder(content)
         except ValueError as err:
-            return {'success': False, 'error': err}
+            raise MalformedResponseError('invalid json in {} response: {}'.format(response.status_code, err), content[:200], response.status_code)
+        finally:
+            if info is not None:
+                info.decode_time = time.perf_counter() - start
+
+    def _GET(self, url, params=None):
+        '''
+        fetch from api
+        :param url: String. endpoint to fetch
+        :param params: query parameters given
+        '''
+        key = cache_key(url, params)
+        if self.cache is not None and not getattr(self._local, 'fresh', False):
+            response = self.cache.get(key)
+            if response is not None:
+                if self.instrumentation is not None:
+                    info = self.instrumentation.start('GET', url)
+                    info.cache_hit = True
+                    self.instrumentation.finish(info)
+                return response
+        try:
+            if self.singleflight is None:
+                return self._fetch(key, url, params)
+            return self.singleflight.do(key, lambda: self._fetch(key, url, params))
+        except CircuitOpenError:
+            if self.cache is None or not self.circuit_breaker.stale_fallback:
+                raise
+            response = self.cache.get_stale(key)
+            if response is None:
+                raise
+            if self.instrumentation is not None:
+                info = self.instrumentation.start('GET', url)
+                info.cache_hit = info.stale = True
+                self.instrumentation.finish(info)
+            return response
+
+    def _fetch(self, key, url, params):
+        '''
+        GETs from api and stores the response in the cache
+        :param key: String. cache key of the request
+        :param url: String. endpoint to fetch
+        :param params: query parameters given
+        '''
+        response = self._request('GET', url, params)
+        if self.cache is not None:
+            ttl = self.cache_policy.ttl(url, response)
+            if ttl:
+                self.cache.set(key, response, ttl)
+        return response
 
     def _POST(self, url, params=None, data=None):
         '''
@@ -71,24 +370,7 @@ class Codechef(object):
         :param url: String. endpoint to fetch
         :param params: query parameters given
         '''
-        token = "Bearer {}".format(self.access_token)
-        headers = {
-            'Accept': 'application/json',
-            'Authorization': token,
-        }
-        if params and data:
-            response = requests.post(url, headers=headers, params=params, data=data)
-        elif params:
-            response = requests.post(url, headers=headers, params=params)
-        elif data:
-            response = requests.post(url, headers=headers, data=data)
-        else:
-            response = requests.post(url, headers=headers)
-
-        try:
-            return response.json()
-        except ValueError as err:
-            return {'success': False, 'error': err}
+        return self._request('POST', url, params, data)
 
     def _DELETE(self, url, params=None):
         '''
@@ -96,20 +378,7 @@ class Codechef(object):
         :param url: String. endpoint to fetch
         :param params: query parameters given
         '''
-        token = "Bearer {}".format(self.access_token)
-        headers = {
-            'Accept': 'application/json',
-            'Authorization': token,
-        }
-        if params:
-            response = requests.delete(url, headers=headers, params=params)
-        else:
-            response = requests.delete(url, headers=headers)
-
-        try:
-            return response.json()
-        except ValueError as err:
-            return {'success': False, 'error': err}
+        return self._request('DELETE', url, params)
 
     def _PUT(self, url, params=None, data=None):
         '''
@@ -117,24 +386,7 @@ class Codechef(object):
         :param url: String. endpoint to fetch
         :param params: query parameters given
         '''
-        token = "Bearer {}".format(self.access_token)
-        headers = {
-            'Accept': 'application/json',
-            'Authorization': token,
-        }
-        if params and data:
-            response = requests.put(url, headers=headers, params=params, data=data)
-        elif params:
-            response = requests.put(url, headers=headers, params=params)
-        elif data:
-            response = requests.put(url, headers=headers, data=data)
-        else:
-            response = requests.put(url, headers=headers)
-
-        try:
-            return response.json()
-        except ValueError as err:
-            return {'success': False, 'error': err}
+        return self._request('PUT', url, params, data)
 
     def get_contest_problem(self, contest_code, problem_code):
         '''
@@ -142,11 +394,26 @@ class Codechef(object):
         :param contest_code: String. Contest code of the problem.
         :param problem_code: String. Problem code of the problem
         '''
-        path = 'https://api.codechef.com/contests/' + contest_code + '/problems/' + problem_code
+        path = self.base_url + '/contests/' + contest_code + '/problems/' + problem_code
         response = self._GET(path)
 
         return response
 
+    def get_contest_problems(self, contest_code, problem_codes=None, max_workers=8, ordered=True):
+        '''
+        get information about many problems of a contest concurrently
+        :param contest_code: String. Contest code of the problems.
+        :param problem_codes: Iterable. Problem codes, defaults to every problem in the contest's problemsList
+        :param max_workers: Integer. Maximum number of requests in flight
+        :param ordered: Boolean. Return a list of BulkResult in input order, otherwise yield them as they complete
+        '''
+        if problem_codes is None:
+            details = self.get_contest_details(contest_code, ['problemsList'])
+            if details.get('status') != 'OK':
+                raise APIError('could not list problems of ' + contest_code, details)
+            problem_codes = [p['problemCode'] for p in details['result']['data']['content']['problemsList']]
+        return fetch_many(lambda code: self.get_contest_problem(contest_code, code), problem_codes, max_workers, ordered)
+
     def get_contest_details(self, contest_code, fields=[], sortBy='successfulSubmissions', sortOrder='desc'):
         '''
         get information about a contest
@@ -155,7 +422,7 @@ class Codechef(object):
         :param sortBy: String. Possible fields are: problemName, problemCode, successfulSubmissions, accuracy.
         :param sortOrder: String. Possible fields are: asc or desc.
         '''
-        url = 'https://api.codechef.com/contests/' + contest_code
+        url = self.base_url + '/contests/' + contest_code
         params = (
             ('fields', ','.join(fields)),
             ('sortBy', sortBy),
@@ -175,7 +442,7 @@ class Codechef(object):
         :param sortBy: String. Possible fields are: name, startDate, endDate.
         :param sortOrder: String. Possible fields are: asc, desc
         '''
-        url = 'https://api.codechef.com/contests/'
+        url = self.base_url + '/contests/'
         params = (
             ('fields', ','.join(fields)),
             ('status', status),
@@ -188,6 +455,22 @@ class Codechef(object):
 
         return response
 
+    def iter_contest_list(self, fields=[], status='', sortBy='startDate', sortOrder='desc', page_size=100, prefetch=2, model=None):
+        '''
+        iterate over all contests, fetching pages ahead
+        :param fields: List. Same as get_contest_list
+        :param status: String. Possible values: past, present, future
+        :param sortBy: String. Possible fields are: name, startDate, endDate.
+        :param sortOrder: String. Possible fields are: asc, desc
+        :param page_size: Integer. Contests per request (max 100)
+        :param prefetch: Integer. Number of pages fetched ahead
+        :param model: models.Record subclass, eg. models.ContestSummary. Yields typed records instead of dicts
+        '''
+        def fetch(offset, limit):
+            return self.get_contest_list(fields, status, offset, limit, sortBy, sortOrder)
+        records = paginate(fetch, min(page_size, 100), prefetch, key='contestList')
+        return records if model is None else map(model.from_dict, records)
+
     def get_country_list(self, search='', offset=0, limit=10):
         '''
         get country list
@@ -195,7 +478,7 @@ class Codechef(object):
         :param offset: Integer. Starting index of the list eg.4
         :param limit: Integer. Number of countries in a list(max 100), e.g. 10
         '''
-        url = 'https://api.codechef.com/country'
+        url = self.base_url + '/country'
         params = (
             ('search', search),
             ('offset', offset),
@@ -205,6 +488,17 @@ class Codechef(object):
 
         return response
 
+    def iter_country_list(self, search='', page_size=100, prefetch=2):
+        '''
+        iterate over all countries, fetching pages ahead
+        :param search: String. Search string for country by prefix
+        :param page_size: Integer. Countries per request (max 100)
+        :param prefetch: Integer. Number of pages fetched ahead
+        '''
+        def fetch(offset, limit):
+            return self.get_country_list(search, offset, limit)
+        return paginate(fetch, min(page_size, 100), prefetch)
+
     def run_code(self, source_code, language, sample_input):
         '''
         takes input, language and source code and runs on codechef ide
@@ -212,7 +506,7 @@ class Codechef(object):
         :param language: String. language of submission
         :param input: String. input of submission
         '''
-        url = 'https://api.codechef.com/ide/run'
+        url = self.base_url + '/ide/run'
         params = (
             ('sourceCode', source_code),
             ('language', language),
@@ -227,7 +521,7 @@ class Codechef(object):
         get status of submitted code
         :param link: String. Enter status code recieved after code execution. eg. VGQUp0
         '''
-        url = 'https://api.codechef.com/ide/status'
+        url = self.base_url + '/ide/status'
         params = (
             ('link', link),
         )
@@ -242,7 +536,7 @@ class Codechef(object):
         :param offset: Integer. Starting index of list
         :param limit: Integer. Number of entities to be fetched, max 100
         '''
-        url = 'https://api.codechef.com/institution'
+        url = self.base_url + '/institution'
         params = (
             ('search', search),
             ('offset', offset),
@@ -252,6 +546,17 @@ class Codechef(object):
 
         return response
 
+    def iter_institutions(self, search, page_size=100, prefetch=2):
+        '''
+        iterate over all institutions matching search, fetching pages ahead
+        :param search: String. Search string for institution. eg. jaypee
+        :param page_size: Integer. Institutions per request (max 100)
+        :param prefetch: Integer. Number of pages fetched ahead
+        '''
+        def fetch(offset, limit):
+            return self.get_institutions(search, offset, limit)
+        return paginate(fetch, min(page_size, 100), prefetch)
+
     def get_languages(self, search='', offset=0, limit=10):
         '''
         get list of languages on codechef
@@ -259,7 +564,7 @@ class Codechef(object):
         :param offset: Integer. Starting index of list
         :param limit: Integer. Number of languages to be fetched, max 100
         '''
-        url = 'https://api.codechef.com/language'
+        url = self.base_url + '/language'
         params = (
             ('search', search),
             ('offset', offset),
@@ -269,6 +574,17 @@ class Codechef(object):
 
         return response
 
+    def iter_languages(self, search='', page_size=100, prefetch=2):
+        '''
+        iterate over all languages, fetching pages ahead
+        :param search: String. Search string for language. eg. c
+        :param page_size: Integer. Languages per request (max 100)
+        :param prefetch: Integer. Number of pages fetched ahead
+        '''
+        def fetch(offset, limit):
+            return self.get_languages(search, offset, limit)
+        return paginate(fetch, min(page_size, 100), prefetch)
+
     def get_problems_by_category(self, category_name, fields=[], offset=0, limit=10, sortBy='successfulSubmissions', sortOrder='asc'):
         '''
         get list of problems by category name provided
@@ -279,7 +595,7 @@ class Codechef(object):
         :param sortBy: String. Possible fields are: problemCode, problemName, successfulSubmissions, accuracy.
         :param sortOrder: String. Possible fields are: asc, desc
         '''
-        url = 'https://api.codechef.com/problems/' + category_name
+        url = self.base_url + '/problems/' + category_name
         params = (
             ('fields', ','.join(fields)),
             ('offset', offset),
@@ -291,6 +607,20 @@ class Codechef(object):
 
         return response
 
+    def iter_problems_by_category(self, category_name, fields=[], sortBy='successfulSubmissions', sortOrder='asc', page_size=100, prefetch=2):
+        '''
+        iterate over all problems of a category, fetching pages ahead
+        :param category_name: String. Possible categories are: school, easy, medium, hard, challenge, extcontest
+        :param fields: List. Same as get_problems_by_category
+        :param sortBy: String. Possible fields are: problemCode, problemName, successfulSubmissions, accuracy.
+        :param sortOrder: String. Possible fields are: asc, desc
+        :param page_size: Integer. Problems per request (max 100)
+        :param prefetch: Integer. Number of pages fetched ahead
+        '''
+        def fetch(offset, limit):
+            return self.get_problems_by_category(category_name, fields, offset, limit, sortBy, sortOrder)
+        return paginate(fetch, min(page_size, 100), prefetch)
+
     def get_problems_by_tags(self, tags=[], fields=[], limit=10, offset=0):
         '''
         get problems by given tags
@@ -299,7 +629,7 @@ class Codechef(object):
         :param limit: Integer. Limit of list(max 20)
         :param offset: Integer. Starting index of list
         '''
-        url = 'https://api.codechef.com/tags/problems'
+        url = self.base_url + '/tags/problems'
         params = (
             ('filter', ','.join(tags)),
             ('fields', ','.join(fields)),
@@ -310,6 +640,18 @@ class Codechef(object):
 
         return response
 
+    def iter_problems_by_tags(self, tags=[], fields=[], page_size=20, prefetch=4):
+        '''
+        iterate over all problems with the given tags, fetching pages ahead
+        :param tags: List. Tags/authors. eg: jan13,kingofnumbers
+        :param fields: List. Same as get_problems_by_tags
+        :param page_size: Integer. Problems per request (max 20)
+        :param prefetch: Integer. Number of pages fetched ahead
+        '''
+        def fetch(offset, limit):
+            return self.get_problems_by_tags(tags, fields, limit, offset)
+        return paginate(fetch, min(page_size, 20), prefetch)
+
     def get_rankings(self, contest_code, fields=[], country='', institution='', institutionType='', offset=0, limit=10, sortBy='rank', sortOrder='asc'):
         '''
         get rankings for a particular contest
@@ -323,7 +665,7 @@ class Codechef(object):
         :param sortBy: String. Possible fields are: rank.
         :param sortOrder: String. Possible fields are: asc, desc
         '''
-        url = 'https://api.codechef.com/rankings/' + contest_code
+        url = self.base_url + '/rankings/' + contest_code
         params = (
             ('fields', ','.join(fields)),
             ('country', country),
@@ -338,6 +680,25 @@ class Codechef(object):
 
         return response
 
+    def iter_rankings(self, contest_code, fields=[], country='', institution='', institutionType='', sortBy='rank', sortOrder='asc', page_size=100, prefetch=2, model=None):
+        '''
+        iterate over the whole ranklist of a contest, fetching pages ahead
+        :param contest_code: String. Contest code eg. JAN17
+        :param fields: List. Same as get_rankings
+        :param country: String. Country to which the user belongs, eg. India
+        :param institution: String. Institution to which the user belongs
+        :param institutionType: String. Possible values: school, college or organization.
+        :param sortBy: String. Possible fields are: rank.
+        :param sortOrder: String. Possible fields are: asc, desc
+        :param page_size: Integer. Rankings per request (max 100)
+        :param prefetch: Integer. Number of pages fetched ahead
+        :param model: models.Record subclass, eg. models.RankingRow. Yields typed records instead of dicts
+        '''
+        def fetch(offset, limit):
+            return self.get_rankings(contest_code, fields, country, institution, institutionType, offset, limit, sortBy, sortOrder)
+        records = paginate(fetch, min(page_size, 100), prefetch)
+        return records if model is None else map(model.from_dict, records)
+
     def get_ratings(self, contest_type, fields=[], country='', institution='', institutionType='', offset=0, limit=10, sortBy='globalRank', sortOrder='asc'):
         '''
         get rankings for a particular contest
@@ -351,7 +712,7 @@ class Codechef(object):
         :param sortBy: String. Possible fields are: username, globalRank, rating, diff.
         :param sortOrder: String. Possible fields are: asc, desc
         '''
-        url = 'https://api.codechef.com/ratings/' + contest_type
+        url = self.base_url + '/ratings/' + contest_type
         params = (
             ('fields', ','.join(fields)),
             ('country', country),
@@ -366,13 +727,32 @@ class Codechef(object):
 
         return response
 
+    def iter_ratings(self, contest_type, fields=[], country='', institution='', institutionType='', sortBy='globalRank', sortOrder='asc', page_size=100, prefetch=2, model=None):
+        '''
+        iterate over the whole rating list of a contest type, fetching pages ahead
+        :param contest_type: String. Same as get_ratings
+        :param fields: List. Same as get_ratings
+        :param country: String. Country to which the user belongs, eg. India
+        :param institution: String. Institution to which the user belongs
+        :param institutionType: String. Possible values: school, college or organization.
+        :param sortBy: String. Possible fields are: username, globalRank, rating, diff.
+        :param sortOrder: String. Possible fields are: asc, desc
+        :param page_size: Integer. Ratings per request (max 100)
+        :param prefetch: Integer. Number of pages fetched ahead
+        :param model: models.Record subclass, eg. models.RatingRow. Yields typed records instead of dicts
+        '''
+        def fetch(offset, limit):
+            return self.get_ratings(contest_type, fields, country, institution, institutionType, offset, limit, sortBy, sortOrder)
+        records = paginate(fetch, min(page_size, 100), prefetch)
+        return records if model is None else map(model.from_dict, records)
+
     def add_set(self, set_name, description):
         '''
         adds the set to user's account
         :param set_name: String. Set name in the form of string
         :param description: String. Enter the description of the set
         '''
-        url = 'https://api.codechef.com/sets/add'
+        url = self.base_url + '/sets/add'
         data = (
             ('setName', set_name),
             ('description', description),
@@ -386,7 +766,7 @@ class Codechef(object):
         delete the set from the user's account
         :param set_name: String. Enter the name of the set you want to delete
         '''
-        url = 'https://api.codechef.com/sets/delete'
+        url = self.base_url + '/sets/delete'
         params = (
             ('setName', set_name),
         )
@@ -399,7 +779,7 @@ class Codechef(object):
         shows all sets created by user
         :param fields: List. Possible fields are: setName, description.
         '''
-        url = 'https://api.codechef.com/sets/'
+        url = self.base_url + '/sets/'
         params = (
             ('fields', ','.join(fields)),
         )
@@ -413,7 +793,7 @@ class Codechef(object):
         :param set_name: String. Set name.
         :param member_handle: String. Enter the username.
         '''
-        url = 'https://api.codechef.com/sets/members/add'
+        url = self.base_url + '/sets/members/add'
         data = (
             ('setName', set_name),
             ('memberHandle', member_handle),
@@ -428,7 +808,7 @@ class Codechef(object):
         :param set_name: String. Set name whose set member you want to delete.
         :param member_handle: String. Enter the username of the set member you want to remove from set.
         '''
-        url = 'https://api.codechef.com/sets/members/delete'
+        url = self.base_url + '/sets/members/delete'
         params = (
             ('setName', set_name),
             ('memberHandle', member_handle),
@@ -443,7 +823,7 @@ class Codechef(object):
         :param set_name: String. Set name
         :param fields: List. Possible fields are: setName, memberName, country, allContestRating,longContestRating, shortContestRating, lTimeContestRating, allSchoolContestRating, longSchoolContestRating, shortSchoolContestRating, lTimeSchoolContestRating. Multiple fields can be entered using comma.
         '''
-        url = 'https://api.codechef.com/sets/members/get'
+        url = self.base_url + '/sets/members/get'
         params = (
             ('setName', set_name),
             ('fields', ','.join(fields)),
@@ -459,7 +839,7 @@ class Codechef(object):
         :param set_name_new: String. New set name
         :param description: String. Description
         '''
-        url = 'https://api.codechef.com/sets/update'
+        url = self.base_url + '/sets/update'
         data = (
             ('setName', set_name),
             ('setNameNew', set_name_new),
@@ -469,7 +849,26 @@ class Codechef(object):
 
         return response
 
-    def get_submissions(self, result='', year='', username='', language='', problem_code='', contest_code='', fields=[]):
+    def sync_set(self, set_name, desired_members, description=None, max_workers=8):
+        '''
+        makes the members of a set equal to desired_members with the fewest adds and deletes, applied concurrently
+        :param set_name: String. Set name, created if missing
+        :param desired_members: Iterable. Handles the set should contain
+        :param description: String. Description of the set, left unchanged when None
+        :param max_workers: Integer. Maximum number of requests in flight
+        '''
+        return sync_set(self, set_name, desired_members, description, max_workers)
+
+    def sync_sets(self, sets, max_workers=8, descriptions=None):
+        '''
+        syncs many sets in one run, returns a dict of set name -> SetSyncResult
+        :param sets: Dict. set name -> desired handles
+        :param max_workers: Integer. Maximum number of requests in flight
+        :param descriptions: Dict. set name -> description, sets left out keep theirs
+        '''
+        return sync_sets(self, sets, max_workers, descriptions)
+
+    def get_submissions(self, result='', year='', username='', language='', problem_code='', contest_code='', fields=[], offset=0, limit=20):
         '''
         get submissions
         :param result: String. Search submission by result, eg. AC, WA, RE etc.
@@ -479,8 +878,10 @@ class Codechef(object):
         :param problem_code: String. Code for problem, eg. SALARY
         :param contest_code: String. Code of contest, eg. JAN13
         :param fields: List. Possible fields are: id, date, username, problemCode, language, contestCode, result, time, memory. Multiple fields can be entered using comma.
+        :param offset: Integer. Starting index of the list
+        :param limit: Integer. Number of submissions in a list(max 20)
         '''
-        url = 'https://api.codechef.com/submissions/'
+        url = self.base_url + '/submissions/'
         params = (
             ('result', result),
             ('year', year),
@@ -489,18 +890,37 @@ class Codechef(object):
             ('problemCode', problem_code),
             ('contestCode', contest_code),
             ('fields', ','.join(fields)),
+            ('offset', offset),
+            ('limit', limit),
         )
         response = self._GET(url, params)
 
         return response
 
+    def iter_submissions(self, result='', year='', username='', language='', problem_code='', contest_code='', fields=[], page_size=20, prefetch=2):
+        '''
+        iterate over all submissions matching the filters, fetching pages ahead
+        :param result: String. Same as get_submissions
+        :param year: Integer. Same as get_submissions
+        :param username: String. Same as get_submissions
+        :param language: String. Same as get_submissions
+        :param problem_code: String. Same as get_submissions
+        :param contest_code: String. Same as get_submissions
+        :param fields: List. Same as get_submissions
+        :param page_size: Integer. Submissions per request (max 20)
+        :param prefetch: Integer. Number of pages fetched ahead
+        '''
+        def fetch(offset, limit):
+            return self.get_submissions(result, year, username, language, problem_code, contest_code, fields, offset, limit)
+        return paginate(fetch, min(page_size, 20), prefetch)
+
     def get_submission_details(self, submission_id, fields=[]):
         '''
         fetches details of a submission.
         :param submission_id: Integer. submission id
         :param fields: List. Possible fields are: id, date, username, problemCode, language, contestCode, result, time, memory. Multiple fields can be entered using comma.
         '''
-        url = 'https://api.codechef.com/submissions/' + str(submission_id)
+        url = self.base_url + '/submissions/' + str(submission_id)
         params = (
             ('fields', ','.join(fields)),
         )
@@ -508,13 +928,23 @@ class Codechef(object):
 
         return response
 
+    def get_submission_details_many(self, submission_ids, fields=[], max_workers=8, ordered=True):
+        '''
+        fetches details of many submissions concurrently
+        :param submission_ids: Iterable. submission ids
+        :param fields: List. Same as get_submission_details
+        :param max_workers: Integer. Maximum number of requests in flight
+        :param ordered: Boolean. Return a list of BulkResult in input order, otherwise yield them as they complete
+        '''
+        return fetch_many(lambda submission_id: self.get_submission_details(submission_id, fields), submission_ids, max_workers, ordered)
+
     def add_problem_todo(self, problem_code, contest_code):
         '''
         adds a problem to todo list
         :param problem_code: String.
         :param contest_code: String.
         '''
-        url = 'https://api.codechef.com/todo/add'
+        url = self.base_url + '/todo/add'
         data = (
             ('problemCode', problem_code),
             ('contestCode', contest_code),
@@ -527,15 +957,17 @@ class Codechef(object):
         '''
         deletes all the problems added to todo list
         '''
-        url = 'https://api.codechef.com/todo/delete/all'
+        url = self.base_url + '/todo/delete/all'
         response = self._DELETE(url)
 
         return response
 
     def delete_problem_todo(self, problem_code):
         '''
+        deletes a problem from todo list
+        :param problem_code: String.
         '''
-        url = 'https://api.codechef.com/todo/delete/'
+        url = self.base_url + '/todo/delete/'
         params = (
             ('problemCode', problem_code),
         )
@@ -547,7 +979,7 @@ class Codechef(object):
         '''
         gets problems listed in todo
         '''
-        url = 'https://api.codechef.com/todo/problems'
+        url = self.base_url + '/todo/problems'
         params = (
             ('fields', ','.join(fields)),
         )
@@ -555,6 +987,32 @@ class Codechef(object):
 
         return response
 
+    def sync_todo(self, desired_problems, max_workers=8, allow_clear=True):
+        '''
+        makes the todo list equal to desired_problems with the fewest mutating calls, applied concurrently.
+        Returns a TodoSyncResult
+        :param desired_problems: Dict or pairs. problem code -> contest code, None keeps the current one
+        :param max_workers: Integer. Maximum number of requests in flight
+        :param allow_clear: Boolean. Clear the list and add everything back when that takes fewer calls
+        '''
+        return sync_todo(self, desired_problems, max_workers, allow_clear)
+
+    def add_todo_many(self, problems, max_workers=8):
+        '''
+        adds the problems that are not on the todo list yet, concurrently. Returns a TodoSyncResult
+        :param problems: Dict or pairs. problem code -> contest code
+        :param max_workers: Integer. Maximum number of requests in flight
+        '''
+        return add_todos(self, problems, max_workers)
+
+    def delete_todo_many(self, problem_codes, max_workers=8):
+        '''
+        deletes the given problems that are on the todo list, concurrently. Returns a TodoSyncResult
+        :param problem_codes: Iterable. Problem codes
+        :param max_workers: Integer. Maximum number of requests in flight
+        '''
+        return delete_todos(self, problem_codes, max_workers)
+
     def get_user_list(self, search, fields=[], offset=0, limit=10):
         '''
         get users list
@@ -563,7 +1021,7 @@ class Codechef(object):
         :param offset: Integer. Starting index of list
         :param limit: Integer. Number of users to be fetched, max 20
         '''
-        url = 'https://api.codechef.com/users'
+        url = self.base_url + '/users'
 
         params = (
             ('fields', ','.join(fields)),
@@ -575,11 +1033,23 @@ class Codechef(object):
 
         return response
 
+    def iter_user_list(self, search, fields=[], page_size=20, prefetch=4):
+        '''
+        iterate over all users matching search, fetching pages ahead
+        :param search: String. Search user by prefix
+        :param fields: List. Same as get_user_list
+        :param page_size: Integer. Users per request (max 20)
+        :param prefetch: Integer. Number of pages fetched ahead
+        '''
+        def fetch(offset, limit):
+            return self.get_user_list(search, fields, offset, limit)
+        return paginate(fetch, min(page_size, 20), prefetch)
+
     def whoami(self):
         '''
         fetch details of login user
         '''
-        url = 'https://api.codechef.com/users/me'
+        url = self.base_url + '/users/me'
         response = self._GET(url)
 
         return response
@@ -590,10 +1060,20 @@ class Codechef(object):
         :param user_name: String. username of user eg. arpit147
         :param fields: List. Possible fields are: username, fullname, country, state, city, rankings, ratings, occupation, language, organization, problemStats, submissionStats. Multiple fields can be entered using comma.
         '''
-        url = 'https://api.codechef.com/users/' + user_name
+        url = self.base_url + '/users/' + user_name
         params = (
             ('fields', ','.join(fields)),
         )
         response = self._GET(url, params)
 
         return response
+
+    def get_users(self, user_names, fields=[], max_workers=8, ordered=True):
+        '''
+        get details of many users concurrently
+        :param user_names: Iterable. usernames, duplicates are fetched once
+        :param fields: List. Same as get_user
+        :param max_workers: Integer. Maximum number of requests in flight
+        :param ordered: Boolean. Return a list of BulkResult in input order, otherwise yield them as they complete
+        '''
+        return fetch_many(lambda user_name: self.get_user(user_name, fields), user_names, max_workers, ordered)
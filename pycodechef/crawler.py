@@ -0,0 +1,195 @@
+"""
+sharded, resumable crawl of submissions
+"""
+import itertools
+import json
+import os
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from .export import WRITERS
+
+
+SUBMISSION_FIELDS = ['id', 'date', 'username', 'problemCode', 'language', 'contestCode', 'result', 'time', 'memory']
+
+Shard = namedtuple('Shard', ['username', 'year', 'result'])
+Shard.__doc__ = '''
+one get_submissions filter combination, empty values are not filtered on
+'''
+
+
+def make_shards(usernames, years=('',), results=('',)):
+    '''
+    splits the search space into one shard per user x year x result
+    :param usernames: Iterable. Handles to crawl
+    :param years: Iterable. Years, eg. range(2015, 2020)
+    :param results: Iterable. Results, eg. ('AC', 'WA', 'TLE', 'RE', 'CTE')
+    '''
+    return [Shard(u, str(y), r) for u, y, r in itertools.product(usernames, years, results)]
+
+
+def _shard_key(shard):
+    return '{}|{}|{}'.format(*shard)
+
+
+class SubmissionCrawler(object):
+    '''
+    Crawls shards of submissions on a worker pool and hands every distinct
+    submission to a sink. Done shards and seen ids are checkpointed to
+    state_path so an interrupted crawl resumes where it stopped.
+    '''
+
+    def __init__(self, client, state_path, fields=None, enrich=False, detail_fields=[], max_workers=8, checkpoint_every=500):
+        '''
+        :param client: Codechef
+        :param state_path: String. Checkpoint file
+        :param fields: List. Fields of get_submissions, id is always fetched
+        :param enrich: Boolean. Merge get_submission_details into every record
+        :param detail_fields: List. Fields of get_submission_details when enriching
+        :param max_workers: Integer. Shards crawled concurrently, also the width of enrichment
+        :param checkpoint_every: Integer. Records written between checkpoints
+        '''
+        self.client = client
+        self.state_path = state_path
+        self.fields = list(fields or SUBMISSION_FIELDS)
+        if 'id' not in self.fields:
+            self.fields.insert(0, 'id')
+        self.enrich = enrich
+        self.detail_fields = detail_fields
+        self.max_workers = max_workers
+        self.checkpoint_every = checkpoint_every
+        self.done = set()
+        self.seen = set()
+        self.position = None
+        self.load()
+
+    def load(self):
+        '''
+        reads the checkpoint if there is one
+        '''
+        try:
+            with open(self.state_path) as f:
+                state = json.load(f)
+        except (IOError, OSError, ValueError):
+            return
+        self.done = set(state.get('done', ()))
+        self.seen = set(state.get('seen', ()))
+        self.position = state.get('position')
+
+    def checkpoint(self, position=None):
+        self.position = position
+        tmp = self.state_path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump({'done': sorted(self.done), 'seen': sorted(self.seen), 'position': position}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.state_path)
+
+    def _crawl_shard(self, shard):
+        return list(self.client.iter_submissions(shard.result, shard.year, shard.username, fields=self.fields, prefetch=1))
+
+    def _enrich(self, records):
+        ids = [record['id'] for record in records]
+        details = {}
+        for result in self.client.get_submission_details_many(ids, self.detail_fields, self.max_workers):
+            if result.error is None:
+                details[result.key] = result.result['result']['data']['content']
+        for record in records:
+            record.update(details.get(record['id'], {}))
+        return records
+
+    def run(self, shards, sink, flush=None, position=None):
+        '''
+        crawls every shard not done yet, returns the number of records written
+        :param shards: Iterable of Shard
+        :param sink: Callable. sink(record) called once per distinct submission
+        :param flush: Callable. Makes written records durable, called before each checkpoint
+        :param position: Callable. Returns the sink position stored in the checkpoint
+        '''
+        pending = [shard for shard in shards if _shard_key(shard) not in self.done]
+        written = 0
+        since_checkpoint = 0
+        executor = ThreadPoolExecutor(self.max_workers)
+        futures = {}
+        try:
+            while pending or futures:
+                while pending and len(futures) < self.max_workers * 2:
+                    shard = pending.pop(0)
+                    futures[executor.submit(self._crawl_shard, shard)] = shard
+                finished, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    shard = futures.pop(future)
+                    records = [r for r in future.result() if r.get('id') not in self.seen]
+                    records = list(dict((r['id'], r) for r in records).values())
+                    if self.enrich and records:
+                        records = self._enrich(records)
+                    for record in records:
+                        sink(record)
+                        self.seen.add(record['id'])
+                    written += len(records)
+                    since_checkpoint += len(records)
+                    self.done.add(_shard_key(shard))
+                    if since_checkpoint >= self.checkpoint_every or not (pending or futures):
+                        if flush is not None:
+                            flush()
+                        self.checkpoint(position() if position is not None else None)
+                        since_checkpoint = 0
+        finally:
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait=False)
+        return written
+
+
+def crawl_submissions(client, path, shards, fmt='ndjson', fields=None, enrich=False, detail_fields=[], max_workers=8, resume=True):
+    '''
+    streams the distinct submissions of every shard into a file. Records go
+    to path + '.part', renamed to path once every shard is done; an
+    interrupted crawl of the same path resumes from its last checkpoint.
+    Returns the number of records written by this call.
+    :param client: Codechef
+    :param path: String. Output file
+    :param shards: Iterable of Shard, see make_shards
+    :param fmt: String. ndjson or csv
+    :param fields: List. Fields written, defaults to SUBMISSION_FIELDS
+    :param enrich: Boolean. Merge get_submission_details into every record
+    :param detail_fields: List. Fields of get_submission_details when enriching
+    :param max_workers: Integer. Shards crawled concurrently
+    :param resume: Boolean. Continue an interrupted crawl
+    '''
+    writer_class = WRITERS[fmt]
+    if not writer_class.resumable:
+        raise ValueError('crawls can only be written as ' + ', '.join(k for k, w in WRITERS.items() if w.resumable))
+    part_path = path + '.part'
+    state_path = path + '.state'
+    if not resume:
+        for stale in (part_path, state_path):
+            if os.path.exists(stale):
+                os.remove(stale)
+    crawler = SubmissionCrawler(client, state_path, fields, enrich, detail_fields, max_workers)
+    fields = crawler.fields + [f for f in detail_fields if f not in crawler.fields]
+    resuming = crawler.position is not None and os.path.exists(part_path)
+    if resuming:
+        f = open(part_path, 'r+b')
+        f.truncate(crawler.position)
+        f.seek(crawler.position)
+    else:
+        crawler.done.clear()
+        crawler.seen.clear()
+        f = open(part_path, 'wb')
+    try:
+        writer = writer_class(f, fields, resuming)
+
+        def flush():
+            writer.flush()
+            f.flush()
+            os.fsync(f.fileno())
+
+        written = crawler.run(shards, lambda record: writer.write(dict((name, record.get(name)) for name in fields)), flush, f.tell)
+        writer.close()
+    finally:
+        f.close()
+    os.replace(part_path, path)
+    if os.path.exists(state_path):
+        os.remove(state_path)
+    return written
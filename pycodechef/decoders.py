@@ -0,0 +1,42 @@
+"""
+json decoding backends
+"""
+import json
+
+
+def _orjson():
+    import orjson
+    return orjson.loads
+
+
+def _ujson():
+    import ujson
+    return ujson.loads
+
+
+def _stdlib():
+    return json.loads
+
+
+BACKENDS = (
+    ('orjson', _orjson),
+    ('ujson', _ujson),
+    ('json', _stdlib),
+)
+
+
+def get_decoder(name=None):
+    '''
+    returns a function decoding json bytes. The fastest installed backend is
+    picked unless name is given
+    :param name: String. One of orjson, ujson, json
+    '''
+    for backend, load in BACKENDS:
+        if name is not None and backend != name:
+            continue
+        try:
+            return load()
+        except ImportError:
+            if name is not None:
+                raise
+    raise ValueError('unknown json backend: {}'.format(name))
@@ -0,0 +1,58 @@
+"""
+exceptions raised by pycodechef
+"""
+
+
+class CodechefError(Exception):
+    '''
+    base class for errors raised by pycodechef
+    '''
+
+
+class APIError(CodechefError):
+    '''
+    api answered with a non OK status
+    '''
+
+    def __init__(self, message, response=None):
+        super(APIError, self).__init__(message)
+        self.response = response
+
+
+class RateLimitError(APIError):
+    '''
+    requests kept being throttled after every backoff attempt
+    '''
+
+
+class AuthenticationError(APIError):
+    '''
+    access token could not be obtained
+    '''
+
+
+class PollTimeoutError(CodechefError):
+    '''
+    a status link was still pending after the maximum number of polls
+    '''
+
+
+class MalformedResponseError(APIError):
+    '''
+    response body is not valid json
+    '''
+
+    def __init__(self, message, response=None, status_code=None):
+        super(MalformedResponseError, self).__init__(message, response)
+        self.status_code = status_code
+
+
+class CircuitOpenError(CodechefError):
+    '''
+    request refused because the circuit of its endpoint is open
+    '''
+
+    def __init__(self, message, endpoint=None, retry_in=None):
+        super(CircuitOpenError, self).__init__(message)
+        self.endpoint = endpoint
+        self.retry_in = retry_in
@@ -0,0 +1,268 @@
+"""
+streaming export of ranklists and rating lists to NDJSON, CSV or parquet
+"""
+import argparse
+import csv
+import io
+import json
+import os
+import sys
+
+from .pagination import paginate
+
+
+RANKING_FIELDS = ['rank', 'username', 'totalScore', 'penalty', 'totalTime', 'country', 'countryCode', 'institution', 'institutionType', 'rating']
+RATING_FIELDS = ['globalRank', 'username', 'rating', 'diff', 'countryRank', 'country', 'countryCode', 'institution', 'institutionType']
+FORMATS = ('ndjson', 'csv', 'parquet')
+
+
+class NDJSONWriter(object):
+    '''
+    one json object per line
+    '''
+
+    resumable = True
+
+    def __init__(self, f, fields, resume):
+        self.f = f
+        self.fields = fields
+
+    def write(self, record):
+        self.f.write(json.dumps(record, separators=(',', ':')).encode('utf-8') + b'\n')
+
+    def flush(self):
+        self.f.flush()
+
+    def close(self):
+        pass
+
+
+class CSVWriter(object):
+    '''
+    csv with a header row, nested values are json encoded
+    '''
+
+    resumable = True
+
+    def __init__(self, f, fields, resume):
+        self.text = io.TextIOWrapper(f, encoding='utf-8', newline='', write_through=True)
+        self.writer = csv.writer(self.text)
+        self.fields = fields
+        if not resume:
+            self.writer.writerow(fields)
+
+    def write(self, record):
+        row = []
+        for value in (record.get(name) for name in self.fields):
+            row.append(json.dumps(value) if isinstance(value, (dict, list)) else value)
+        self.writer.writerow(row)
+
+    def flush(self):
+        self.text.flush()
+
+    def close(self):
+        self.text.detach()
+
+
+class ParquetWriter(object):
+    '''
+    compressed columnar parquet file, written one row group at a time.
+    Needs pyarrow
+    '''
+
+    resumable = False
+
+    def __init__(self, f, fields, resume, row_group_size=10000, compression='zstd'):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise ImportError('parquet export needs pyarrow: pip install pyarrow')
+        self.pa = pyarrow
+        self.pq = pyarrow.parquet
+        self.fields = fields
+        self.f = f
+        self.row_group_size = row_group_size
+        self.compression = compression
+        self.writer = None
+        self._columns = dict((name, []) for name in fields)
+
+    def write(self, record):
+        for name in self.fields:
+            value = record.get(name)
+            self._columns[name].append(json.dumps(value) if isinstance(value, (dict, list)) else value)
+        if len(self._columns[self.fields[0]]) >= self.row_group_size:
+            self._write_group()
+
+    def _write_group(self):
+        if not self._columns[self.fields[0]]:
+            return
+        table = self.pa.table(self._columns)
+        if self.writer is None:
+            self.writer = self.pq.ParquetWriter(self.f, table.schema, compression=self.compression)
+        self.writer.write_table(table)
+        self._columns = dict((name, []) for name in self.fields)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self._write_group()
+        if self.writer is not None:
+            self.writer.close()
+
+
+WRITERS = {
+    'ndjson': NDJSONWriter,
+    'csv': CSVWriter,
+    'parquet': ParquetWriter,
+}
+
+
+def _load_state(state_path, fmt, fields):
+    try:
+        with open(state_path) as f:
+            state = json.load(f)
+    except (IOError, OSError, ValueError):
+        return None
+    if state.get('format') != fmt or state.get('fields') != fields:
+        return None
+    return state
+
+
+def _save_state(state_path, state):
+    tmp = state_path + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(state, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, state_path)
+
+
+def export_records(fetch, path, fields, fmt='ndjson', resume=True, page_size=100, prefetch=2, checkpoint_every=1000):
+    '''
+    streams every record of a paginated endpoint into a file with constant memory.
+    Records go to path + '.part', which is renamed to path once complete;
+    progress is checkpointed so an interrupted export resumes where it stopped.
+    Returns the number of records in the file.
+    :param fetch: Callable. fetch(offset, limit) returning one page response
+    :param path: String. Output file
+    :param fields: List. Fields written, in order
+    :param fmt: String. One of ndjson, csv, parquet
+    :param resume: Boolean. Continue an interrupted export of the same path, format and fields
+    :param page_size: Integer. Records per request
+    :param prefetch: Integer. Number of pages fetched ahead
+    :param checkpoint_every: Integer. Records written between checkpoints
+    '''
+    writer_class = WRITERS[fmt]
+    part_path = path + '.part'
+    state_path = path + '.state'
+    state = None
+    if resume and writer_class.resumable and os.path.exists(part_path):
+        state = _load_state(state_path, fmt, fields)
+    if state:
+        f = open(part_path, 'r+b')
+        f.truncate(state['bytes'])
+        f.seek(state['bytes'])
+        written = state['offset']
+    else:
+        f = open(part_path, 'wb')
+        written = 0
+    try:
+        writer = writer_class(f, fields, state is not None)
+        for record in paginate(fetch, page_size, prefetch, start=written):
+            writer.write(dict((name, record.get(name)) for name in fields))
+            written += 1
+            if writer_class.resumable and written % checkpoint_every == 0:
+                writer.flush()
+                f.flush()
+                os.fsync(f.fileno())
+                _save_state(state_path, {'format': fmt, 'fields': fields, 'offset': written, 'bytes': f.tell()})
+        writer.close()
+        f.flush()
+        os.fsync(f.fileno())
+    finally:
+        f.close()
+    os.replace(part_path, path)
+    if os.path.exists(state_path):
+        os.remove(state_path)
+    return written
+
+
+def export_rankings(client, contest_code, path, fmt='ndjson', fields=None, country='', institution='', institutionType='', resume=True, prefetch=2):
+    '''
+    streams the whole ranklist of a contest into a file
+    :param client: Codechef
+    :param contest_code: String. Contest code eg. JAN17
+    :param path: String. Output file
+    :param fmt: String. One of ndjson, csv, parquet
+    :param fields: List. Fields written, defaults to RANKING_FIELDS
+    :param country: String. Country filter
+    :param institution: String. Institution filter
+    :param institutionType: String. Institution type filter
+    :param resume: Boolean. Continue an interrupted export
+    :param prefetch: Integer. Number of pages fetched ahead
+    '''
+    fields = list(fields or RANKING_FIELDS)
+
+    def fetch(offset, limit):
+        return client.get_rankings(contest_code, fields, country, institution, institutionType, offset, limit)
+    return export_records(fetch, path, fields, fmt, resume, 100, prefetch)
+
+
+def export_ratings(client, contest_type, path, fmt='ndjson', fields=None, country='', institution='', institutionType='', resume=True, prefetch=2):
+    '''
+    streams the whole rating list of a contest type into a file
+    :param client: Codechef
+    :param contest_type: String. Same as Codechef.get_ratings
+    :param path: String. Output file
+    :param fmt: String. One of ndjson, csv, parquet
+    :param fields: List. Fields written, defaults to RATING_FIELDS
+    :param country: String. Country filter
+    :param institution: String. Institution filter
+    :param institutionType: String. Institution type filter
+    :param resume: Boolean. Continue an interrupted export
+    :param prefetch: Integer. Number of pages fetched ahead
+    '''
+    fields = list(fields or RATING_FIELDS)
+
+    def fetch(offset, limit):
+        return client.get_ratings(contest_type, fields, country, institution, institutionType, offset, limit)
+    return export_records(fetch, path, fields, fmt, resume, 100, prefetch)
+
+
+def main(argv=None):
+    '''
+    console entry point, credentials are read from CODECHEF_CLIENT_ID and CODECHEF_CLIENT_SECRET
+    '''
+    from .client import Codechef
+
+    parser = argparse.ArgumentParser(prog='pycodechef-export', description='Export a ranklist or rating list.')
+    parser.add_argument('kind', choices=('rankings', 'ratings'))
+    parser.add_argument('code', help='contest code for rankings, contest type for ratings')
+    parser.add_argument('-o', '--output', required=True)
+    parser.add_argument('-f', '--format', choices=FORMATS, default='ndjson')
+    parser.add_argument('--fields', help='comma separated fields')
+    parser.add_argument('--country', default='')
+    parser.add_argument('--institution', default='')
+    parser.add_argument('--institution-type', default='')
+    parser.add_argument('--prefetch', type=int, default=2)
+    parser.add_argument('--no-resume', action='store_true')
+    args = parser.parse_args(argv)
+
+    try:
+        client_id = os.environ['CODECHEF_CLIENT_ID']
+        client_secret = os.environ['CODECHEF_CLIENT_SECRET']
+    except KeyError as err:
+        parser.error('{} is not set'.format(err.args[0]))
+    export = export_rankings if args.kind == 'rankings' else export_ratings
+    fields = args.fields.split(',') if args.fields else None
+    with Codechef(client_id, client_secret) as client:
+        count = export(client, args.code, args.output, args.format, fields, args.country, args.institution,
+                       args.institution_type, not args.no_resume, args.prefetch)
+    sys.stdout.write('{} records written to {}\n'.format(count, args.output))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,209 @@
+"""
+batch execution on the codechef ide
+"""
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from .exceptions import APIError, PollTimeoutError
+
+
+RunJob = namedtuple('RunJob', ['source_code', 'language', 'input', 'expected'])
+RunJob.__new__.__defaults__ = (None,)
+
+RunResult = namedtuple('RunResult', ['job', 'link', 'status', 'polls', 'matches'])
+RunResult.__doc__ = '''
+finished run. status is the data of the last get_status_code answer and
+matches tells whether the output equals job.expected (None if not given)
+'''
+
+
+PENDING_STATUSES = frozenset(['', 'pending', 'running', 'queued', 'compiling'])
+
+
+def is_finished(status):
+    '''
+    tells whether a get_status_code data dict describes a finished run: its
+    status is anything but pending or running. Without a status field, a run
+    is finished once it has some output, stderr or cmpinfo
+    :param status: Dict. result.data of a get_status_code answer
+    '''
+    if status.get('status') is not None:
+        return str(status['status']).lower() not in PENDING_STATUSES
+    return any(status.get(key) not in (None, '') for key in ('output', 'stderr', 'cmpinfo'))
+
+
+def _cancel(future):
+    # futures made here are never set running, notify waiters like an executor would
+    if not future.done() and future.cancel():
+        future.set_running_or_notify_cancel()
+
+
+def same_output(output, expected):
+    '''
+    compares outputs ignoring trailing whitespace on lines and at the end
+    '''
+    def normalize(text):
+        return [line.rstrip() for line in (text or '').rstrip().splitlines()]
+    return normalize(output) == normalize(expected)
+
+
+class BatchRunner(object):
+    '''
+    Submits many runs at bounded concurrency and polls every pending status
+    link from one schedule with per-link exponential backoff.
+    '''
+
+    def __init__(self, client, max_workers=8, first_poll=2.0, backoff=1.5, max_interval=10.0, max_polls=20, finished=is_finished, compare=same_output):
+        '''
+        :param client: Codechef
+        :param max_workers: Integer. Maximum number of run and status requests in flight
+        :param first_poll: Float. Seconds between submission and the first status poll, about a typical compile and run
+        :param backoff: Float. Factor applied to the poll interval after each pending answer
+        :param max_interval: Float. Upper bound of the poll interval
+        :param max_polls: Integer. Polls per link before failing with PollTimeoutError
+        :param finished: Callable. Tells whether status data describes a finished run
+        :param compare: Callable. compare(output, expected) used when a job has an expected output
+        '''
+        self.client = client
+        self.first_poll = first_poll
+        self.backoff = backoff
+        self.max_interval = max_interval
+        self.max_polls = max_polls
+        self.finished = finished
+        self.compare = compare
+        self.polls = 0
+        self._executor = ThreadPoolExecutor(max_workers)
+        self._schedule = []
+        self._counter = itertools.count()
+        self._cond = threading.Condition()
+        self._closed = False
+        self._futures = set()
+        self._thread = threading.Thread(target=self._poll_loop, name='pycodechef-ide-poller')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        '''
+        stops polling, pending futures are cancelled, including those of runs still being submitted
+        '''
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+            futures = list(self._futures)
+        self._thread.join()
+        for future in futures:
+            _cancel(future)
+        self._executor.shutdown(wait=False)
+
+    def submit(self, source_code, language, sample_input, expected=None):
+        '''
+        submits one run, returns a concurrent.futures.Future of RunResult
+        :param source_code: String. Source code of submission
+        :param language: String. language of submission
+        :param sample_input: String. input of submission
+        :param expected: String. Expected output to diff against
+        '''
+        job = RunJob(source_code, language, sample_input, expected)
+        future = Future()
+        with self._cond:
+            if self._closed:
+                raise RuntimeError('cannot submit runs after close')
+            self._futures.add(future)
+        future.add_done_callback(self._forget)
+        self._executor.submit(self._start, job, future)
+        return future
+
+    def _forget(self, future):
+        with self._cond:
+            self._futures.discard(future)
+
+    def run_many(self, jobs):
+        '''
+        submits many runs, returns their futures in the same order
+        :param jobs: Iterable of RunJob or (source_code, language, input[, expected]) tuples
+        '''
+        return [self.submit(*job) for job in jobs]
+
+    async def stream(self, jobs):
+        '''
+        async generator yielding RunResult as runs finish
+        :param jobs: Same as run_many
+        '''
+        for future in asyncio.as_completed([asyncio.wrap_future(f) for f in self.run_many(jobs)]):
+            yield await future
+
+    def _start(self, job, future):
+        if future.cancelled():
+            return
+        response = None
+        try:
+            response = self.client.run_code(job.source_code, job.language, job.input)
+            link = response['result']['data']['link']
+        except (KeyError, TypeError):
+            future.set_exception(APIError('run was not accepted', response))
+            return
+        except Exception as err:
+            future.set_exception(err)
+            return
+        self._enqueue([job, future, link, 0, self.first_poll])
+
+    def _enqueue(self, entry):
+        with self._cond:
+            if self._closed:
+                _cancel(entry[1])
+                return
+            heapq.heappush(self._schedule, (time.monotonic() + entry[4], next(self._counter), entry))
+            self._cond.notify()
+
+    def _poll_loop(self):
+        while True:
+            with self._cond:
+                while not self._closed and (not self._schedule or self._schedule[0][0] > time.monotonic()):
+                    timeout = self._schedule[0][0] - time.monotonic() if self._schedule else None
+                    self._cond.wait(timeout)
+                if self._closed:
+                    return
+                due = []
+                now = time.monotonic()
+                while self._schedule and self._schedule[0][0] <= now:
+                    due.append(heapq.heappop(self._schedule)[2])
+            for entry in due:
+                self._executor.submit(self._poll, entry)
+
+    def _poll(self, entry):
+        job, future, link, polls, interval = entry
+        if future.cancelled():
+            return
+        polls += 1
+        with self._cond:
+            self.polls += 1
+        try:
+            status = self.client.get_status_code(link)['result']['data']
+        except Exception as err:
+            status = None
+            error = err
+        if future.cancelled():
+            return
+        if status is not None and self.finished(status):
+            matches = None
+            if job.expected is not None:
+                matches = self.compare(status.get('output'), job.expected)
+            future.set_result(RunResult(job, link, status, polls, matches))
+        elif polls >= self.max_polls:
+            if status is None:
+                future.set_exception(error)
+            else:
+                future.set_exception(PollTimeoutError('{} still pending after {} polls'.format(link, polls)))
+        else:
+            self._enqueue([job, future, link, polls, min(interval * self.backoff, self.max_interval)])
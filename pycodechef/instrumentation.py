@@ -0,0 +1,279 @@
+"""
+per-endpoint request instrumentation
+"""
+import re
+import threading
+import time
+from bisect import bisect_left
+from urllib.parse import urlsplit
+
+
+ENDPOINT_TEMPLATES = (
+    (re.compile(r'^/contests/[^/]+/problems/[^/]+$'), '/contests/{contest}/problems/{problem}'),
+    (re.compile(r'^/contests/[^/]+$'), '/contests/{contest}'),
+    (re.compile(r'^/rankings/[^/]+$'), '/rankings/{contest}'),
+    (re.compile(r'^/ratings/[^/]+$'), '/ratings/{type}'),
+    (re.compile(r'^/problems/[^/]+$'), '/problems/{category}'),
+    (re.compile(r'^/submissions/[^/]+$'), '/submissions/{id}'),
+    (re.compile(r'^/users/(?!me$)[^/]+$'), '/users/{username}'),
+)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+DECODE_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5)
+CIRCUIT_STATES = ('closed', 'half_open', 'open')
+
+
+def endpoint_name(url):
+    '''
+    path template of a url, eg. /rankings/{contest}, used as metric label
+    :param url: String. endpoint url
+    '''
+    path = urlsplit(url).path.rstrip('/') or '/'
+    for pattern, template in ENDPOINT_TEMPLATES:
+        if pattern.match(path):
+            return template
+    return path
+
+
+class RequestInfo(object):
+    '''
+    what happened during one request; passed to hooks and exporters
+    '''
+
+    __slots__ = ('method', 'url', 'endpoint', 'start', 'end', 'status', 'bytes', 'attempts', 'retries',
+                 'cache_hit', 'decode_time', 'error', 'circuit', 'hedged', 'stale')
+
+    def __init__(self, method, url):
+        self.method = method
+        self.url = url
+        self.endpoint = endpoint_name(url)
+        self.start = time.time()
+        self.end = None
+        self.status = None
+        self.bytes = 0
+        self.attempts = 0
+        self.retries = 0
+        self.cache_hit = False
+        self.decode_time = 0.0
+        self.error = None
+        self.circuit = None
+        self.hedged = False
+        self.stale = False
+
+    @property
+    def elapsed(self):
+        return (self.end or time.time()) - self.start
+
+
+class Histogram(object):
+    '''
+    cumulative histogram with fixed bucket bounds
+    '''
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q):
+        '''
+        upper bound of the bucket holding the q-th quantile
+        '''
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            seen += count
+            if seen >= rank and count:
+                return bound
+        return None
+
+
+class Instrumentation(object):
+    '''
+    Calls before/after hooks and exporters around every request made by a
+    Codechef client. Nothing is measured unless a client is given one.
+    '''
+
+    def __init__(self, exporters=()):
+        '''
+        :param exporters: Iterable. Objects with an export(info) method, eg. Metrics or SpanExporter
+        '''
+        self.exporters = list(exporters)
+        self.before = []
+        self.after = []
+
+    def add_hook(self, before=None, after=None):
+        '''
+        :param before: Callable. before(info) called when a request starts
+        :param after: Callable. after(info) called when it is done
+        '''
+        if before is not None:
+            self.before.append(before)
+        if after is not None:
+            self.after.append(after)
+
+    def start(self, method, url):
+        info = RequestInfo(method, url)
+        for hook in self.before:
+            hook(info)
+        return info
+
+    def finish(self, info):
+        info.end = time.time()
+        for hook in self.after:
+            hook(info)
+        for exporter in self.exporters:
+            exporter.export(info)
+
+
+class Metrics(object):
+    '''
+    exporter aggregating per-endpoint histograms and counters, rendered in
+    the Prometheus text exposition format by prometheus()
+    '''
+
+    def __init__(self, prefix='pycodechef', latency_buckets=LATENCY_BUCKETS, size_buckets=SIZE_BUCKETS, decode_buckets=DECODE_BUCKETS):
+        self.prefix = prefix
+        self.latency_buckets = latency_buckets
+        self.size_buckets = size_buckets
+        self.decode_buckets = decode_buckets
+        self.latency = {}
+        self.size = {}
+        self.decode = {}
+        self.requests = {}
+        self.retries = {}
+        self.cache_hits = {}
+        self.errors = {}
+        self.stale = {}
+        self.hedged = {}
+        self.circuits = {}
+        self._lock = threading.Lock()
+
+    def export(self, info):
+        endpoint = info.endpoint
+        with self._lock:
+            if info.cache_hit:
+                self.cache_hits[endpoint] = self.cache_hits.get(endpoint, 0) + 1
+                if info.stale:
+                    self.stale[endpoint] = self.stale.get(endpoint, 0) + 1
+                return
+            if info.circuit is not None:
+                self.circuits[endpoint] = info.circuit
+            if info.hedged:
+                self.hedged[endpoint] = self.hedged.get(endpoint, 0) + 1
+            if endpoint not in self.latency:
+                self.latency[endpoint] = Histogram(self.latency_buckets)
+                self.size[endpoint] = Histogram(self.size_buckets)
+                self.decode[endpoint] = Histogram(self.decode_buckets)
+            self.latency[endpoint].observe(info.elapsed)
+            self.size[endpoint].observe(info.bytes)
+            self.decode[endpoint].observe(info.decode_time)
+            key = (endpoint, info.method, str(info.status))
+            self.requests[key] = self.requests.get(key, 0) + 1
+            if info.retries:
+                self.retries[endpoint] = self.retries.get(endpoint, 0) + info.retries
+            if info.error is not None:
+                self.errors[endpoint] = self.errors.get(endpoint, 0) + 1
+
+    def summary(self):
+        '''
+        per-endpoint count, p50 and p99 latency bounds and error count
+        '''
+        with self._lock:
+            return dict((endpoint, {
+                'count': h.count,
+                'p50': h.quantile(0.5),
+                'p99': h.quantile(0.99),
+                'bytes': self.size[endpoint].sum,
+                'errors': self.errors.get(endpoint, 0),
+                'retries': self.retries.get(endpoint, 0),
+                'cache_hits': self.cache_hits.get(endpoint, 0),
+                'stale': self.stale.get(endpoint, 0),
+                'hedged': self.hedged.get(endpoint, 0),
+                'circuit': self.circuits.get(endpoint),
+            }) for endpoint, h in self.latency.items())
+
+    def prometheus(self):
+        '''
+        metrics in the Prometheus text exposition format
+        '''
+        lines = []
+        with self._lock:
+            self._histogram(lines, 'request_duration_seconds', 'Request latency in seconds.', self.latency)
+            self._histogram(lines, 'response_size_bytes', 'Response body size in bytes.', self.size)
+            self._histogram(lines, 'json_decode_seconds', 'Time spent decoding response bodies.', self.decode)
+            name = self.prefix + '_requests_total'
+            lines.append('# HELP {} Requests sent.'.format(name))
+            lines.append('# TYPE {} counter'.format(name))
+            for (endpoint, method, status), value in sorted(self.requests.items()):
+                lines.append('{}{{endpoint="{}",method="{}",status="{}"}} {}'.format(name, endpoint, method, status, value))
+            for metric, help_text, values in (('retries_total', 'Retried attempts.', self.retries),
+                                              ('cache_hits_total', 'Responses served from the cache.', self.cache_hits),
+                                              ('errors_total', 'Requests that failed.', self.errors),
+                                              ('stale_responses_total', 'Expired cached responses served by an open circuit.', self.stale),
+                                              ('hedged_requests_total', 'Requests duplicated after the hedge delay.', self.hedged)):
+                name = self.prefix + '_' + metric
+                lines.append('# HELP {} {}'.format(name, help_text))
+                lines.append('# TYPE {} counter'.format(name))
+                for endpoint, value in sorted(values.items()):
+                    lines.append('{}{{endpoint="{}"}} {}'.format(name, endpoint, value))
+            name = self.prefix + '_circuit_state'
+            lines.append('# HELP {} Circuit state seen by the last request, 0 closed, 1 half open, 2 open.'.format(name))
+            lines.append('# TYPE {} gauge'.format(name))
+            for endpoint, state in sorted(self.circuits.items()):
+                lines.append('{}{{endpoint="{}"}} {}'.format(name, endpoint, CIRCUIT_STATES.index(state)))
+        return '\n'.join(lines) + '\n'
+
+    def _histogram(self, lines, metric, help_text, histograms):
+        name = self.prefix + '_' + metric
+        lines.append('# HELP {} {}'.format(name, help_text))
+        lines.append('# TYPE {} histogram'.format(name))
+        for endpoint, h in sorted(histograms.items()):
+            cumulative = 0
+            for bound, count in zip(h.buckets + ('+Inf',), h.counts):
+                cumulative += count
+                lines.append('{}_bucket{{endpoint="{}",le="{}"}} {}'.format(name, endpoint, bound, cumulative))
+            lines.append('{}_sum{{endpoint="{}"}} {}'.format(name, endpoint, h.sum))
+            lines.append('{}_count{{endpoint="{}"}} {}'.format(name, endpoint, h.count))
+
+
+class SpanExporter(object):
+    '''
+    exporter turning each request into an OpenTelemetry-style span dict
+    handed to a callback
+    '''
+
+    def __init__(self, callback):
+        '''
+        :param callback: Callable. callback(span) with name, start_time, end_time (ns), attributes, status and exception
+        '''
+        self.callback = callback
+
+    def export(self, info):
+        self.callback({
+            'name': '{} {}'.format(info.method, info.endpoint),
+            'start_time': int(info.start * 1e9),
+            'end_time': int(info.end * 1e9),
+            'attributes': {
+                'http.method': info.method,
+                'http.url': info.url,
+                'http.status_code': info.status,
+                'http.response_content_length': info.bytes,
+                'codechef.endpoint': info.endpoint,
+                'codechef.attempts': info.attempts,
+                'codechef.retries': info.retries,
+                'codechef.cache_hit': info.cache_hit,
+                'codechef.decode_time': info.decode_time,
+                'codechef.circuit': info.circuit,
+                'codechef.hedged': info.hedged,
+            },
+            'status': 'ERROR' if info.error is not None else 'OK',
+            'exception': info.error,
+        })
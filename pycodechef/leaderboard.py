@@ -0,0 +1,213 @@
+"""
+multi-contest leaderboards aggregated from streamed ranklists
+"""
+from array import array
+from bisect import bisect_left
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+SCORINGS = ('score', 'percentile')
+
+
+def _competition_ranks(totals):
+    '''
+    1-based ranks of totals, highest first, ties sharing the best rank
+    '''
+    if numpy is not None:
+        values = numpy.frombuffer(totals, dtype='d') if len(totals) else numpy.zeros(0)
+        descending = numpy.sort(-values)
+        return array('l', (numpy.searchsorted(descending, -values, 'left') + 1).astype('l').tobytes())
+    order = sorted(range(len(totals)), key=totals.__getitem__, reverse=True)
+    ranks = array('l', bytes(array('l').itemsize * len(totals)))
+    previous = None
+    for position, index in enumerate(order, 1):
+        if totals[index] != previous:
+            rank = position
+            previous = totals[index]
+        ranks[index] = rank
+    return ranks
+
+
+def _places(ranks):
+    '''
+    1-based ranks among the given rows, tied ranks sharing a place. Filtered
+    ranklists keep the global ranks, these are the ranks within the filtered rows
+    '''
+    ordered = sorted(ranks)
+    return array('l', (bisect_left(ordered, rank) + 1 for rank in ranks))
+
+
+class Leaderboard(object):
+    '''
+    Season leaderboard over many contests. Each ranklist is streamed page by
+    page and folded into per-user accumulators (array backed, updated with
+    NumPy when it is installed), so memory grows with the number of users,
+    not with the number of contests.
+    '''
+
+    def __init__(self, client, country='', institution='', institutionType='', scoring='score', prefetch=4):
+        '''
+        :param client: Codechef
+        :param country: String. Country filter of the ranklists and ratings
+        :param institution: String. Institution filter
+        :param institutionType: String. Institution type filter
+        :param scoring: String. score sums totalScore, percentile sums 100 * (1 - (place - 1) / participants) per contest,
+            place being the rank among the filtered participants
+        :param prefetch: Integer. Ranklist pages fetched ahead
+        '''
+        if scoring not in SCORINGS:
+            raise ValueError('scoring must be one of ' + ', '.join(SCORINGS))
+        self.client = client
+        self.country = country
+        self.institution = institution
+        self.institutionType = institutionType
+        self.scoring = scoring
+        self.prefetch = prefetch
+        self.contests = []
+        self.usernames = []
+        self._index = {}
+        self.total = array('d')
+        self.previous = array('d')
+        self.played = array('l')
+        self.best_rank = array('l')
+        self.rating = array('l')
+
+    def __len__(self):
+        return len(self.usernames)
+
+    def _user(self, username):
+        index = self._index.get(username)
+        if index is None:
+            index = self._index[username] = len(self.usernames)
+            self.usernames.append(username)
+            self.total.append(0.0)
+            self.played.append(0)
+            self.best_rank.append(0)
+            self.rating.append(0)
+        return index
+
+    def _ranklist(self, contest_code):
+        fields = ['rank', 'username', 'totalScore']
+        return self.client.iter_rankings(contest_code, fields, self.country, self.institution, self.institutionType,
+                                         prefetch=self.prefetch)
+
+    def _columns(self, rows):
+        usernames = []
+        ranks = array('l')
+        scores = array('d')
+        for row in rows:
+            usernames.append(row['username'])
+            ranks.append(int(row.get('rank') or 0))
+            score = row.get('totalScore')
+            scores.append(float(score) if score not in (None, '') else 0.0)
+        return usernames, ranks, scores
+
+    def add_rows(self, contest_code, rows):
+        '''
+        folds one contest's ranklist into the leaderboard, returns its number of participants
+        :param contest_code: String. Contest code
+        :param rows: Iterable of Dict with username, rank and totalScore
+        '''
+        return self._fold(contest_code, *self._columns(rows))
+
+    def _fold(self, contest_code, usernames, ranks, scores):
+        self.previous = array('d', self.total)
+        indexes = array('l', (self._user(username) for username in usernames))
+        participants = len(indexes)
+        if self.scoring == 'percentile' and participants:
+            scores = array('d', (100.0 * (1 - (place - 1) / float(participants)) for place in _places(ranks)))
+        if numpy is not None and participants:
+            where = numpy.frombuffer(indexes, dtype='l')
+            rank_values = numpy.frombuffer(ranks, dtype='l')
+            numpy.add.at(numpy.frombuffer(self.total, dtype='d'), where, numpy.frombuffer(scores, dtype='d'))
+            numpy.add.at(numpy.frombuffer(self.played, dtype='l'), where, 1)
+            best = numpy.frombuffer(self.best_rank, dtype='l')
+            unset = best[where] == 0
+            best[where[unset]] = rank_values[unset]
+            numpy.minimum.at(best, where, rank_values)
+        else:
+            for index, rank, score in zip(indexes, ranks, scores):
+                self.total[index] += score
+                self.played[index] += 1
+                if not self.best_rank[index] or rank < self.best_rank[index]:
+                    self.best_rank[index] = rank
+        self.previous.extend([0.0] * (len(self.total) - len(self.previous)))
+        self.contests.append(contest_code)
+        return participants
+
+    def add_contest(self, contest_code):
+        '''
+        streams a contest's ranklist into the leaderboard, returns its number of participants
+        :param contest_code: String. Contest code eg. COOK99
+        '''
+        return self.add_rows(contest_code, self._ranklist(contest_code))
+
+    def add_contests(self, contest_codes, max_workers=4):
+        '''
+        streams several ranklists concurrently; each is reduced to compact
+        columns by a worker and folded in input order, so the last code is
+        the last contest of previous and delta. At most max_workers reduced
+        ranklists are held at once
+        :param contest_codes: Iterable. Contest codes, oldest first
+        :param max_workers: Integer. Ranklists streamed at once
+        '''
+        window = deque()
+        with ThreadPoolExecutor(max_workers) as executor:
+            for code in contest_codes:
+                window.append((code, executor.submit(lambda code: self._columns(self._ranklist(code)), code)))
+                if len(window) >= max_workers:
+                    self._fold_next(window)
+            while window:
+                self._fold_next(window)
+
+    def _fold_next(self, window):
+        code, future = window.popleft()
+        self._fold(code, *future.result())
+
+    def join_ratings(self, contest_type='all'):
+        '''
+        streams the rating list with the same filters and attaches ratings to the users on the leaderboard
+        :param contest_type: String. Same as Codechef.get_ratings
+        '''
+        joined = 0
+        for row in self.client.iter_ratings(contest_type, ['username', 'rating'], self.country, self.institution,
+                                            self.institutionType, prefetch=self.prefetch):
+            index = self._index.get(row.get('username'))
+            if index is not None:
+                self.rating[index] = int(row.get('rating') or 0)
+                joined += 1
+        return joined
+
+    def standings(self, limit=None):
+        '''
+        leaderboard rows sorted by total: rank, username, total, contests,
+        best_rank, percentile (share of users with a total not above theirs),
+        delta (places gained with the last contest) and rating
+        :param limit: Integer. Number of rows returned
+        '''
+        ranks = _competition_ranks(self.total)
+        before = _competition_ranks(self.previous)
+        count = len(ranks)
+        order = sorted(range(count), key=ranks.__getitem__)
+        if limit:
+            order = order[:limit]
+        rows = []
+        for index in order:
+            below = count - ranks[index] + 1
+            rows.append({
+                'rank': ranks[index],
+                'username': self.usernames[index],
+                'total': self.total[index],
+                'contests': self.played[index],
+                'best_rank': self.best_rank[index],
+                'percentile': 100.0 * below / count,
+                'delta': before[index] - ranks[index] if self.previous[index] or self.played[index] > 1 else 0,
+                'rating': self.rating[index] or None,
+            })
+        return rows
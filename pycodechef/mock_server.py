@@ -0,0 +1,607 @@
+"""
+local mock of the CodeChef API for offline benchmarks and experiments.
+
+    $ python -m pycodechef.mock_server --port 8080 --latency 0.02
+
+and point a client at it with Codechef(id, secret, base_url='http://127.0.0.1:8080'),
+or skip the sockets with Codechef(id, secret, transport=MockTransport())
+"""
+import argparse
+import itertools
+import json
+import random
+import re
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from .transport import Response, Transport
+
+
+COUNTRIES = ['India', 'China', 'Russia', 'Bangladesh', 'United States', 'Japan', 'Egypt', 'Vietnam', 'Poland', 'Brazil']
+INSTITUTIONS = ['Institution {}'.format(i) for i in range(200)]
+INSTITUTION_TYPES = ['school', 'college', 'organization']
+LANGUAGES = ['C', 'C++14', 'C++17', 'PYTH 3.6', 'JAVA', 'PYPY3', 'GO', 'RUST', 'KOTLIN', 'C#']
+CATEGORIES = ['school', 'easy', 'medium', 'hard', 'challenge', 'extcontest']
+RESULTS = ['AC', 'WA', 'TLE', 'RE', 'CTE']
+PROBLEMS_PER_CONTEST = 8
+DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+def _ok(content, message='Data fetched successfully'):
+    return 200, {'status': 'OK', 'result': {'data': {'content': content, 'code': 9001, 'message': message}}}
+
+
+def _error(status, message, code=9003):
+    return status, {'status': 'error', 'result': {'errors': [{'code': code, 'message': message}]}}
+
+
+def _page(items, query, max_limit=100):
+    offset = int(query.get('offset', 0) or 0)
+    limit = min(int(query.get('limit', 10) or 10), max_limit)
+    return items[offset:offset + limit] if isinstance(items, list) else items(offset, limit)
+
+
+def _project(record, query):
+    fields = [f for f in query.get('fields', '').split(',') if f]
+    if not fields:
+        return record
+    return dict((k, v) for k, v in record.items() if k in fields)
+
+
+class MockAPI(object):
+    '''
+    in-memory state and payload generation of the mock api
+    '''
+
+    def __init__(self, ranklist_size=20000, ratings_size=50000, contests=200, users=5000, pending_polls=1, token_ttl=3600, seed=0):
+        self.ranklist_size = ranklist_size
+        self.ratings_size = ratings_size
+        self.contest_count = contests
+        self.user_count = users
+        self.pending_polls = pending_polls
+        self.token_ttl = token_ttl
+        self.seed = seed
+        self.sets = {}
+        self.todo = []
+        self.runs = {}
+        self.tokens = set()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        now = datetime.now().replace(microsecond=0)
+        self.contests = []
+        for i in range(contests):
+            start = now + timedelta(days=7 * (i - contests + 3))
+            self.contests.append({
+                'code': 'CON{:03d}'.format(i),
+                'name': 'Mock Contest {}'.format(i),
+                'startDate': start.strftime(DATE_FORMAT),
+                'endDate': (start + timedelta(hours=3)).strftime(DATE_FORMAT),
+            })
+        self.routes = [
+            ('POST', r'^/oauth/token$', self.token),
+            ('GET', r'^/contests/?$', self.contest_list),
+            ('GET', r'^/contests/([^/]+)$', self.contest_details),
+            ('GET', r'^/contests/([^/]+)/problems/([^/]+)$', self.contest_problem),
+            ('GET', r'^/rankings/([^/]+)$', self.rankings),
+            ('GET', r'^/ratings/([^/]+)$', self.ratings),
+            ('GET', r'^/country$', self.countries),
+            ('GET', r'^/language$', self.languages),
+            ('GET', r'^/institution$', self.institutions),
+            ('GET', r'^/problems/([^/]+)$', self.problems_by_category),
+            ('GET', r'^/tags/problems$', self.problems_by_tags),
+            ('GET', r'^/users$', self.user_list),
+            ('GET', r'^/users/me$', self.whoami),
+            ('GET', r'^/users/([^/]+)$', self.user),
+            ('GET', r'^/submissions/?$', self.submissions),
+            ('GET', r'^/submissions/([^/]+)$', self.submission),
+            ('POST', r'^/ide/run$', self.ide_run),
+            ('GET', r'^/ide/status$', self.ide_status),
+            ('GET', r'^/sets/?$', self.set_details),
+            ('POST', r'^/sets/add$', self.set_add),
+            ('DELETE', r'^/sets/delete$', self.set_delete),
+            ('PUT', r'^/sets/update$', self.set_update),
+            ('POST', r'^/sets/members/add$', self.member_add),
+            ('DELETE', r'^/sets/members/delete$', self.member_delete),
+            ('GET', r'^/sets/members/get$', self.member_get),
+            ('POST', r'^/todo/add$', self.todo_add),
+            ('DELETE', r'^/todo/delete/all$', self.todo_clear),
+            ('DELETE', r'^/todo/delete/?$', self.todo_delete),
+            ('GET', r'^/todo/problems$', self.todo_list),
+        ]
+        self.routes = [(method, re.compile(pattern), handler) for method, pattern, handler in self.routes]
+
+    def dispatch(self, method, path, query, body):
+        '''
+        returns (status, body dict) of a request
+        '''
+        for route_method, pattern, handler in self.routes:
+            match = pattern.match(path)
+            if match and route_method == method:
+                return handler(query, body, *match.groups())
+        return _error(404, 'No such endpoint', 9002)
+
+    def _rng(self, *key):
+        return random.Random(repr((self.seed,) + key))
+
+    def token(self, query, body):
+        token = 'mock-{}'.format(next(self._ids))
+        self.tokens.add(token)
+        return 200, {'status': 'OK', 'result': {'data': {
+            'access_token': token, 'refresh_token': 'refresh-' + token, 'expires_in': self.token_ttl,
+            'token_type': 'bearer', 'scope': 'public set todo submission'}}}
+
+    def _problem_codes(self, contest_code):
+        return ['{}P{}'.format(contest_code[-3:], i) for i in range(PROBLEMS_PER_CONTEST)]
+
+    def contest_list(self, query, body):
+        status = query.get('status')
+        now = datetime.now().strftime(DATE_FORMAT)
+        contests = self.contests
+        if status == 'past':
+            contests = [c for c in contests if c['endDate'] < now]
+        elif status == 'present':
+            contests = [c for c in contests if c['startDate'] <= now <= c['endDate']]
+        elif status == 'future':
+            contests = [c for c in contests if c['startDate'] > now]
+        reverse = query.get('sortOrder', 'desc') == 'desc'
+        contests = sorted(contests, key=lambda c: c.get(query.get('sortBy') or 'startDate', ''), reverse=reverse)
+        return _ok({'contestList': [_project(c, query) for c in _page(contests, query)], 'currentTime': int(time.time())})
+
+    def _contest(self, code):
+        for contest in self.contests:
+            if contest['code'] == code:
+                return contest
+        return {'code': code, 'name': code, 'startDate': '2018-01-01 15:00:00', 'endDate': '2018-01-11 15:00:00'}
+
+    def contest_details(self, query, body, code):
+        contest = dict(self._contest(code))
+        end = datetime.strptime(contest['endDate'], DATE_FORMAT)
+        rng = self._rng('contest', code)
+        contest.update({
+            'type': 'contest',
+            'bannerFile': 'https://example.invalid/banner.png',
+            'freezingTime': (end - timedelta(hours=1)).strftime(DATE_FORMAT),
+            'announcements': '<p>Mock announcement</p>',
+            'problemsList': [{'problemCode': p, 'contestCode': code, 'successfulSubmissions': rng.randint(0, 5000),
+                              'accuracy': round(rng.uniform(1, 90), 2)} for p in self._problem_codes(code)],
+        })
+        return _ok(_project(contest, query))
+
+    def contest_problem(self, query, body, code, problem):
+        rng = self._rng('problem', code, problem)
+        return _ok({
+            'problemCode': problem,
+            'problemName': 'Problem ' + problem,
+            'contestCode': code,
+            'author': 'setter{}'.format(rng.randint(1, 50)),
+            'body': 'Lorem ipsum dolor sit amet. ' * rng.randint(40, 160),
+            'maxTimeLimit': rng.choice([1, 2, 3]),
+            'sourceSizeLimit': 50000,
+            'languagesSupported': LANGUAGES,
+            'successfulSubmissions': rng.randint(0, 5000),
+            'totalSubmissions': rng.randint(5000, 20000),
+            'tags': ['tag{}'.format(rng.randint(1, 30)) for _ in range(3)],
+        })
+
+    def _ranking_rows(self, code):
+        problems = self._problem_codes(code)
+
+        def rows(offset, limit):
+            out = []
+            for rank in range(offset + 1, min(offset + limit, self.ranklist_size) + 1):
+                rng = self._rng('rank', code, rank)
+                out.append({
+                    'rank': rank,
+                    'username': 'user{}'.format(rng.randint(1, self.user_count * 10)),
+                    'totalTime': '{}:{:02d}:{:02d}'.format(rng.randint(0, 2), rng.randint(0, 59), rng.randint(0, 59)),
+                    'penalty': rng.randint(0, 20),
+                    'country': rng.choice(COUNTRIES),
+                    'countryCode': 'XX',
+                    'institution': rng.choice(INSTITUTIONS),
+                    'rating': rng.randint(1000, 3000),
+                    'institutionType': rng.choice(INSTITUTION_TYPES),
+                    'contestId': 1000,
+                    'contestCode': code,
+                    'totalScore': max(0, 800 - rank * 800 // max(self.ranklist_size, 1)),
+                    'problemScore': [{'problemCode': p, 'score': rng.choice([0, 100])} for p in problems],
+                })
+            return out
+        return rows
+
+    def rankings(self, query, body, code):
+        return _ok([_project(r, query) for r in _page(self._ranking_rows(code), query)])
+
+    def ratings(self, query, body, contest_type):
+        def rows(offset, limit):
+            out = []
+            for rank in range(offset + 1, min(offset + limit, self.ratings_size) + 1):
+                rng = self._rng('rating', contest_type, rank)
+                out.append({
+                    'username': 'user{}'.format(rank),
+                    'globalRank': rank,
+                    'countryCode': 'XX',
+                    'countryRank': rng.randint(1, rank),
+                    'country': rng.choice(COUNTRIES),
+                    'institution': rng.choice(INSTITUTIONS),
+                    'institutionType': rng.choice(INSTITUTION_TYPES),
+                    'rating': max(0, 3500 - rank * 3500 // max(self.ratings_size, 1)),
+                    'diff': rng.randint(-150, 150),
+                })
+            return out
+        return _ok([_project(r, query) for r in _page(rows, query)])
+
+    def _search(self, values, query):
+        search = query.get('search', '').lower()
+        return [v for v in values if v['name'].lower().startswith(search)]
+
+    def countries(self, query, body):
+        return _ok(_page(self._search([{'countryCode': 'XX', 'countryName': c, 'name': c} for c in COUNTRIES], query), query))
+
+    def languages(self, query, body):
+        return _ok(_page(self._search([{'shortName': l, 'fullName': l, 'version': '1', 'name': l} for l in LANGUAGES], query), query))
+
+    def institutions(self, query, body):
+        return _ok(_page(self._search([{'name': i} for i in INSTITUTIONS], query), query))
+
+    def _problems(self, key, count):
+        out = []
+        for i in range(count):
+            rng = self._rng('catalog', key, i)
+            out.append({
+                'problemCode': '{}{:04d}'.format(key[:3].upper(), i),
+                'problemName': 'Problem {} {}'.format(key, i),
+                'successfulSubmissions': rng.randint(0, 20000),
+                'accuracy': round(rng.uniform(1, 90), 2),
+                'tags': ['tag{}'.format(rng.randint(1, 30)) for _ in range(3)],
+            })
+        return out
+
+    def problems_by_category(self, query, body, category):
+        if category not in CATEGORIES:
+            return _error(404, 'Invalid category')
+        problems = self._problems(category, 500)
+        key = query.get('sortBy') or 'successfulSubmissions'
+        problems.sort(key=lambda p: p.get(key), reverse=query.get('sortOrder') == 'desc')
+        return _ok([_project(p, query) for p in _page(problems, query)])
+
+    def problems_by_tags(self, query, body):
+        tags = [t for t in query.get('filter', '').split(',') if t]
+        problems = [p for p in self._problems('tagged', 300) if all(t in p['tags'] for t in tags)]
+        page = _page(problems, query, 20)
+        return _ok(dict((p['problemCode'], {'code': p['problemCode'], 'tags': p['tags'], 'author': 'setter',
+                                            'solved': p['successfulSubmissions'], 'attempted': p['successfulSubmissions'] * 2,
+                                            'partiallySolved': 0}) for p in page))
+
+    def _profile(self, username):
+        rng = self._rng('user', username)
+        return {
+            'username': username,
+            'fullname': username.title(),
+            'country': {'name': rng.choice(COUNTRIES), 'code': 'XX'},
+            'state': {'name': 'State', 'code': 'ST'},
+            'city': {'name': 'City', 'code': 'CT'},
+            'rankings': {'allContestRanking': {'global': rng.randint(1, 100000), 'country': rng.randint(1, 10000)}},
+            'ratings': {'allContest': rng.randint(1000, 3000), 'long': rng.randint(1000, 3000), 'short': rng.randint(1000, 3000)},
+            'occupation': 'Student',
+            'organization': rng.choice(INSTITUTIONS),
+            'language': rng.choice(LANGUAGES),
+            'problemStats': {'solved': {'CON001': ['CON001P1', 'CON001P2']}, 'attempted': {}},
+            'submissionStats': {'AC': rng.randint(0, 500), 'WA': rng.randint(0, 500)},
+        }
+
+    def user(self, query, body, username):
+        return _ok(_project(self._profile(username), query))
+
+    def whoami(self, query, body):
+        return self.user(query, body, 'mockuser')
+
+    def user_list(self, query, body):
+        search = query.get('search', '')
+
+        def users(offset, limit):
+            return [_project(self._profile('{}{}'.format(search, i)), query) for i in range(offset, min(offset + limit, 200))]
+        return _ok(_page(users, query, 20))
+
+    def _submission(self, submission_id):
+        rng = self._rng('submission', submission_id)
+        return {
+            'id': submission_id,
+            'date': '2018-01-01 12:00:00',
+            'username': 'user{}'.format(rng.randint(1, self.user_count)),
+            'problemCode': 'CON001P{}'.format(rng.randint(0, 7)),
+            'language': rng.choice(LANGUAGES),
+            'contestCode': 'CON001',
+            'result': rng.choice(RESULTS),
+            'time': round(rng.uniform(0, 2), 2),
+            'memory': rng.randint(1000, 100000),
+        }
+
+    def submissions(self, query, body):
+        filters = tuple(sorted((k, v) for k, v in query.items() if v and k not in ('fields', 'offset', 'limit')))
+        rng = self._rng('submissions', filters)
+        start = rng.randint(1, 10 ** 7)
+        count = rng.randint(0, 60)
+
+        def rows(offset, limit):
+            out = []
+            for i in range(offset, min(offset + limit, count)):
+                record = self._submission(start + i)
+                for name in ('username', 'result', 'language', 'problemCode', 'contestCode'):
+                    if query.get(name):
+                        record[name] = query[name]
+                if query.get('year'):
+                    record['date'] = '{}-01-01 12:00:00'.format(query['year'])
+                out.append(_project(record, query))
+            return out
+        return _ok(_page(rows, query, 20))
+
+    def submission(self, query, body, submission_id):
+        try:
+            return _ok(_project(self._submission(int(submission_id)), query))
+        except ValueError:
+            return _error(404, 'Invalid submission id')
+
+    def ide_run(self, query, body):
+        params = dict(query, **body)
+        link = 'L{}'.format(next(self._ids))
+        with self._lock:
+            self.runs[link] = [0, params.get('input', '')]
+        return 200, {'status': 'OK', 'result': {'data': {'link': link, 'code': 9001}}}
+
+    def ide_status(self, query, body):
+        with self._lock:
+            run = self.runs.get(query.get('link'))
+            if run is None:
+                return _error(404, 'Invalid link')
+            run[0] += 1
+            polls, sample_input = run
+        if polls <= self.pending_polls:
+            return 200, {'status': 'OK', 'result': {'data': {'output': None, 'stderr': None, 'cmpinfo': None, 'status': 'running'}}}
+        return 200, {'status': 'OK', 'result': {'data': {'output': sample_input, 'stderr': '', 'cmpinfo': '', 'time': '0.00',
+                                                         'memory': '15232', 'signal': 0, 'status': 'AC'}}}
+
+    def set_details(self, query, body):
+        with self._lock:
+            return _ok([{'setName': name, 'description': s['description']} for name, s in sorted(self.sets.items())])
+
+    def set_add(self, query, body):
+        name = body.get('setName') or query.get('setName')
+        with self._lock:
+            if name in self.sets:
+                return _error(400, 'Set already exists')
+            self.sets[name] = {'description': body.get('description', ''), 'members': set()}
+        return _ok(None, 'Set added')
+
+    def set_delete(self, query, body):
+        with self._lock:
+            if self.sets.pop(query.get('setName'), None) is None:
+                return _error(404, 'Set not found')
+        return _ok(None, 'Set deleted')
+
+    def set_update(self, query, body):
+        name = body.get('setName')
+        with self._lock:
+            if name not in self.sets:
+                return _error(404, 'Set not found')
+            entry = self.sets.pop(name)
+            entry['description'] = body.get('description', entry['description'])
+            self.sets[body.get('setNameNew') or name] = entry
+        return _ok(None, 'Set updated')
+
+    def member_add(self, query, body):
+        with self._lock:
+            entry = self.sets.get(body.get('setName'))
+            if entry is None:
+                return _error(404, 'Set not found')
+            entry['members'].add(body.get('memberHandle'))
+        return _ok(None, 'Member added')
+
+    def member_delete(self, query, body):
+        with self._lock:
+            entry = self.sets.get(query.get('setName'))
+            if entry is None or query.get('memberHandle') not in entry['members']:
+                return _error(404, 'Member not found')
+            entry['members'].discard(query.get('memberHandle'))
+        return _ok(None, 'Member deleted')
+
+    def member_get(self, query, body):
+        with self._lock:
+            entry = self.sets.get(query.get('setName'))
+            if entry is None:
+                return _error(404, 'Set not found')
+            members = sorted(entry['members'])
+        return _ok([_project({'setName': query.get('setName'), 'memberName': m, 'country': 'India',
+                              'allContestRating': self._profile(m)['ratings']['allContest']}, query) for m in members])
+
+    def todo_add(self, query, body):
+        with self._lock:
+            code = body.get('problemCode')
+            if any(p['problemCode'] == code for p in self.todo):
+                return _error(400, 'Problem already in todo list')
+            self.todo.append({'problemCode': code, 'contestCode': body.get('contestCode')})
+        return _ok(None, 'Problem added')
+
+    def todo_clear(self, query, body):
+        with self._lock:
+            del self.todo[:]
+        return _ok(None, 'Todo list cleared')
+
+    def todo_delete(self, query, body):
+        with self._lock:
+            code = query.get('problemCode')
+            before = len(self.todo)
+            self.todo[:] = [p for p in self.todo if p['problemCode'] != code]
+            if len(self.todo) == before:
+                return _error(404, 'Problem not in todo list')
+        return _ok(None, 'Problem deleted')
+
+    def todo_list(self, query, body):
+        with self._lock:
+            return _ok({'problemsList': [_project(p, query) for p in self.todo]})
+
+
+def _pairs(values):
+    return values.items() if isinstance(values, dict) else values or ()
+
+
+class MockTransport(Transport):
+    '''
+    in-process transport answering from a MockAPI without any socket, eg.
+    for tests. Works with any base_url
+    '''
+
+    def __init__(self, api=None, **api_options):
+        '''
+        :param api: MockAPI. Shared state, a new one is built when None
+        :param api_options: passed on to MockAPI, eg. ranklist_size
+        '''
+        self.api = api or MockAPI(**api_options)
+        self.requests = 0
+
+    def request(self, method, url, params=None, data=None, headers=None, timeout=None, stream=False):
+        self.requests += 1
+        parts = urlsplit(url)
+        query = dict((k, v[-1]) for k, v in parse_qs(parts.query, keep_blank_values=True).items())
+        query.update((k, str(v)) for k, v in _pairs(params))
+        if isinstance(data, (str, bytes)):
+            body = json.loads(data)
+        else:
+            body = dict((k, str(v)) for k, v in _pairs(data))
+        if parts.path != '/oauth/token' and (headers or {}).get('Authorization', '')[7:] not in self.api.tokens:
+            status, payload = _error(401, 'Unauthorized for this resource', 9005)
+        else:
+            status, payload = self.api.dispatch(method, parts.path, query, body)
+        return Response(status, json.dumps(payload).encode('utf-8'), {'Content-Type': 'application/json'}, url=url)
+
+
+class MockServer(object):
+    '''
+    threaded http server serving MockAPI, with injectable latency and errors
+    '''
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0.0, jitter=0.0, error_rate=0.0, throttle_rate=0.0, **api_options):
+        '''
+        :param host: String. Interface to bind
+        :param port: Integer. Port to bind, 0 picks a free one
+        :param latency: Float. Seconds added to every response
+        :param jitter: Float. Extra random latency, up to this many seconds
+        :param error_rate: Float. Fraction of requests answered with 503
+        :param throttle_rate: Float. Fraction of requests answered with 429
+        :param api_options: passed on to MockAPI, eg. ranklist_size
+        '''
+        self.api = MockAPI(**api_options)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.requests = 0
+        self._random = random.Random(api_options.get('seed', 0))
+        self._lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer((host, port), self._handler())
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return 'http://{}:{}'.format(host, port)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def start(self):
+        '''
+        serves in a background thread
+        '''
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name='pycodechef-mock-server')
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def _fault(self):
+        with self._lock:
+            self.requests += 1
+            roll = self._random.random()
+            delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0)
+        if delay:
+            time.sleep(delay)
+        if roll < self.error_rate:
+            return _error(503, 'Service unavailable', 9500)
+        if roll < self.error_rate + self.throttle_rate:
+            return _error(429, 'API request limit exhausted', 9004)
+        return None
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+            def _handle(self):
+                parts = urlsplit(self.path)
+                query = dict((k, v[-1]) for k, v in parse_qs(parts.query, keep_blank_values=True).items())
+                length = int(self.headers.get('Content-Length') or 0)
+                raw = self.rfile.read(length) if length else b''
+                if raw[:1] == b'{':
+                    body = json.loads(raw.decode('utf-8'))
+                else:
+                    body = dict((k, v[-1]) for k, v in parse_qs(raw.decode('utf-8'), keep_blank_values=True).items())
+                fault = server._fault()
+                if fault is not None:
+                    status, payload = fault
+                elif parts.path != '/oauth/token' and self.headers.get('Authorization', '')[7:] not in server.api.tokens:
+                    status, payload = _error(401, 'Unauthorized for this resource', 9005)
+                else:
+                    status, payload = server.api.dispatch(self.command, parts.path, query, body)
+                data = json.dumps(payload).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                if status == 429:
+                    self.send_header('Retry-After', '1')
+                self.end_headers()
+                self.wfile.write(data)
+
+            do_GET = do_POST = do_PUT = do_DELETE = _handle
+
+        return Handler
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m pycodechef.mock_server', description='Serve a mock CodeChef API.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--jitter', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--throttle-rate', type=float, default=0.0)
+    parser.add_argument('--ranklist-size', type=int, default=20000)
+    args = parser.parse_args(argv)
+    server = MockServer(args.host, args.port, args.latency, args.jitter, args.error_rate, args.throttle_rate,
+                        ranklist_size=args.ranklist_size)
+    print('Mock CodeChef API on {}'.format(server.url))
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == '__main__':
+    main()
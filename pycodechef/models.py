@@ -0,0 +1,294 @@
+"""
+compact typed records for api results
+"""
+import math
+import sys
+from array import array
+from collections import namedtuple
+
+from .pagination import page_records
+
+
+ProblemScore = namedtuple('ProblemScore', ['problemCode', 'score'])
+
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def _int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return value
+
+
+def _float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return value
+
+
+def _number(value, default):
+    value = _float(value)
+    return value if isinstance(value, float) else default
+
+
+def _whole(value):
+    # tolerant like _int and _float: '2.5' -> 2, anything unparsable -> 0
+    number = _int(value)
+    if isinstance(number, int):
+        return number
+    number = _number(value, 0.0)
+    return int(number) if math.isfinite(number) else 0
+
+
+class Record(object):
+    '''
+    base of typed records. Subclasses list their fields in __slots__;
+    string fields named in _interned share one copy per distinct value
+    '''
+
+    __slots__ = ()
+    _interned = ()
+    _converters = {}
+
+    @classmethod
+    def from_dict(cls, data):
+        '''
+        builds a record from one decoded json object, unknown keys are dropped
+        :param data: Dict. One record of an api response
+        '''
+        self = cls.__new__(cls)
+        for name in cls.__slots__:
+            value = data.get(name.lstrip('_'))
+            if value is not None:
+                if name in cls._interned:
+                    value = _intern(value)
+                elif name in cls._converters:
+                    value = cls._converters[name](value)
+            setattr(self, name, value)
+        return self
+
+    @classmethod
+    def from_response(cls, response, key=None):
+        '''
+        builds the records of one page response
+        :param response: Dict. Decoded api response
+        :param key: String. Key holding the records when content is a dict
+        '''
+        return [cls.from_dict(record) for record in page_records(response, key)]
+
+    def as_dict(self):
+        '''
+        returns the record as a plain dict
+        '''
+        return dict((name.lstrip('_'), getattr(self, name.lstrip('_'))) for name in self.__slots__)
+
+    def __eq__(self, other):
+        # public names, so lazily parsed fields compare the same before and after their first access
+        return type(self) is type(other) and all(getattr(self, n.lstrip('_')) == getattr(other, n.lstrip('_')) for n in self.__slots__)
+
+    def __ne__(self, other):
+        return not self == other
+
+    # records are mutable, so like dicts they are unhashable
+    __hash__ = None
+
+    def __repr__(self):
+        return '{}({})'.format(type(self).__name__, ', '.join('{}={!r}'.format(k, v) for k, v in self.as_dict().items() if v is not None))
+
+
+class RankingRow(Record):
+    '''
+    one row of a contest ranklist, problemScore is parsed on first access
+    '''
+
+    __slots__ = ('rank', 'username', 'totalTime', 'penalty', 'country', 'countryCode', 'institution',
+                 'rating', 'institutionType', 'contestId', 'contestCode', 'totalScore', '_problemScore')
+    _interned = ('country', 'countryCode', 'institution', 'institutionType', 'contestCode')
+    _converters = {'rank': _int, 'penalty': _int, 'rating': _int, 'contestId': _int, 'totalScore': _float}
+
+    @property
+    def problemScore(self):
+        '''
+        tuple of ProblemScore, one per problem attempted
+        '''
+        raw = self._problemScore
+        if raw is not None and not isinstance(raw, tuple):
+            raw = self._problemScore = tuple(
+                ProblemScore(_intern(item.get('problemCode')), _float(item.get('score'))) for item in raw)
+        return raw
+
+
+class RatingRow(Record):
+    '''
+    one row of a rating list
+    '''
+
+    __slots__ = ('username', 'globalRank', 'countryCode', 'countryRank', 'country', 'institution',
+                 'institutionType', 'rating', 'diff')
+    _interned = ('countryCode', 'country', 'institution', 'institutionType')
+    _converters = {'globalRank': _int, 'countryRank': _int, 'rating': _int, 'diff': _int}
+
+
+class ContestSummary(Record):
+    '''
+    one contest of the contest list
+    '''
+
+    __slots__ = ('code', 'name', 'startDate', 'endDate')
+
+
+class UserProfile(Record):
+    '''
+    profile returned by get_user. Nested rankings, ratings and stats are kept
+    as returned by the api
+    '''
+
+    __slots__ = ('username', 'fullname', 'country', 'state', 'city', 'rankings', 'ratings', 'occupation',
+                 'organization', 'language', 'problemStats', 'submissionStats')
+    _interned = ('occupation', 'organization')
+
+    @classmethod
+    def from_dict(cls, data):
+        self = super(UserProfile, cls).from_dict(data)
+        for name in ('country', 'state', 'city'):
+            value = getattr(self, name)
+            if isinstance(value, dict):
+                setattr(self, name, _intern(value.get('name')))
+        return self
+
+    @classmethod
+    def from_response(cls, response, key=None):
+        '''
+        builds the profile of a get_user response
+        :param response: Dict. Decoded get_user response
+        '''
+        return cls.from_dict(response['result']['data']['content'])
+
+
+class ColumnTable(object):
+    '''
+    column-oriented table of records. Numeric columns are array backed and
+    string columns are dictionary encoded
+    '''
+
+    columns = {}
+
+    def __init__(self, columns=None):
+        '''
+        :param columns: Dict. Column name to array typecode ('l', 'd'), 'category' or 'str'
+        '''
+        if columns is not None:
+            self.columns = columns
+        self._data = {}
+        self._categories = {}
+        self._codes = {}
+        for name, kind in self.columns.items():
+            if kind == 'category':
+                self._data[name] = array('l')
+                self._categories[name] = []
+                self._codes[name] = {}
+            elif kind == 'str':
+                self._data[name] = []
+            else:
+                self._data[name] = array(kind)
+        self._length = 0
+
+    def __len__(self):
+        return self._length
+
+    @classmethod
+    def from_records(cls, records, columns=None):
+        '''
+        builds a table from dicts or Record objects, eg. an iter_rankings result
+        :param records: Iterable of Dict or Record
+        :param columns: Dict. Same as ColumnTable
+        '''
+        table = cls(columns)
+        for record in records:
+            table.append(record)
+        return table
+
+    def append(self, record):
+        '''
+        appends one dict or Record
+        '''
+        get = record.get if isinstance(record, dict) else lambda name: getattr(record, name, None)
+        for name, kind in self.columns.items():
+            value = get(name)
+            if kind == 'category':
+                codes = self._codes[name]
+                code = codes.get(value)
+                if code is None:
+                    code = codes[value] = len(self._categories[name])
+                    self._categories[name].append(value)
+                self._data[name].append(code)
+            elif kind == 'str':
+                self._data[name].append(value)
+            elif kind == 'd':
+                self._data[name].append(_number(value, float('nan')))
+            else:
+                self._data[name].append(_whole(value))
+        self._length += 1
+
+    def column(self, name):
+        '''
+        values of a column; arrays for numeric columns, lists otherwise
+        :param name: String. Column name
+        '''
+        if self.columns[name] == 'category':
+            categories = self._categories[name]
+            return [categories[code] for code in self._data[name]]
+        return self._data[name]
+
+    def row(self, index):
+        '''
+        one row as a dict
+        :param index: Integer. Row index
+        '''
+        row = {}
+        for name, kind in self.columns.items():
+            value = self._data[name][index]
+            row[name] = self._categories[name][value] if kind == 'category' else value
+        return row
+
+    def __iter__(self):
+        for index in range(self._length):
+            yield self.row(index)
+
+
+class RankingTable(ColumnTable):
+    '''
+    column-oriented contest ranklist
+    '''
+
+    columns = {
+        'rank': 'l',
+        'username': 'str',
+        'totalScore': 'd',
+        'penalty': 'l',
+        'rating': 'l',
+        'country': 'category',
+        'institution': 'category',
+        'institutionType': 'category',
+    }
+
+
+class RatingTable(ColumnTable):
+    '''
+    column-oriented rating list
+    '''
+
+    columns = {
+        'globalRank': 'l',
+        'countryRank': 'l',
+        'username': 'str',
+        'rating': 'l',
+        'diff': 'l',
+        'country': 'category',
+        'institution': 'category',
+        'institutionType': 'category',
+    }
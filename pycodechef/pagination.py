@@ -0,0 +1,67 @@
+"""
+auto-paginating iterators with read-ahead
+"""
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from .exceptions import APIError
+
+
+def page_records(response, key=None):
+    '''
+    extracts the list of records from a list endpoint response
+    :param response: Dict. Decoded api response
+    :param key: String. Key holding the records when content is a dict, eg. contestList
+    '''
+    if not isinstance(response, dict) or response.get('status') != 'OK':
+        raise APIError('page request failed', response)
+    content = response.get('result', {}).get('data', {}).get('content')
+    if not content:
+        return []
+    if isinstance(content, dict):
+        if key is not None:
+            return content.get(key) or []
+        return list(content.values())
+    return content
+
+
+def paginate(fetch, limit, prefetch=2, key=None, start=0):
+    '''
+    yields records across all pages, keeping up to prefetch pages in flight
+    while the current one is consumed. The first page is fetched alone so a
+    one-page list costs one request, and no page is read ahead once a short
+    (last) page has come back
+    :param fetch: Callable. fetch(offset, limit) returning one page response
+    :param limit: Integer. Page size
+    :param prefetch: Integer. Number of pages fetched ahead of the current one
+    :param key: String. passed to page_records
+    :param start: Integer. Offset of the first record
+    '''
+    def is_last(future):
+        if not future.done() or future.exception() is not None:
+            return False
+        try:
+            return len(page_records(future.result(), key)) < limit
+        except APIError:
+            return False
+
+    executor = ThreadPoolExecutor(max(prefetch, 1))
+    pending = deque([executor.submit(fetch, start, limit)])
+    next_offset = start + limit
+    try:
+        while pending:
+            records = page_records(pending.popleft().result(), key)
+            if len(records) < limit:
+                for record in records:
+                    yield record
+                return
+            if not any(is_last(future) for future in pending):
+                while len(pending) < max(prefetch, 1):
+                    pending.append(executor.submit(fetch, next_offset, limit))
+                    next_offset += limit
+            for record in records:
+                yield record
+    finally:
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=False)
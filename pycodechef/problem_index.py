@@ -0,0 +1,230 @@
+"""
+local searchable index of problems
+"""
+import json
+import sqlite3
+import threading
+import time
+from bisect import bisect_left
+
+
+CATEGORIES = ('school', 'easy', 'medium', 'hard', 'challenge', 'extcontest')
+SORT_KEYS = ('successfulSubmissions', 'accuracy', 'problemCode', 'problemName')
+
+
+def _number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class ProblemIndex(object):
+    '''
+    In-memory problem index with tag intersection, prefix search on code and
+    name, and sorting on successfulSubmissions or accuracy. Optionally backed
+    by sqlite so it survives restarts.
+    '''
+
+    def __init__(self, path=None):
+        '''
+        :param path: String. sqlite file backing the index, None keeps it in memory only
+        '''
+        self.problems = {}
+        self.tags = {}
+        self.refreshed = {}
+        self._by_code = []
+        self._by_name = []
+        self._orders = {}
+        self._ranks = {}
+        self._dirty = False
+        self._lock = threading.RLock()
+        self._db = None
+        if path is not None:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            with self._db:
+                self._db.execute('CREATE TABLE IF NOT EXISTS problems (code TEXT PRIMARY KEY, data TEXT)')
+                self._db.execute('CREATE TABLE IF NOT EXISTS categories (name TEXT PRIMARY KEY, refreshed REAL)')
+            for code, data in self._db.execute('SELECT code, data FROM problems'):
+                self._insert(json.loads(data))
+            self.refreshed.update(self._db.execute('SELECT name, refreshed FROM categories'))
+
+    def __len__(self):
+        return len(self.problems)
+
+    def __contains__(self, code):
+        return code in self.problems
+
+    def get(self, code):
+        return self.problems.get(code)
+
+    def _insert(self, problem):
+        code = problem['problemCode']
+        old = self.problems.get(code)
+        if old is not None:
+            for tag in old.get('tags', ()):
+                self.tags.get(tag.lower(), set()).discard(code)
+        self.problems[code] = problem
+        for tag in problem.get('tags', ()):
+            self.tags.setdefault(tag.lower(), set()).add(code)
+        self._dirty = True
+
+    def _remove(self, code):
+        problem = self.problems.pop(code, None)
+        if problem is not None:
+            for tag in problem.get('tags', ()):
+                self.tags.get(tag.lower(), set()).discard(code)
+            self._dirty = True
+
+    def add(self, records, **extra):
+        '''
+        merges problem records into the index
+        :param records: Iterable of Dict. Records from the category, tag or contest problem endpoints
+        :param extra: fields set on every record, eg. category='easy'
+        '''
+        return len(self._add(records, extra))
+
+    def _add(self, records, extra):
+        # records are often a paginated network stream, pull them all before locking so searches never wait on it
+        records = [(record.get('problemCode') or record.get('code'), record) for record in records]
+        rows = []
+        with self._lock:
+            for code, record in records:
+                if not code:
+                    continue
+                problem = dict(self.problems.get(code, {'problemCode': code}))
+                for key, value in record.items():
+                    if key == 'code':
+                        continue
+                    if key == 'tags':
+                        value = sorted(set(problem.get('tags', [])) | set(value or []))
+                    problem[key] = value
+                problem.update(extra)
+                self._insert(problem)
+                rows.append((code, json.dumps(problem)))
+            if self._db is not None and rows:
+                with self._db:
+                    self._db.executemany('INSERT OR REPLACE INTO problems VALUES (?, ?)', rows)
+        return [code for code, _ in rows]
+
+    def refresh_category(self, client, category):
+        '''
+        pulls every problem of a category, dropping the ones that have left it
+        :param client: Codechef
+        :param category: String. One of CATEGORIES
+        '''
+        fields = ['problemCode', 'problemName', 'successfulSubmissions', 'accuracy']
+        codes = set(self._add(client.iter_problems_by_category(category, fields), {'category': category}))
+        now = time.time()
+        with self._lock:
+            gone = [code for code, p in self.problems.items() if p.get('category') == category and code not in codes]
+            for code in gone:
+                self._remove(code)
+            self.refreshed[category] = now
+            if self._db is not None:
+                with self._db:
+                    self._db.executemany('DELETE FROM problems WHERE code = ?', [(code,) for code in gone])
+                    self._db.execute('INSERT OR REPLACE INTO categories VALUES (?, ?)', (category, now))
+        return len(codes)
+
+    def refresh(self, client, max_age=86400, categories=CATEGORIES):
+        '''
+        re-pulls only the categories older than max_age seconds, returns their names
+        :param client: Codechef
+        :param max_age: Float. Seconds after which a category is stale
+        :param categories: Iterable. Categories to keep fresh
+        '''
+        now = time.time()
+        stale = [c for c in categories if now - self.refreshed.get(c, 0) > max_age]
+        for category in stale:
+            self.refresh_category(client, category)
+        return stale
+
+    def add_tagged(self, client, tags):
+        '''
+        pulls the problems having all of tags and records their tags
+        :param client: Codechef
+        :param tags: List. Tags or authors
+        '''
+        fields = ['code', 'tags', 'author', 'solved', 'attempted', 'partiallySolved']
+        return self.add(client.iter_problems_by_tags(tags, fields))
+
+    def add_contest(self, client, contest_code, max_workers=8):
+        '''
+        pulls every problem of a contest
+        :param client: Codechef
+        :param contest_code: String. Contest code
+        :param max_workers: Integer. Maximum number of requests in flight
+        '''
+        records = []
+        for result in client.get_contest_problems(contest_code, max_workers=max_workers):
+            if result.error is None:
+                # the response may be shared with the client's cache, copy it rather than drop the body in place
+                content = result.result['result']['data']['content']
+                records.append(dict((key, value) for key, value in content.items() if key != 'body'))
+        return self.add(records, contestCode=contest_code)
+
+    def _rebuild(self):
+        self._by_code = sorted((code.lower(), code) for code in self.problems)
+        self._by_name = sorted((p.get('problemName', '').lower(), code) for code, p in self.problems.items() if p.get('problemName'))
+        for sort_by in SORT_KEYS:
+            order = sorted(self.problems, key=self._sort_key(sort_by))
+            self._orders[sort_by] = order
+            self._ranks[sort_by] = dict((code, rank) for rank, code in enumerate(order))
+        self._dirty = False
+
+    def _sort_key(self, sort_by):
+        # ties are broken on the code so descending order is the exact reverse of ascending
+        if sort_by in ('successfulSubmissions', 'accuracy'):
+            def key(code):
+                value = _number(self.problems[code].get(sort_by))
+                return (value is not None, value or 0, code)
+        else:
+            def key(code):
+                return (self.problems[code].get(sort_by) or '', code)
+        return key
+
+    @staticmethod
+    def _prefixed(entries, prefix):
+        start = bisect_left(entries, (prefix,))
+        codes = set()
+        for key, code in entries[start:]:
+            if not key.startswith(prefix):
+                break
+            codes.add(code)
+        return codes
+
+    def search(self, tags=(), prefix=None, sort_by='successfulSubmissions', descending=True, limit=None):
+        '''
+        problems having every tag and whose code or name starts with prefix
+        :param tags: Iterable. Tags that must all be present
+        :param prefix: String. Case-insensitive prefix of the problem code or name
+        :param sort_by: String. One of successfulSubmissions, accuracy, problemCode, problemName
+        :param descending: Boolean. Sort order
+        :param limit: Integer. Maximum number of problems returned
+        '''
+        if sort_by not in SORT_KEYS:
+            raise ValueError('sort_by must be one of ' + ', '.join(SORT_KEYS))
+        with self._lock:
+            if self._dirty:
+                self._rebuild()
+            codes = None
+            for tag in sorted((t.lower() for t in tags), key=lambda t: len(self.tags.get(t, ()))):
+                tagged = self.tags.get(tag, set())
+                codes = set(tagged) if codes is None else codes & tagged
+                if not codes:
+                    return []
+            if prefix:
+                prefix = prefix.lower()
+                matching = self._prefixed(self._by_code, prefix) | self._prefixed(self._by_name, prefix)
+                codes = matching if codes is None else codes & matching
+            if codes is None:
+                order = self._orders[sort_by]
+                codes = order[::-1] if descending else order
+            else:
+                codes = sorted(codes, key=self._ranks[sort_by].__getitem__, reverse=descending)
+            return [self.problems[code] for code in (codes[:limit] if limit else codes)]
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
@@ -0,0 +1,178 @@
+"""
+client-side rate limiting with adaptive backoff
+"""
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+from .exceptions import RateLimitError
+
+
+THROTTLE_MARKERS = (b'limit exhausted', b'rate limit', b'too many requests')
+
+
+def endpoint_family(url):
+    '''
+    first path segment of an endpoint url, eg. users, rankings, sets
+    :param url: String. endpoint url
+    '''
+    return urlsplit(url).path.lstrip('/').split('/', 1)[0]
+
+
+def is_throttled(response):
+    '''
+    tells whether a response is a rate-limit or 5xx answer worth retrying
+    :param response: requests.Response
+    '''
+    if response.status_code == 429 or response.status_code >= 500:
+        return True
+    head = response.content[:512].lower()
+    return b'error' in head and any(marker in head for marker in THROTTLE_MARKERS)
+
+
+def retry_after(response):
+    '''
+    seconds asked for by a Retry-After header, None if absent
+    :param response: requests.Response
+    '''
+    value = response.headers.get('Retry-After')
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket(object):
+    '''
+    thread-safe token bucket
+    '''
+
+    def __init__(self, rate, capacity=None):
+        '''
+        :param rate: Float. Tokens added per second
+        :param capacity: Integer. Maximum burst, defaults to rate
+        '''
+        self.rate = float(rate)
+        self.capacity = float(capacity or max(rate, 1))
+        self.tokens = self.capacity
+        self.paused_until = 0.0
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def pause(self, seconds):
+        '''
+        stops handing out tokens for the given number of seconds
+        '''
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            self.tokens = 0.0
+
+    def acquire(self):
+        '''
+        blocks until a token is available
+        '''
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if now < self.paused_until:
+                    wait = self.paused_until - now
+                elif self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                else:
+                    wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class RateLimiter(object):
+    '''
+    token buckets per endpoint family with exponential backoff and jitter
+    on throttled responses
+    '''
+
+    def __init__(self, rate=10, capacity=None, families=None, max_attempts=5, base_delay=0.5, max_delay=60):
+        '''
+        :param rate: Float. Requests per second for families not listed in families
+        :param capacity: Integer. Burst size for those families
+        :param families: Dict. Family name (eg. users, rankings, ide) to rate or (rate, capacity)
+        :param max_attempts: Integer. Attempts before giving up with RateLimitError
+        :param base_delay: Float. First backoff delay in seconds
+        :param max_delay: Float. Upper bound of a single backoff delay
+        '''
+        self.rate = rate
+        self.capacity = capacity
+        self.families = dict(families or {})
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.throttled = 0
+        self._buckets = {}
+        self._waiting = 0
+        self._lock = threading.Lock()
+
+    @property
+    def queue_depth(self):
+        '''
+        number of requests currently waiting for a token or backing off
+        '''
+        return self._waiting
+
+    def bucket(self, family):
+        '''
+        token bucket of an endpoint family
+        :param family: String. Endpoint family
+        '''
+        with self._lock:
+            bucket = self._buckets.get(family)
+            if bucket is None:
+                limits = self.families.get(family, (self.rate, self.capacity))
+                if not isinstance(limits, (tuple, list)):
+                    limits = (limits, None)
+                bucket = self._buckets[family] = TokenBucket(*limits)
+            return bucket
+
+    def backoff(self, attempt, response):
+        '''
+        delay before the next attempt, honoring Retry-After
+        :param attempt: Integer. Number of attempts made so far
+        :param response: requests.Response. Throttled response
+        '''
+        delay = retry_after(response)
+        if delay is None:
+            delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        return delay
+
+    def call(self, url, send, idempotent=True):
+        '''
+        sends a request within the limits of its family, retrying throttled responses
+        :param url: String. endpoint url
+        :param send: Callable. Sends the request and returns a requests.Response
+        :param idempotent: Boolean. Whether 5xx answers may be retried, rate-limit answers always are
+        '''
+        bucket = self.bucket(endpoint_family(url))
+        for attempt in range(1, self.max_attempts + 1):
+            with self._lock:
+                self._waiting += 1
+            try:
+                bucket.acquire()
+            finally:
+                with self._lock:
+                    self._waiting -= 1
+            response = send()
+            if not is_throttled(response) or (not idempotent and response.status_code >= 500):
+                return response
+            with self._lock:
+                self.throttled += 1
+            if attempt < self.max_attempts:
+                bucket.pause(self.backoff(attempt, response))
+        raise RateLimitError('throttled after {} attempts: {}'.format(self.max_attempts, url), response)
@@ -0,0 +1,239 @@
+"""
+per-endpoint circuit breaking and hedged requests
+"""
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+
+from .exceptions import CircuitOpenError
+from .instrumentation import endpoint_name
+
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class _Circuit(object):
+    __slots__ = ('state', 'failures', 'opened_at', 'trials')
+
+    def __init__(self):
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trials = 0
+
+
+class CircuitBreaker(object):
+    '''
+    One circuit per endpoint template. failure_threshold consecutive failures
+    (errors or 5xx) open it and requests fail fast with CircuitOpenError; after
+    recovery_timeout seconds it lets half_open_requests trial requests through
+    (half open), closing again on success and reopening on failure.
+    '''
+
+    def __init__(self, failure_threshold=5, recovery_timeout=30, half_open_requests=1, stale_fallback=True):
+        '''
+        :param failure_threshold: Integer. Consecutive failures that open a circuit
+        :param recovery_timeout: Float. Seconds a circuit stays open before a trial request
+        :param half_open_requests: Integer. Trial requests let through while half open
+        :param stale_fallback: Boolean. GETs refused by an open circuit return expired cached data when there is some
+        '''
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_requests = half_open_requests
+        self.stale_fallback = stale_fallback
+        self.rejected = 0
+        self._circuits = {}
+        self._lock = threading.Lock()
+
+    def _circuit(self, endpoint):
+        circuit = self._circuits.get(endpoint)
+        if circuit is None:
+            circuit = self._circuits[endpoint] = _Circuit()
+        return circuit
+
+    def state(self, url):
+        '''
+        state of the circuit of a url: closed, open or half_open
+        '''
+        with self._lock:
+            circuit = self._circuits.get(endpoint_name(url))
+            return CLOSED if circuit is None else circuit.state
+
+    def states(self):
+        '''
+        dict of endpoint template -> state
+        '''
+        with self._lock:
+            return dict((endpoint, circuit.state) for endpoint, circuit in self._circuits.items())
+
+    def before(self, url):
+        '''
+        raises CircuitOpenError if a request to url must not be sent, returns the circuit state otherwise
+        '''
+        endpoint = endpoint_name(url)
+        with self._lock:
+            circuit = self._circuit(endpoint)
+            if circuit.state == OPEN:
+                retry_in = circuit.opened_at + self.recovery_timeout - time.monotonic()
+                if retry_in > 0:
+                    self.rejected += 1
+                    raise CircuitOpenError('circuit of {} is open'.format(endpoint), endpoint, retry_in)
+                circuit.state = HALF_OPEN
+                circuit.trials = 0
+            if circuit.state == HALF_OPEN:
+                if circuit.trials >= self.half_open_requests:
+                    self.rejected += 1
+                    raise CircuitOpenError('circuit of {} is half open'.format(endpoint), endpoint, 0)
+                circuit.trials += 1
+            return circuit.state
+
+    def record(self, url, success):
+        '''
+        reports the outcome of a request let through by before()
+        '''
+        with self._lock:
+            circuit = self._circuit(endpoint_name(url))
+            if success:
+                circuit.state = CLOSED
+                circuit.failures = 0
+            else:
+                circuit.failures += 1
+                if circuit.state == HALF_OPEN or circuit.failures >= self.failure_threshold:
+                    circuit.state = OPEN
+                    circuit.opened_at = time.monotonic()
+
+
+class Hedger(object):
+    '''
+    Sends a duplicate of a GET still unanswered after the given percentile of
+    its endpoint's recent latencies and keeps whichever response comes first.
+    Requests of hedged endpoints run on their own thread so the caller returns
+    as soon as either copy answers; duplicates go through the pool. At most
+    budget of the requests are hedged, so a slow api gets at most that much
+    extra load.
+    '''
+
+    def __init__(self, percentile=0.95, min_delay=0.01, window=200, min_samples=20, budget=0.1, max_workers=32):
+        '''
+        :param percentile: Float. Latency percentile after which the duplicate is sent
+        :param min_delay: Float. Lower bound of the hedge delay in seconds
+        :param window: Integer. Latencies remembered per endpoint
+        :param min_samples: Integer. Latencies needed before an endpoint is hedged
+        :param budget: Float. Maximum fraction of requests hedged
+        :param max_workers: Integer. Threads sending hedged requests
+        '''
+        self.percentile = percentile
+        self.min_delay = min_delay
+        self.window = window
+        self.min_samples = min_samples
+        self.budget = budget
+        self.requests = 0
+        self.hedged = 0
+        self.won = 0
+        self._latencies = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers)
+
+    def delay(self, url):
+        '''
+        seconds after which a duplicate of a request to url is sent, None to not hedge it
+        '''
+        with self._lock:
+            latencies = self._latencies.get(endpoint_name(url))
+            if latencies is None or len(latencies) < self.min_samples:
+                return None
+            ordered = sorted(latencies)
+        return max(ordered[min(int(self.percentile * len(ordered)), len(ordered) - 1)], self.min_delay)
+
+    def observe(self, url, seconds):
+        endpoint = endpoint_name(url)
+        with self._lock:
+            latencies = self._latencies.get(endpoint)
+            if latencies is None:
+                latencies = self._latencies[endpoint] = deque(maxlen=self.window)
+            latencies.append(seconds)
+
+    def call(self, url, send):
+        '''
+        sends the request; when it is still unanswered after the hedge delay a
+        duplicate is sent from the pool and the first response to complete
+        without failing is returned, the other one is closed once it arrives.
+        Returns (response, hedged)
+        :param url: String. endpoint url
+        :param send: Callable. Sends the request
+        '''
+        start = time.monotonic()
+        with self._lock:
+            self.requests += 1
+            exhausted = self.hedged >= self.budget * self.requests
+        delay = self.delay(url)
+        if delay is None or exhausted:
+            response = send()
+            self.observe(url, time.monotonic() - start)
+            return response, False
+
+        # the request runs on its own thread so the caller is free to return with the duplicate's response
+        primary = _spawn(send)
+        if wait([primary], delay).done:
+            return self._finish(url, start, primary, False)
+        with self._lock:
+            reserved = self.hedged < self.budget * self.requests
+            if reserved:
+                self.hedged += 1
+        if not reserved:
+            return self._finish(url, start, primary, False)
+        duplicate = self._executor.submit(send)
+
+        pending = set([primary, duplicate])
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            winner = next((f for f in (primary, duplicate) if f in done and f.exception() is None), None)
+            if winner is not None:
+                break
+        else:
+            winner = primary
+        loser = duplicate if winner is primary else primary
+        loser.add_done_callback(_close_response)
+        if winner is duplicate:
+            with self._lock:
+                self.won += 1
+        return self._finish(url, start, winner, True)
+
+    def _finish(self, url, start, future, hedged):
+        response = future.result()
+        self.observe(url, time.monotonic() - start)
+        return response, hedged
+
+    def stats(self):
+        return {
+            'requests': self.requests,
+            'hedged': self.hedged,
+            'won': self.won,
+        }
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+
+
+def _spawn(fn):
+    '''
+    runs fn on a new daemon thread, returns a Future of its result
+    '''
+    future = Future()
+
+    def run():
+        if future.set_running_or_notify_cancel():
+            try:
+                future.set_result(fn())
+            except BaseException as err:
+                future.set_exception(err)
+    threading.Thread(target=run, daemon=True).start()
+    return future
+
+
+def _close_response(future):
+    if future.exception() is None:
+        future.result().close()
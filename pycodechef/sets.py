@@ -0,0 +1,92 @@
+"""
+declarative sync of set membership
+"""
+from collections import namedtuple
+
+from .bulk import fetch_many
+from .exceptions import APIError
+
+
+SetSyncResult = namedtuple('SetSyncResult', ['set_name', 'created', 'updated', 'added', 'removed', 'failed', 'error'])
+SetSyncResult.__doc__ = '''
+outcome of syncing one set: handles added and removed, failed maps each
+handle whose mutation failed to its exception, error is set when the set
+itself could not be created, updated or read
+'''
+
+
+def _content(response, what):
+    if not isinstance(response, dict) or response.get('status') != 'OK':
+        raise APIError('could not ' + what, response)
+    return response['result']['data']['content'] or []
+
+
+def sync_sets(client, sets, max_workers=8, descriptions=None):
+    '''
+    makes the members of every set equal to the desired ones, creating sets
+    and updating descriptions as needed. Only the missing handles are added
+    and the extra ones removed, all concurrently on one worker pool so the
+    client's rate limiter paces them. Handles are compared case-insensitively
+    :param client: Codechef
+    :param sets: Dict. set name -> desired handles
+    :param max_workers: Integer. Maximum number of requests in flight
+    :param descriptions: Dict. set name -> description, sets left out keep theirs
+    '''
+    for set_name, desired in sets.items():
+        if isinstance(desired, str):
+            raise ValueError('members of {} must be an iterable of handles, not a string'.format(set_name))
+    descriptions = descriptions or {}
+    existing = dict((s['setName'], s.get('description')) for s in _content(client.get_set_details(), 'list sets'))
+
+    reports = {}
+    mutations = []
+    for set_name, desired in sets.items():
+        description = descriptions.get(set_name)
+        desired = dict((handle.lower(), handle) for handle in desired)
+        created = updated = False
+        try:
+            if set_name not in existing:
+                _content(client.add_set(set_name, description or ''), 'create set ' + set_name)
+                created = True
+                current = {}
+            else:
+                if description is not None and description != existing[set_name]:
+                    _content(client.update_set(set_name, set_name, description), 'update set ' + set_name)
+                    updated = True
+                members = _content(client.get_member_set(set_name, ['memberName']), 'read members of ' + set_name)
+                current = dict((m['memberName'].lower(), m['memberName']) for m in members)
+        except APIError as err:
+            reports[set_name] = SetSyncResult(set_name, created, updated, [], [], {}, err)
+            continue
+        reports[set_name] = SetSyncResult(set_name, created, updated, [], [], {}, None)
+        mutations.extend(('add', set_name, desired[key]) for key in desired if key not in current)
+        mutations.extend(('delete', set_name, current[key]) for key in current if key not in desired)
+
+    def mutate(mutation):
+        action, set_name, handle = mutation
+        if action == 'add':
+            return client.add_member_set(set_name, handle)
+        return client.delete_member_set(set_name, handle)
+
+    for result in fetch_many(mutate, mutations, max_workers):
+        action, set_name, handle = result.key
+        report = reports[set_name]
+        if result.error is not None:
+            report.failed[handle] = result.error
+        elif action == 'add':
+            report.added.append(handle)
+        else:
+            report.removed.append(handle)
+    return reports
+
+
+def sync_set(client, set_name, desired_members, description=None, max_workers=8):
+    '''
+    makes the members of a set equal to desired_members, see sync_sets
+    :param client: Codechef
+    :param set_name: String. Set name, created if missing
+    :param desired_members: Iterable. Handles the set should contain
+    :param description: String. Description of the set, left unchanged when None
+    :param max_workers: Integer. Maximum number of requests in flight
+    '''
+    return sync_sets(client, {set_name: desired_members}, max_workers, {set_name: description})[set_name]
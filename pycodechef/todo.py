@@ -0,0 +1,132 @@
+"""
+bulk and declarative todo list updates
+"""
+from collections import OrderedDict, namedtuple
+
+from .bulk import fetch_many
+from .exceptions import APIError
+
+
+TodoSyncResult = namedtuple('TodoSyncResult', ['outcomes', 'failed', 'cleared', 'calls'])
+TodoSyncResult.__doc__ = '''
+outcome of a bulk todo update. outcomes maps every problem code to added,
+removed, replaced (contest changed), kept, readded (cleared and added
+back), absent or failed; failed maps
+the failed ones to their exception; cleared tells whether delete_todo_all
+was used; calls is the number of mutating requests sent
+'''
+
+
+def _ok(response, what):
+    if not isinstance(response, dict) or response.get('status') != 'OK':
+        raise APIError('could not ' + what, response)
+    return response
+
+
+def _problems(problems):
+    return OrderedDict(problems.items() if isinstance(problems, dict) else problems)
+
+
+def current_todo(client):
+    '''
+    problem code -> contest code of the problems on the todo list
+    :param client: Codechef
+    '''
+    content = _ok(client.get_todo_list(['problemCode', 'contestCode']), 'read the todo list')['result']['data']['content']
+    problems = content.get('problemsList') if isinstance(content, dict) else content
+    return OrderedDict((p['problemCode'], p.get('contestCode')) for p in problems or ())
+
+
+def _apply(client, plan, contests, outcomes, max_workers):
+    def mutate(code):
+        for action in plan[code]:
+            if action == 'delete':
+                response = _ok(client.delete_problem_todo(code), 'delete ' + code)
+            else:
+                response = _ok(client.add_problem_todo(code, contests[code]), 'add ' + code)
+        return response
+
+    failed = {}
+    for result in fetch_many(mutate, list(plan), max_workers):
+        if result.error is not None:
+            outcomes[result.key] = 'failed'
+            failed[result.key] = result.error
+    return failed
+
+
+def _outcome(steps):
+    if steps == ('delete', 'add'):
+        return 'replaced'
+    return 'removed' if steps == ('delete',) else 'added'
+
+
+def sync_todo(client, desired_problems, max_workers=8, allow_clear=True):
+    '''
+    makes the todo list equal to desired_problems with the fewest mutating
+    calls: only the missing problems are added and the extra ones deleted,
+    unless clearing the list with delete_todo_all and adding everything back
+    takes fewer calls. Mutations run concurrently on a worker pool, paced by
+    the client's rate limiter. After a clear, the problems whose re-add failed
+    are missing from the list, up to all of them if the api is down
+    :param client: Codechef
+    :param desired_problems: Dict or pairs. problem code -> contest code, None keeps the current one
+    :param max_workers: Integer. Maximum number of requests in flight
+    :param allow_clear: Boolean. Allow delete_todo_all
+    '''
+    desired = _problems(desired_problems)
+    current = current_todo(client)
+    plan = OrderedDict()
+    for code in current:
+        if code not in desired:
+            plan[code] = ('delete',)
+    for code, contest in desired.items():
+        if code not in current:
+            plan[code] = ('add',)
+        elif contest and current[code] != contest:
+            plan[code] = ('delete', 'add')
+    calls = sum(len(steps) for steps in plan.values())
+
+    outcomes = OrderedDict((code, 'removed') for code in current if code not in desired)
+    for code in desired:
+        outcomes[code] = _outcome(plan[code]) if code in plan else 'kept'
+    cleared = allow_clear and 1 + len(desired) < calls
+    if cleared:
+        _ok(client.delete_todo_all(), 'clear the todo list')
+        for code in desired:
+            if outcomes[code] == 'kept':
+                outcomes[code] = 'readded'
+        plan = OrderedDict((code, ('add',)) for code in desired)
+        calls = 1 + len(plan)
+    contests = dict((code, desired[code] or current.get(code)) for code in desired)
+    failed = _apply(client, plan, contests, outcomes, max_workers)
+    return TodoSyncResult(outcomes, failed, cleared, calls)
+
+
+def add_todos(client, problems, max_workers=8):
+    '''
+    adds the problems not on the todo list yet, concurrently
+    :param client: Codechef
+    :param problems: Dict or pairs. problem code -> contest code
+    :param max_workers: Integer. Maximum number of requests in flight
+    '''
+    problems = _problems(problems)
+    current = current_todo(client)
+    plan = OrderedDict((code, ('add',)) for code in problems if code not in current)
+    outcomes = OrderedDict((code, 'added' if code in plan else 'kept') for code in problems)
+    failed = _apply(client, plan, problems, outcomes, max_workers)
+    return TodoSyncResult(outcomes, failed, False, len(plan))
+
+
+def delete_todos(client, problem_codes, max_workers=8):
+    '''
+    deletes the given problems that are on the todo list, concurrently
+    :param client: Codechef
+    :param problem_codes: Iterable. Problem codes
+    :param max_workers: Integer. Maximum number of requests in flight
+    '''
+    current = current_todo(client)
+    codes = list(OrderedDict.fromkeys(problem_codes))
+    plan = OrderedDict((code, ('delete',)) for code in codes if code in current)
+    outcomes = OrderedDict((code, 'removed' if code in plan else 'absent') for code in codes)
+    failed = _apply(client, plan, current, outcomes, max_workers)
+    return TodoSyncResult(outcomes, failed, False, len(plan))
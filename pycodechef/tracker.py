@@ -0,0 +1,158 @@
+"""
+incremental live-contest ranklist tracking
+"""
+import threading
+from collections import namedtuple
+from datetime import datetime
+
+
+RankChange = namedtuple('RankChange', ['kind', 'username', 'old', 'new'])
+RankChange.__doc__ = '''
+one row-level change of a ranklist. kind is one of new, removed, score (score
+or penalty changed, rank may have moved too) or rank (rank moved only);
+old and new are (rank, totalScore, penalty) tuples, None when absent
+'''
+
+DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+DEFAULT_INTERVALS = {
+    'upcoming': 300,
+    'running': 60,
+    'frozen': 300,
+    'ended': None,
+}
+
+
+def parse_date(value):
+    '''
+    parses an api date, None if missing or malformed
+    :param value: String. eg. 2018-01-01 21:30:00
+    '''
+    try:
+        return datetime.strptime(value, DATE_FORMAT)
+    except (TypeError, ValueError):
+        return None
+
+
+class RanklistTracker(object):
+    '''
+    Keeps a ranklist keyed by username and emits only what changed between polls.
+    '''
+
+    def __init__(self, client, contest_code, country='', institution='', institutionType='', prefetch=4, intervals=None, clock=datetime.now):
+        '''
+        :param client: Codechef
+        :param contest_code: String. Contest code eg. COOK99
+        :param country: String. Country filter
+        :param institution: String. Institution filter
+        :param institutionType: String. Institution type filter
+        :param prefetch: Integer. Number of ranklist pages fetched concurrently
+        :param intervals: Dict. Poll interval in seconds per phase (upcoming, running, frozen, ended), None stops polling
+        :param clock: Callable. Returns the current time in the contest's timezone
+        '''
+        self.client = client
+        self.contest_code = contest_code
+        self.country = country
+        self.institution = institution
+        self.institutionType = institutionType
+        self.prefetch = prefetch
+        self.intervals = dict(DEFAULT_INTERVALS, **(intervals or {}))
+        self.clock = clock
+        self.rows = {}
+        self.polls = 0
+        self.start = self.end = self.freeze = None
+        self._subscribers = []
+        self._lock = threading.Lock()
+
+    def subscribe(self, callback):
+        '''
+        registers callback(changes), called with the list of RankChange of every poll that changed something
+        '''
+        self._subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        self._subscribers.remove(callback)
+
+    def load_schedule(self):
+        '''
+        reads start, end and freeze time of the contest
+        '''
+        response = self.client.get_contest_details(self.contest_code, ['startDate', 'endDate', 'freezingTime'])
+        content = response.get('result', {}).get('data', {}).get('content', {})
+        self.start = parse_date(content.get('startDate'))
+        self.end = parse_date(content.get('endDate'))
+        self.freeze = parse_date(content.get('freezingTime'))
+
+    def phase(self):
+        '''
+        one of upcoming, running, frozen, ended
+        '''
+        now = self.clock()
+        if self.start and now < self.start:
+            return 'upcoming'
+        if self.end and now >= self.end:
+            return 'ended'
+        if self.freeze and now >= self.freeze:
+            return 'frozen'
+        return 'running'
+
+    def next_interval(self):
+        '''
+        seconds until the next poll, None when the contest is over
+        '''
+        phase = self.phase()
+        interval = self.intervals[phase]
+        now = self.clock()
+        for boundary in (self.start, self.freeze, self.end):
+            if interval is not None and boundary and boundary > now:
+                interval = min(interval, (boundary - now).total_seconds() + 1)
+        return interval
+
+    def poll(self):
+        '''
+        fetches the ranklist, updates the index and notifies subscribers.
+        Returns the list of RankChange
+        '''
+        fields = ['rank', 'username', 'totalScore', 'penalty']
+        seen = {}
+        for row in self.client.iter_rankings(self.contest_code, fields, self.country, self.institution,
+                                             self.institutionType, prefetch=self.prefetch):
+            seen[row['username']] = (row.get('rank'), row.get('totalScore'), row.get('penalty'))
+
+        changes = []
+        with self._lock:
+            old_rows = self.rows
+            for username, new in seen.items():
+                old = old_rows.get(username)
+                if old is None:
+                    changes.append(RankChange('new', username, None, new))
+                elif old[1] != new[1] or old[2] != new[2]:
+                    changes.append(RankChange('score', username, old, new))
+                elif old[0] != new[0]:
+                    changes.append(RankChange('rank', username, old, new))
+            for username, old in old_rows.items():
+                if username not in seen:
+                    changes.append(RankChange('removed', username, old, None))
+            self.rows = seen
+            self.polls += 1
+
+        if changes:
+            for callback in list(self._subscribers):
+                callback(changes)
+        return changes
+
+    def run(self, stop=None):
+        '''
+        polls until the contest has ended (one final poll is made after the end)
+        or stop is set
+        :param stop: threading.Event. Set it to stop tracking
+        '''
+        stop = stop or threading.Event()
+        self.load_schedule()
+        while not stop.is_set():
+            if self.phase() != 'upcoming':
+                self.poll()
+            interval = self.next_interval()
+            if interval is None:
+                return
+            stop.wait(interval)
@@ -0,0 +1,153 @@
+"""
+pluggable http transports the client sends its requests through
+"""
+import json
+
+from requests.structures import CaseInsensitiveDict
+
+
+def _brotli_available():
+    for module in ('brotli', 'brotlicffi'):
+        try:
+            __import__(module)
+            return True
+        except ImportError:
+            pass
+    return False
+
+
+ACCEPT_ENCODING = 'gzip, deflate, br' if _brotli_available() else 'gzip, deflate'
+
+
+class Response(object):
+    '''
+    minimal response returned by in-process transports, with the subset of
+    the requests.Response interface the client uses
+    '''
+
+    def __init__(self, status_code, content=b'', headers=None, reason='', url=None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = CaseInsensitiveDict(headers or {})
+        self.reason = reason
+        self.url = url
+
+    def json(self):
+        return json.loads(self.content.decode('utf-8'))
+
+    def iter_content(self, chunk_size=65536):
+        for start in range(0, len(self.content), chunk_size):
+            yield self.content[start:start + chunk_size]
+
+    def close(self):
+        pass
+
+
+class Transport(object):
+    '''
+    interface of transports. request() takes the same arguments as
+    requests.Session.request and returns a response with status_code,
+    headers, content, json(), iter_content() and close()
+    '''
+
+    def request(self, method, url, params=None, data=None, headers=None, timeout=None, stream=False):
+        '''
+        :param method: String. HTTP verb
+        :param url: String. Full url
+        :param params: Dict or pairs. Query parameters
+        :param data: Dict, pairs or String. Form data, or a raw body when a string
+        :param headers: Dict. Request headers
+        :param timeout: Float or (connect, read) tuple
+        :param stream: Boolean. Leave the body unread until content or iter_content is used
+        '''
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class RequestsTransport(Transport):
+    '''
+    default transport, a pooled requests.Session
+    '''
+
+    def __init__(self, session):
+        '''
+        :param session: requests.Session. eg. client.make_session()
+        '''
+        self.session = session
+
+    def request(self, method, url, params=None, data=None, headers=None, timeout=None, stream=False):
+        return self.session.request(method, url, params=params or None, data=data or None, headers=headers,
+                                    timeout=timeout, stream=stream)
+
+    def close(self):
+        self.session.close()
+
+
+class HTTPXResponse(object):
+    '''
+    httpx.Response behind the requests.Response interface the client uses
+    '''
+
+    def __init__(self, response):
+        self._response = response
+        self.status_code = response.status_code
+        self.headers = response.headers
+        self.reason = response.reason_phrase
+        self.url = str(response.url)
+
+    @property
+    def content(self):
+        return self._response.read()
+
+    def json(self):
+        return json.loads(self.content.decode('utf-8'))
+
+    def iter_content(self, chunk_size=65536):
+        return self._response.iter_bytes(chunk_size)
+
+    def close(self):
+        self._response.close()
+
+
+class HTTPXTransport(Transport):
+    '''
+    httpx transport. With http2 concurrent requests to the api are
+    multiplexed over one connection. Needs httpx (pip install httpx[http2])
+    '''
+
+    def __init__(self, http2=True, pool_maxsize=10, max_retries=3, client=None):
+        '''
+        :param http2: Boolean. Negotiate HTTP/2
+        :param pool_maxsize: Integer. Maximum number of connections kept alive
+        :param max_retries: Integer. Retries on connection errors
+        :param client: httpx.Client. Pre-built client to use instead of creating one
+        '''
+        try:
+            import httpx
+        except ImportError:
+            raise ImportError('the http2 transport needs httpx: pip install httpx[http2]')
+        self.httpx = httpx
+        if client is None:
+            limits = httpx.Limits(max_keepalive_connections=pool_maxsize)
+            client = httpx.Client(http2=http2, limits=limits, transport=httpx.HTTPTransport(http2=http2, limits=limits, retries=max_retries))
+        self.client = client
+
+    def _timeout(self, timeout):
+        if isinstance(timeout, tuple):
+            connect, read = timeout
+            return self.httpx.Timeout(read, connect=connect)
+        return self.httpx.Timeout(timeout)
+
+    def request(self, method, url, params=None, data=None, headers=None, timeout=None, stream=False):
+        kwargs = {}
+        if isinstance(data, (str, bytes)):
+            kwargs['content'] = data
+        elif data:
+            kwargs['data'] = dict(data)
+        request = self.client.build_request(method, url, params=params or None, headers=headers, timeout=self._timeout(timeout), **kwargs)
+        return HTTPXResponse(self.client.send(request, stream=stream))
+
+    def close(self):
+        self.client.close()
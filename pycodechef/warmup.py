@@ -0,0 +1,136 @@
+"""
+pre-contest warm-up of contest and problem data
+"""
+import logging
+import threading
+import time
+from datetime import datetime
+
+from .bulk import fetch_many
+from .exceptions import APIError
+from .tracker import parse_date
+
+
+log = logging.getLogger(__name__)
+
+
+class ContestWarmup(object):
+    '''
+    Loads a contest and all of its problems into the client's cache ahead of
+    the start, so the rush of reads at the start is served locally, then
+    keeps the contest details (announcements, problemsList) fresh in the
+    background until the contest ends. Pass a cache.SQLiteCache as the
+    client's cache to persist the warmed data.
+    '''
+
+    def __init__(self, client, contest_code, fields=[], refresh_interval=30, problem_max_age=1800, max_workers=16, clock=datetime.now):
+        '''
+        :param client: Codechef. Must have a cache
+        :param contest_code: String. Contest code eg. COOK99
+        :param fields: List. Fields of get_contest_details, readers must ask for the same ones to hit the cache.
+            endDate is fetched on its own when it is not among them
+        :param refresh_interval: Float. Seconds between refreshes of the contest details while it runs
+        :param problem_max_age: Float. Seconds after which a problem is fetched again, keep it below the cache ttl of problems
+        :param max_workers: Integer. Maximum number of problem requests in flight
+        :param clock: Callable. Returns the current time in the contest's timezone
+        '''
+        if client.cache is None:
+            raise ValueError('warm-up needs a client with a cache')
+        self.client = client
+        self.contest_code = contest_code
+        self.fields = fields
+        self.refresh_interval = refresh_interval
+        self.problem_max_age = problem_max_age
+        self.max_workers = max_workers
+        self.clock = clock
+        self.problems = {}
+        self.failed = {}
+        self.end = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _fresh(self, method, *args):
+        with self.client.fresh():
+            return method(*args)
+
+    def refresh_details(self):
+        '''
+        fetches the contest details into the cache and returns their content
+        '''
+        response = self._fresh(self.client.get_contest_details, self.contest_code, self.fields)
+        if not isinstance(response, dict) or response.get('status') != 'OK':
+            raise APIError('could not fetch contest ' + self.contest_code, response)
+        content = response['result']['data']['content']
+        self.end = parse_date(content.get('endDate')) or self.end
+        if self.end is None and self.fields and 'endDate' not in self.fields:
+            dates = self._fresh(self.client.get_contest_details, self.contest_code, ['endDate'])
+            if isinstance(dates, dict) and dates.get('status') == 'OK':
+                self.end = parse_date(dates['result']['data']['content'].get('endDate'))
+        return content
+
+    def warm(self):
+        '''
+        refreshes the contest details and fetches every problem that is new or
+        older than problem_max_age concurrently. Returns the codes fetched
+        '''
+        content = self.refresh_details()
+        codes = [p['problemCode'] for p in content.get('problemsList') or ()]
+        if not codes and self.fields and 'problemsList' not in self.fields:
+            listing = self._fresh(self.client.get_contest_details, self.contest_code, ['problemsList'])
+            if isinstance(listing, dict) and listing.get('status') == 'OK':
+                codes = [p['problemCode'] for p in listing['result']['data']['content'].get('problemsList') or ()]
+        now = time.time()
+        stale = [code for code in codes if now - self.problems.get(code, 0) > self.problem_max_age]
+
+        def fetch(code):
+            return self._fresh(self.client.get_contest_problem, self.contest_code, code)
+
+        fetched = []
+        for result in fetch_many(fetch, stale, self.max_workers):
+            if result.error is None:
+                self.problems[result.key] = now
+                self.failed.pop(result.key, None)
+                fetched.append(result.key)
+            else:
+                self.failed[result.key] = result.error
+        return fetched
+
+    def run(self, at=None, stop=None):
+        '''
+        waits until at, warms up, then refreshes every refresh_interval
+        seconds until the contest has ended or stop is set
+        :param at: datetime. When to warm up, in the clock's timezone. None warms up now
+        :param stop: threading.Event. Set it to stop
+        '''
+        stop = stop or self._stop
+        if at is not None:
+            delay = (at - self.clock()).total_seconds()
+            if delay > 0 and stop.wait(delay):
+                return
+        while not stop.is_set():
+            try:
+                self.warm()
+            except Exception:
+                log.warning('warm-up of %s failed', self.contest_code, exc_info=True)
+            if self.end is not None and self.clock() >= self.end:
+                return
+            stop.wait(self.refresh_interval)
+
+    def start(self, at=None):
+        '''
+        runs the warm-up in a background daemon thread
+        :param at: datetime. When to warm up, None warms up now
+        '''
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.run, args=(at,), name='warmup-' + self.contest_code)
+        self._thread.daemon = True
+        self._thread.start()
+        return self._thread
+
+    def stop(self, timeout=None):
+        '''
+        stops the background thread
+        '''
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
@@ -0,0 +1,233 @@
+"""
+change feed of user ratings and ranks with adaptive polling
+"""
+import heapq
+import itertools
+import logging
+import threading
+import zlib
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timedelta
+
+from .exceptions import APIError
+from .tracker import parse_date
+
+
+log = logging.getLogger(__name__)
+
+FIELDS = ('allContest', 'long', 'short', 'globalRank', 'countryRank', 'profile')
+
+UserChange = namedtuple('UserChange', ['username', 'field', 'old', 'new'])
+UserChange.__doc__ = '''
+one change of a watched user. field is one of FIELDS, profile meaning that
+something else in the profile changed (old and new are then checksums)
+'''
+
+
+def _user_fingerprint(content):
+    ratings = content.get('ratings') or {}
+    ranking = (content.get('rankings') or {}).get('allContestRanking') or {}
+    rest = dict((k, v) for k, v in content.items() if k not in ('ratings', 'rankings'))
+    checksum = zlib.crc32(repr(sorted(rest.items())).encode('utf-8'))
+    return (ratings.get('allContest'), ratings.get('long'), ratings.get('short'),
+            ranking.get('global'), ranking.get('country'), checksum)
+
+
+def _member_fingerprint(member):
+    return (member.get('allContestRating'), member.get('longContestRating'), member.get('shortContestRating'),
+            None, None, None)
+
+
+class Watcher(object):
+    '''
+    Polls a watchlist of users and sets and emits a UserChange whenever a
+    rating, rank or profile changes. Only a small fingerprint tuple is kept
+    per user. Polls are scheduled on a priority queue: every hot_interval
+    seconds while a contest has ended less than hot_window seconds ago (when
+    ratings move), every idle_interval seconds otherwise.
+    '''
+
+    def __init__(self, client, usernames=(), sets=(), hot_interval=600, idle_interval=21600, hot_window=21600,
+                 contest_refresh=3600, max_workers=8, queue=None, clock=datetime.now):
+        '''
+        :param client: Codechef
+        :param usernames: Iterable. Handles polled one by one with get_user
+        :param sets: Iterable. Set names polled with get_member_set, one request for all their members
+        :param hot_interval: Float. Seconds between polls right after a contest ended
+        :param idle_interval: Float. Seconds between polls otherwise
+        :param hot_window: Float. Seconds after a contest's end during which polls are hot
+        :param contest_refresh: Float. Seconds between reloads of the contest end dates
+        :param max_workers: Integer. Polls in flight
+        :param queue: queue.Queue. Receives every UserChange when given
+        :param clock: Callable. Returns the current time in the contests' timezone
+        '''
+        self.client = client
+        self.hot_interval = hot_interval
+        self.idle_interval = idle_interval
+        self.hot_window = timedelta(seconds=hot_window)
+        self.contest_refresh = contest_refresh
+        self.max_workers = max_workers
+        self.queue = queue
+        self.clock = clock
+        self.fingerprints = {}
+        self.ends = []
+        self.polls = 0
+        self.errors = 0
+        self._contests_loaded = None
+        self._heap = []
+        self._watched = set()
+        self._seq = itertools.count()
+        self._subscribers = []
+        self._lock = threading.Lock()
+        self.watch(usernames)
+        for set_name in sets:
+            self.watch_set(set_name)
+
+    def subscribe(self, callback):
+        '''
+        registers callback(changes), called with the list of UserChange of every poll that changed something
+        '''
+        self._subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        self._subscribers.remove(callback)
+
+    def _schedule(self, item, due):
+        with self._lock:
+            heapq.heappush(self._heap, (due, next(self._seq), item))
+
+    def watch(self, usernames):
+        '''
+        adds users to the watchlist, polled as soon as possible
+        '''
+        now = self.clock()
+        for username in usernames:
+            item = ('user', username)
+            if item not in self._watched:
+                self._watched.add(item)
+                self._schedule(item, now)
+
+    def watch_set(self, set_name):
+        '''
+        adds every member of a set to the watchlist
+        '''
+        item = ('set', set_name)
+        if item not in self._watched:
+            self._watched.add(item)
+            self._schedule(item, self.clock())
+
+    def unwatch(self, username=None, set_name=None):
+        self._watched.discard(('user', username))
+        self._watched.discard(('set', set_name))
+
+    def load_contests(self):
+        '''
+        reads the end dates of recent and upcoming contests
+        '''
+        ends = []
+        for status in ('past', 'present', 'future'):
+            response = self.client.get_contest_list(['code', 'endDate'], status, 0, 100, 'endDate', 'desc')
+            if isinstance(response, dict) and response.get('status') == 'OK':
+                content = response['result']['data']['content']
+                contests = content.get('contestList', []) if isinstance(content, dict) else content
+                ends.extend(filter(None, (parse_date(c.get('endDate')) for c in contests)))
+        self.ends = sorted(set(ends))
+        self._contests_loaded = self.clock()
+
+    def interval(self):
+        '''
+        seconds until the next poll of an item polled now
+        '''
+        now = self.clock()
+        interval = self.idle_interval
+        for end in self.ends:
+            if end <= now < end + self.hot_window:
+                return self.hot_interval
+            if end > now:
+                interval = min(interval, (end - now).total_seconds() + 1)
+                break
+        return interval
+
+    def poll(self, item):
+        '''
+        fetches one user or set, updates fingerprints and emits the changes
+        :param item: Tuple. ('user', username) or ('set', set_name)
+        '''
+        kind, name = item
+        if kind == 'user':
+            response = self.client.get_user(name)
+            if not isinstance(response, dict) or response.get('status') != 'OK':
+                raise APIError('could not fetch user ' + name, response)
+            seen = [(name, _user_fingerprint(response['result']['data']['content']))]
+        else:
+            fields = ['memberName', 'allContestRating', 'longContestRating', 'shortContestRating']
+            response = self.client.get_member_set(name, fields)
+            if not isinstance(response, dict) or response.get('status') != 'OK':
+                raise APIError('could not fetch set ' + name, response)
+            seen = [(m['memberName'], _member_fingerprint(m)) for m in response['result']['data']['content'] or ()]
+
+        changes = []
+        with self._lock:
+            self.polls += 1
+            for username, new in seen:
+                old = self.fingerprints.get(username)
+                if old is None:
+                    self.fingerprints[username] = new
+                    continue
+                merged = tuple(o if n is None else n for o, n in zip(old, new))
+                for field, before, after in zip(FIELDS, old, merged):
+                    if before is not None and before != after:
+                        changes.append(UserChange(username, field, before, after))
+                self.fingerprints[username] = merged
+        if changes:
+            if self.queue is not None:
+                for change in changes:
+                    self.queue.put(change)
+            for callback in list(self._subscribers):
+                callback(changes)
+        return changes
+
+    def run(self, stop=None):
+        '''
+        polls the watchlist until stop is set
+        :param stop: threading.Event. Set it to stop watching
+        '''
+        stop = stop or threading.Event()
+        executor = ThreadPoolExecutor(self.max_workers)
+        in_flight = {}
+        try:
+            while not stop.is_set():
+                now = self.clock()
+                if self._contests_loaded is None or (now - self._contests_loaded).total_seconds() >= self.contest_refresh:
+                    try:
+                        self.load_contests()
+                    except Exception:
+                        log.warning('could not load contests', exc_info=True)
+                        self.errors += 1
+                        self._contests_loaded = now
+                with self._lock:
+                    while self._heap and self._heap[0][0] <= now and len(in_flight) < self.max_workers:
+                        item = heapq.heappop(self._heap)[2]
+                        if item in self._watched:
+                            in_flight[executor.submit(self.poll, item)] = item
+                    next_due = self._heap[0][0] if self._heap else None
+                timeout = self.contest_refresh
+                if next_due is not None:
+                    timeout = min(timeout, max((next_due - now).total_seconds(), 0))
+                if not in_flight:
+                    stop.wait(timeout)
+                    continue
+                if len(in_flight) >= self.max_workers:
+                    timeout = None
+                done, _ = wait(in_flight, timeout, FIRST_COMPLETED)
+                for future in done:
+                    item = in_flight.pop(future)
+                    if future.exception() is not None:
+                        self.errors += 1
+                        delay = min(self.hot_interval, self.idle_interval)
+                    else:
+                        delay = self.interval()
+                    self._schedule(item, self.clock() + timedelta(seconds=delay))
+        finally:
+            executor.shutdown(wait=True)
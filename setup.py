@@ -15,8 +15,20 @@ setuptools.setup(
     long_description=long_description,
     long_description_content_type="text/markdown",
     url="https://github.com/appi147/pycodechef",
-    packages=setuptools.find_packages(),
+    packages=setuptools.find_packages(exclude=['tests', 'tests.*']),
     install_requires=['requests'],
+    extras_require={
+        'parquet': ['pyarrow'],
+        'fast': ['orjson'],
+        'http2': ['httpx[http2]'],
+        'brotli': ['brotli'],
+        'numpy': ['numpy'],
+    },
+    entry_points={
+        'console_scripts': [
+            'pycodechef-export = pycodechef.export:main',
+        ],
+    },
     license=license,
     classifiers=[
         "Programming Language :: Python :: 3",
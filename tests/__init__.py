@@ -0,0 +1,5 @@
+"""
+offline tests, run against pycodechef.mock_server:
+
+    python -m unittest
+"""
@@ -0,0 +1,62 @@
+"""
+helpers shared by the tests
+"""
+import json
+import threading
+import time
+
+from pycodechef import Codechef
+from pycodechef.mock_server import MockTransport
+from pycodechef.transport import Response, Transport
+
+
+def make_client(transport=None, **kwargs):
+    '''
+    Codechef answering from an in-process MockAPI
+    '''
+    return Codechef('client-id', 'client-secret', transport=transport or MockTransport(), **kwargs)
+
+
+class ScriptedTransport(Transport):
+    '''
+    MockTransport whose api requests are first answered from script, a list
+    of (status, body dict[, headers]) consumed in order. Token grants always
+    reach the mock. Counts the api requests it sees
+    '''
+
+    def __init__(self, script=(), delay=0.0, inner=None):
+        self.inner = inner or MockTransport()
+        self.script = list(script)
+        self.delay = delay
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def request(self, method, url, params=None, data=None, headers=None, timeout=None, stream=False):
+        if url.endswith('/oauth/token'):
+            return self.inner.request(method, url, params, data, headers, timeout, stream)
+        with self._lock:
+            self.calls += 1
+            scripted = self.script.pop(0) if self.script else None
+        if self.delay:
+            time.sleep(self.delay)
+        if scripted is None:
+            return self.inner.request(method, url, params, data, headers, timeout, stream)
+        status, body = scripted[:2]
+        headers = scripted[2] if len(scripted) > 2 else {}
+        return Response(status, json.dumps(body).encode('utf-8'), headers, url=url)
+
+
+def error_body(message='error'):
+    return {'status': 'error', 'result': {'errors': [{'code': 9000, 'message': message}]}}
+
+
+def page_fetcher(total, calls=None):
+    '''
+    fetch(offset, limit) of a paginated endpoint holding total records 0..total-1
+    '''
+    def fetch(offset, limit):
+        if calls is not None:
+            calls.append(offset)
+        content = [{'n': i} for i in range(offset, min(offset + limit, total))]
+        return {'status': 'OK', 'result': {'data': {'content': content}}}
+    return fetch
@@ -0,0 +1,66 @@
+import asyncio
+import unittest
+
+from pycodechef.aio import AsyncCodechef
+
+from .support import ScriptedTransport
+
+
+class AsyncCodechefTest(unittest.TestCase):
+
+    def run_client(self, transport, scenario, **kwargs):
+        async def main():
+            async with AsyncCodechef('client-id', 'client-secret', transport=transport, **kwargs) as client:
+                await client.authenticate()
+                return await scenario(client)
+        return asyncio.run(main())
+
+    def test_mirrors_endpoints(self):
+        async def scenario(client):
+            return await client.get_user('user1'), await client.get_users(['user1', 'user2'])
+        user, users = self.run_client(ScriptedTransport(), scenario)
+        self.assertEqual(user['status'], 'OK')
+        self.assertEqual([(u.key, u.error) for u in users], [('user1', None), ('user2', None)])
+
+    def test_identical_reads_share_one_request(self):
+        transport = ScriptedTransport(delay=0.05)
+
+        async def scenario(client):
+            results = await asyncio.gather(*[client.get_user('user1') for _ in range(8)])
+            return results, client.coalesced
+        results, coalesced = self.run_client(transport, scenario)
+        self.assertEqual(transport.calls, 1)
+        self.assertEqual(coalesced, 7)
+        self.assertTrue(all(result is results[0] for result in results))
+
+    def test_mutations_are_not_coalesced(self):
+        transport = ScriptedTransport(delay=0.02)
+
+        async def scenario(client):
+            await asyncio.gather(*[client.add_problem_todo('CON001P1', 'CON001') for _ in range(3)])
+        self.run_client(transport, scenario)
+        self.assertEqual(transport.calls, 3)
+
+    def test_cancelled_pending_call_is_not_sent(self):
+        transport = ScriptedTransport(delay=0.1)
+
+        async def scenario(client):
+            first = asyncio.ensure_future(client.get_user('user1'))
+            queued = asyncio.ensure_future(client.get_user('user2'))
+            await asyncio.sleep(0.02)
+            queued.cancel()
+            await first
+            with self.assertRaises(asyncio.CancelledError):
+                await queued
+        self.run_client(transport, scenario, max_concurrency=1)
+        self.assertEqual(transport.calls, 1)
+
+    def test_unordered_bulk_calls_are_rejected(self):
+        async def scenario(client):
+            with self.assertRaises(ValueError):
+                await client.get_users(['user1'], ordered=False)
+        self.run_client(ScriptedTransport(), scenario)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,43 @@
+import threading
+import unittest
+
+from pycodechef.mock_server import MockTransport
+
+from .support import make_client
+
+
+class TokenTest(unittest.TestCase):
+
+    def setUp(self):
+        self.transport = MockTransport()
+        self.client = make_client(self.transport)
+
+    def test_token_is_fetched_lazily_once(self):
+        self.assertEqual(self.transport.requests, 0)
+        threads = [threading.Thread(target=self.client.get_user, args=('user1',)) for _ in range(16)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(self.transport.api.tokens), 1)
+
+    def test_401_gets_a_new_token_and_replays_once(self):
+        self.assertEqual(self.client.get_user('user1')['status'], 'OK')
+        old = set(self.transport.api.tokens)
+        self.transport.api.tokens.clear()
+        sent = self.transport.requests
+        self.assertEqual(self.client.get_user('user1')['status'], 'OK')
+        # rejected request, token grant, replayed request
+        self.assertEqual(self.transport.requests, sent + 3)
+        self.assertEqual(len(self.transport.api.tokens), 1)
+        self.assertFalse(self.transport.api.tokens & old)
+
+    def test_401_replays_mutations_too(self):
+        self.client.get_user('user1')
+        self.transport.api.tokens.clear()
+        self.assertEqual(self.client.add_problem_todo('CON001P1', 'CON001')['status'], 'OK')
+        self.assertEqual([p['problemCode'] for p in self.transport.api.todo], ['CON001P1'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from pycodechef import CachePolicy, MemoryCache, SQLiteCache
+from pycodechef.mock_server import MockTransport
+
+from .support import make_client
+
+
+class CacheBackendTest(unittest.TestCase):
+
+    def check_backend(self, cache):
+        cache.set('https://api/sets/a', 1, 60)
+        cache.set('https://api/sets/b', 2, 60)
+        cache.set('https://api/users/a', 3, 0.01)
+        self.assertEqual(cache.get('https://api/sets/a'), 1)
+        time.sleep(0.02)
+        self.assertIsNone(cache.get('https://api/users/a'))
+        self.assertEqual(cache.get_stale('https://api/users/a'), 3)
+        cache.invalidate('https://api/sets/')
+        self.assertIsNone(cache.get('https://api/sets/a'))
+        self.assertIsNone(cache.get_stale('https://api/sets/b'))
+        self.assertEqual(cache.get_stale('https://api/users/a'), 3)
+
+    def test_memory(self):
+        self.check_backend(MemoryCache())
+
+    def test_memory_evicts_least_recently_used(self):
+        cache = MemoryCache(maxsize=2)
+        cache.set('a', 1, 60)
+        cache.set('b', 2, 60)
+        cache.get('a')
+        cache.set('c', 3, 60)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), 1)
+
+    def test_sqlite(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        cache = SQLiteCache(os.path.join(directory, 'cache.db'))
+        self.addCleanup(cache.close)
+        self.check_backend(cache)
+
+
+class ClientCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.transport = MockTransport()
+        self.client = make_client(self.transport, cache=MemoryCache(), cache_policy=CachePolicy(default=60))
+
+    def test_repeated_get_is_served_from_cache(self):
+        first = self.client.get_contest_problem('CON001', 'CON001P1')
+        sent = self.transport.requests
+        self.assertEqual(self.client.get_contest_problem('CON001', 'CON001P1'), first)
+        self.assertEqual(self.transport.requests, sent)
+
+    def test_mutation_invalidates_its_scope(self):
+        self.assertEqual(self.client.get_set_details()['result']['data']['content'], [])
+        self.client.get_user('user1')
+        self.client.add_set('class-a', 'Class A')
+        sets = self.client.get_set_details()['result']['data']['content']
+        self.assertEqual([s['setName'] for s in sets], ['class-a'])
+        sent = self.transport.requests
+        self.client.get_user('user1')
+        self.assertEqual(self.transport.requests, sent)
+
+    def test_fresh_skips_the_cache_read(self):
+        self.client.get_user('user1')
+        sent = self.transport.requests
+        with self.client.fresh():
+            self.client.get_user('user1')
+        self.assertEqual(self.transport.requests, sent + 1)
+        self.client.get_user('user1')
+        self.assertEqual(self.transport.requests, sent + 1)
+
+    def test_errors_are_not_cached(self):
+        self.client.get_submission_details('not-an-id')
+        sent = self.transport.requests
+        self.client.get_submission_details('not-an-id')
+        self.assertEqual(self.transport.requests, sent + 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
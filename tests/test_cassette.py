@@ -0,0 +1,43 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from pycodechef import Codechef, cassette
+from pycodechef.mock_server import MockServer
+
+
+class CassetteTest(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+        self.path = os.path.join(self.dir, 'run.cassette')
+
+    def record(self):
+        with MockServer() as server:
+            client = Codechef('client-id', 'client-secret', base_url=server.url, adapter=cassette.record(self.path))
+            responses = [client.get_user('user1'), client.get_rankings('CON001', limit=5)]
+            token = client.auth.token()
+            client.close()
+        return responses, token
+
+    def test_replays_recorded_responses(self):
+        responses, _ = self.record()
+        client = Codechef('client-id', 'client-secret', base_url='http://offline.invalid', adapter=cassette.replay(self.path))
+        self.addCleanup(client.close)
+        self.assertEqual([client.get_user('user1'), client.get_rankings('CON001', limit=5)], responses)
+        with self.assertRaises(cassette.CassetteMiss):
+            client.get_user('user2')
+
+    def test_tokens_are_redacted_and_any_credentials_replay(self):
+        responses, token = self.record()
+        with open(self.path, 'rb') as f:
+            self.assertNotIn(token.encode('utf-8'), f.read())
+        client = Codechef('other-id', 'other-secret', base_url='http://offline.invalid', adapter=cassette.replay(self.path))
+        self.addCleanup(client.close)
+        self.assertEqual(client.get_user('user1'), responses[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
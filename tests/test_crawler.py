@@ -0,0 +1,68 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from pycodechef.crawler import SubmissionCrawler, crawl_submissions, make_shards
+
+from .support import make_client
+
+
+class CrawlerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+        self.client = make_client()
+        self.shards = make_shards(['user{}'.format(i) for i in range(6)], (2017, 2018), ('AC', 'WA'))
+
+    def ids(self, path):
+        with open(path) as f:
+            return [json.loads(line)['id'] for line in f]
+
+    def test_writes_each_submission_once(self):
+        path = os.path.join(self.dir, 'all.ndjson')
+        written = crawl_submissions(self.client, path, self.shards, max_workers=4)
+        ids = self.ids(path)
+        self.assertEqual(written, len(ids))
+        self.assertEqual(len(ids), len(set(ids)))
+        self.assertFalse(os.path.exists(path + '.state'))
+
+    def test_interrupted_crawl_resumes(self):
+        expected = []
+        SubmissionCrawler(self.client, os.path.join(self.dir, 'full.state'), max_workers=1).run(
+            self.shards, lambda record: expected.append(record['id']))
+
+        state = os.path.join(self.dir, 'crawl.state')
+        written = []
+        crawl = SubmissionCrawler._crawl_shard
+        calls = []
+
+        def flaky(crawler, shard):
+            calls.append(shard)
+            if len(calls) == 15:
+                raise IOError('connection lost')
+            return crawl(crawler, shard)
+
+        with mock.patch.object(SubmissionCrawler, '_crawl_shard', flaky):
+            crawler = SubmissionCrawler(self.client, state, max_workers=1, checkpoint_every=1)
+            with self.assertRaises(IOError):
+                crawler.run(self.shards, lambda record: written.append(record['id']), position=lambda: len(written))
+
+        resumed = SubmissionCrawler(self.client, state, max_workers=1)
+        self.assertTrue(0 < len(resumed.done) < 15)
+        self.assertEqual(resumed.position, len(written))
+        resumed.run(self.shards, lambda record: written.append(record['id']))
+        self.assertEqual(sorted(written), sorted(expected))
+
+    def test_no_resume_starts_over(self):
+        path = os.path.join(self.dir, 'out.ndjson')
+        crawl_submissions(self.client, path, self.shards[:2])
+        first = self.ids(path)
+        self.assertEqual(crawl_submissions(self.client, path, self.shards[:2], resume=False), len(first))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import json
+import unittest
+
+from pycodechef import MalformedResponseError
+from pycodechef.decoders import get_decoder
+from pycodechef.mock_server import MockTransport
+from pycodechef.transport import Response
+
+from .support import make_client
+
+
+class HTMLError(MockTransport):
+    '''
+    answers api requests with a proxy error page
+    '''
+
+    def request(self, method, url, *args, **kwargs):
+        if url.endswith('/oauth/token'):
+            return super(HTMLError, self).request(method, url, *args, **kwargs)
+        return Response(502, b'<html><body>Bad Gateway</body></html>', url=url)
+
+
+class DecoderTest(unittest.TestCase):
+
+    def test_backends_decode_bytes(self):
+        self.assertEqual(get_decoder('json')(b'{"a": [1]}'), {'a': [1]})
+        self.assertEqual(get_decoder()(b'{"a": 1}'), {'a': 1})
+        with self.assertRaises(ValueError):
+            get_decoder('yaml')
+
+    def test_custom_decoder(self):
+        seen = []
+
+        def decoder(content):
+            seen.append(type(content))
+            return json.loads(content)
+        self.assertEqual(make_client(decoder=decoder).get_user('user1')['status'], 'OK')
+        self.assertEqual(seen, [bytes])
+
+
+class ResponseFormatTest(unittest.TestCase):
+
+    def test_raw_formats_skip_decoding(self):
+        expected = make_client().get_user('user1')
+        raw = make_client(response_format='bytes').get_user('user1')
+        self.assertIsInstance(raw, bytes)
+        self.assertEqual(json.loads(raw), expected)
+        view = make_client(response_format='memoryview').get_user('user1')
+        self.assertIsInstance(view, memoryview)
+        self.assertEqual(json.loads(view.tobytes()), expected)
+
+    def test_unknown_format_is_rejected(self):
+        with self.assertRaises(ValueError):
+            make_client(response_format='xml')
+
+    def test_invalid_json_raises_malformed_response_error(self):
+        client = make_client(HTMLError(), max_retries=0)
+        with self.assertRaises(MalformedResponseError) as raised:
+            client.get_user('user1')
+        self.assertEqual(raised.exception.status_code, 502)
+        self.assertTrue(raised.exception.response.startswith(b'<html>'))
+
+
+if __name__ == '__main__':
+    unittest.main()
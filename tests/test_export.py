@@ -0,0 +1,45 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from pycodechef.export import export_records
+
+from .support import page_fetcher
+
+
+class ExportResumeTest(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+
+    def test_interrupted_export_resumes(self):
+        path = os.path.join(self.dir, 'out.ndjson')
+        fetch = page_fetcher(250)
+
+        def failing(offset, limit):
+            if offset >= 120:
+                raise IOError('connection lost')
+            return fetch(offset, limit)
+
+        with self.assertRaises(IOError):
+            export_records(failing, path, ['n'], page_size=10, prefetch=0, checkpoint_every=50)
+        self.assertTrue(os.path.exists(path + '.part'))
+        self.assertFalse(os.path.exists(path))
+
+        requested = []
+
+        def resumed(offset, limit):
+            requested.append(offset)
+            return fetch(offset, limit)
+
+        self.assertEqual(export_records(resumed, path, ['n'], page_size=10, prefetch=0, checkpoint_every=50), 250)
+        self.assertEqual(min(requested), 100)
+        with open(path) as f:
+            self.assertEqual([int(line.split(':')[1].strip(' }\n')) for line in f], list(range(250)))
+        self.assertFalse(os.path.exists(path + '.state'))
+
+
+if __name__ == '__main__':
+    unittest.main()
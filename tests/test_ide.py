@@ -0,0 +1,54 @@
+import time
+import unittest
+from concurrent.futures import wait
+
+from pycodechef import BatchRunner
+from pycodechef.ide import is_finished, same_output
+
+from .support import make_client
+
+
+class HelpersTest(unittest.TestCase):
+
+    def test_is_finished_uses_the_status(self):
+        self.assertTrue(is_finished({'status': 'AC', 'output': '', 'stderr': '', 'cmpinfo': ''}))
+        self.assertFalse(is_finished({'status': 'running', 'output': None}))
+        self.assertTrue(is_finished({'output': '42'}))
+        self.assertFalse(is_finished({'output': None, 'stderr': ''}))
+
+    def test_same_output_ignores_trailing_whitespace(self):
+        self.assertTrue(same_output('1 \n2\n\n', '1\n2'))
+        self.assertFalse(same_output('1\n3', '1\n2'))
+
+
+class BatchRunnerTest(unittest.TestCase):
+
+    def test_runs_finish_and_compare(self):
+        client = make_client()
+        with BatchRunner(client, first_poll=0.01, max_polls=5) as runner:
+            futures = runner.run_many([('print(input())', 'PYTH', 'hi', 'hi'), ('pass', 'PYTH', '')])
+            results = [future.result(5) for future in futures]
+        self.assertEqual([r.matches for r in results], [True, None])
+        self.assertEqual(results[1].status['status'], 'AC')
+
+    def test_close_resolves_runs_being_submitted(self):
+        client = make_client()
+        run_code = client.run_code
+
+        def slow(*args):
+            time.sleep(0.2)
+            return run_code(*args)
+        client.run_code = slow
+        runner = BatchRunner(client, max_workers=2, first_poll=0.01)
+        futures = runner.run_many([('x', 'PYTH', '')] * 6)
+        time.sleep(0.05)
+        runner.close()
+        done, pending = wait(futures, 2)
+        self.assertEqual(pending, set())
+        self.assertTrue(all(future.cancelled() for future in futures))
+        with self.assertRaises(RuntimeError):
+            runner.submit('x', 'PYTH', '')
+
+
+if __name__ == '__main__':
+    unittest.main()
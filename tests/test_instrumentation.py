@@ -0,0 +1,65 @@
+import unittest
+
+from pycodechef import CachePolicy, Instrumentation, MemoryCache, Metrics, SpanExporter
+from pycodechef.instrumentation import Histogram, endpoint_name
+
+from .support import make_client
+
+
+class HelpersTest(unittest.TestCase):
+
+    def test_endpoint_name(self):
+        self.assertEqual(endpoint_name('https://api.codechef.com/contests/COOK99/problems/A?x=1'),
+                         '/contests/{contest}/problems/{problem}')
+        self.assertEqual(endpoint_name('https://api.codechef.com/users/user1'), '/users/{username}')
+        self.assertEqual(endpoint_name('https://api.codechef.com/users/me'), '/users/me')
+
+    def test_histogram_quantiles(self):
+        histogram = Histogram((1, 2, 5))
+        for value in (0.5, 0.5, 1.5, 4, 9):
+            histogram.observe(value)
+        self.assertEqual((histogram.quantile(0.4), histogram.quantile(0.6), histogram.quantile(1)),
+                         (1, 2, float('inf')))
+        self.assertEqual(histogram.count, 5)
+
+
+class ClientInstrumentationTest(unittest.TestCase):
+
+    def setUp(self):
+        self.metrics = Metrics()
+        self.spans = []
+        self.hooks = []
+        instrumentation = Instrumentation([self.metrics, SpanExporter(self.spans.append)])
+        instrumentation.add_hook(before=lambda info: self.hooks.append('before'),
+                                 after=lambda info: self.hooks.append('after'))
+        self.client = make_client(cache=MemoryCache(), cache_policy=CachePolicy(default=60),
+                                  instrumentation=instrumentation)
+
+    def test_prometheus_exposition(self):
+        self.client.get_user('user1')
+        self.client.get_user('user1')
+        self.client.get_user('user2')
+        text = self.metrics.prometheus()
+        self.assertIn('# TYPE pycodechef_request_duration_seconds histogram', text)
+        self.assertIn('pycodechef_request_duration_seconds_count{endpoint="/users/{username}"} 2', text)
+        self.assertIn('pycodechef_request_duration_seconds_bucket{endpoint="/users/{username}",le="+Inf"} 2', text)
+        self.assertIn('pycodechef_requests_total{endpoint="/users/{username}",method="GET",status="200"} 2', text)
+        self.assertIn('pycodechef_cache_hits_total{endpoint="/users/{username}"} 1', text)
+        self.assertTrue(text.endswith('\n'))
+        summary = self.metrics.summary()['/users/{username}']
+        self.assertEqual((summary['count'], summary['cache_hits'], summary['errors']), (2, 1, 0))
+        self.assertGreater(summary['bytes'], 0)
+
+    def test_spans_and_hooks(self):
+        self.client.get_rankings('CON001', limit=5)
+        self.assertEqual(self.hooks, ['before', 'after'])
+        span, = self.spans
+        self.assertEqual(span['name'], 'GET /rankings/{contest}')
+        self.assertEqual(span['status'], 'OK')
+        self.assertLessEqual(span['start_time'], span['end_time'])
+        self.assertEqual(span['attributes']['http.status_code'], 200)
+        self.assertEqual(span['attributes']['codechef.attempts'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import time
+import unittest
+
+from pycodechef import Leaderboard
+from pycodechef import leaderboard
+
+
+class FakeClient(object):
+
+    def __init__(self, ranklists, delays=None):
+        self.ranklists = ranklists
+        self.delays = delays or {}
+
+    def iter_rankings(self, contest_code, fields, *args, **kwargs):
+        time.sleep(self.delays.get(contest_code, 0))
+        return iter(self.ranklists[contest_code])
+
+
+def rows(*pairs):
+    return [{'username': username, 'rank': rank, 'totalScore': score} for username, rank, score in pairs]
+
+
+class LeaderboardTest(unittest.TestCase):
+
+    def check_scoring(self):
+        board = Leaderboard(None, scoring='percentile')
+        # a filtered ranklist keeps the global ranks
+        board.add_rows('A', rows(('a', 120, 90), ('b', 4000, 50), ('c', 4000, 50), ('d', 9000, 10)))
+        totals = dict((row['username'], row['total']) for row in board.standings())
+        self.assertEqual(totals, {'a': 100.0, 'b': 75.0, 'c': 75.0, 'd': 25.0})
+
+        board = Leaderboard(None)
+        board.add_rows('A', rows(('a', 1, 100), ('b', 2, 50)))
+        board.add_rows('B', rows(('b', 1, 100), ('c', 2, 60), ('b', 3, 10)))
+        standings = board.standings()
+        self.assertEqual([(r['rank'], r['username'], r['total']) for r in standings],
+                         [(1, 'b', 160.0), (2, 'a', 100.0), (3, 'c', 60.0)])
+        self.assertEqual(standings[0]['best_rank'], 1)
+        self.assertEqual(standings[0]['delta'], 1)
+
+    def test_scoring(self):
+        self.check_scoring()
+
+    def test_scoring_without_numpy(self):
+        numpy = leaderboard.numpy
+        leaderboard.numpy = None
+        try:
+            self.check_scoring()
+        finally:
+            leaderboard.numpy = numpy
+
+    def test_contests_fold_in_input_order(self):
+        client = FakeClient({'OLD': rows(('a', 1, 10)), 'NEW': rows(('b', 1, 20))}, {'OLD': 0.1})
+        board = Leaderboard(client)
+        board.add_contests(['OLD', 'NEW'], max_workers=2)
+        self.assertEqual(board.contests, ['OLD', 'NEW'])
+        self.assertEqual(list(board.previous), [10.0, 0.0])
+
+    def test_holds_at_most_max_workers_ranklists(self):
+        codes = ['C{}'.format(i) for i in range(10)]
+        client = FakeClient(dict((code, rows(('a', 1, 10))) for code in codes), {'C0': 0.1})
+        board = Leaderboard(client)
+        started = []
+        held = []
+        ranklist = board._ranklist
+        fold = board._fold
+
+        def tracked_ranklist(code):
+            started.append(code)
+            return ranklist(code)
+
+        def tracked_fold(code, *columns):
+            held.append(len(started) - len(board.contests))
+            fold(code, *columns)
+        board._ranklist = tracked_ranklist
+        board._fold = tracked_fold
+        board.add_contests(codes, max_workers=2)
+        self.assertEqual(board.contests, codes)
+        self.assertLessEqual(max(held), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
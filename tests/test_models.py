@@ -0,0 +1,53 @@
+import math
+import unittest
+
+from pycodechef import RankingRow, RankingTable
+
+from .support import make_client
+
+ROW = {'rank': '3', 'username': 'user1', 'totalScore': '250.5', 'penalty': '2.5', 'rating': '', 'country': 'India',
+       'institution': 'IIT', 'institutionType': 'College', 'problemScore': [{'problemCode': 'A', 'score': '100'}]}
+
+
+class RecordTest(unittest.TestCase):
+
+    def test_from_dict_converts_and_interns(self):
+        row = RankingRow.from_dict(ROW)
+        self.assertEqual((row.rank, row.totalScore, row.penalty), (3, 250.5, '2.5'))
+        self.assertIs(row.country, RankingRow.from_dict(dict(ROW)).country)
+        self.assertEqual(row.problemScore[0].score, 100.0)
+
+    def test_equality_ignores_lazy_parsing(self):
+        row, other = RankingRow.from_dict(ROW), RankingRow.from_dict(ROW)
+        self.assertEqual(row, other)
+        row.problemScore
+        self.assertEqual(row, other)
+        self.assertNotEqual(row, RankingRow.from_dict(dict(ROW, rank='4')))
+        with self.assertRaises(TypeError):
+            hash(row)
+
+    def test_from_response(self):
+        response = make_client().get_rankings('CON001', limit=5)
+        rows = RankingRow.from_response(response)
+        self.assertEqual([row.rank for row in rows], sorted(row.rank for row in rows))
+
+
+class ColumnTableTest(unittest.TestCase):
+
+    def test_numeric_columns_are_tolerant(self):
+        table = RankingTable.from_records([ROW, dict(ROW, penalty='x', totalScore=None, rank=7)])
+        self.assertEqual(list(table.column('penalty')), [2, 0])
+        self.assertEqual(list(table.column('rank')), [3, 7])
+        self.assertEqual(table.column('totalScore')[0], 250.5)
+        self.assertTrue(math.isnan(table.column('totalScore')[1]))
+        self.assertEqual(list(table.column('rating')), [0, 0])
+
+    def test_categories_round_trip(self):
+        table = RankingTable.from_records([ROW, dict(ROW, country='Nepal'), ROW])
+        self.assertEqual(table.column('country'), ['India', 'Nepal', 'India'])
+        self.assertEqual(table.row(1)['country'], 'Nepal')
+        self.assertEqual(len(list(table)), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
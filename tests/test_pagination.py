@@ -0,0 +1,48 @@
+import unittest
+
+from pycodechef.pagination import paginate
+
+from .support import make_client, page_fetcher
+
+
+class PaginateTest(unittest.TestCase):
+
+    def test_stops_at_short_page(self):
+        calls = []
+        records = list(paginate(page_fetcher(95, calls), 10, prefetch=0))
+        self.assertEqual([r['n'] for r in records], list(range(95)))
+        self.assertEqual(len(calls), 10)
+
+    def test_full_last_page_needs_an_empty_one(self):
+        calls = []
+        self.assertEqual(len(list(paginate(page_fetcher(100, calls), 10, prefetch=0))), 100)
+        self.assertEqual(sorted(calls), list(range(0, 110, 10)))
+
+    def test_one_page_list_is_one_request(self):
+        calls = []
+        self.assertEqual(len(list(paginate(page_fetcher(5, calls), 10, prefetch=4))), 5)
+        self.assertEqual(calls, [0])
+
+    def test_read_ahead_keeps_order(self):
+        records = list(paginate(page_fetcher(1234), 10, prefetch=4))
+        self.assertEqual([r['n'] for r in records], list(range(1234)))
+
+    def test_start_resumes_at_offset(self):
+        records = list(paginate(page_fetcher(95), 10, prefetch=2, start=30))
+        self.assertEqual([r['n'] for r in records], list(range(30, 95)))
+
+    def test_iter_submissions_walks_every_page(self):
+        client = make_client()
+        pages = []
+        offset = 0
+        while True:
+            content = client.get_submissions(username='user1', offset=offset)['result']['data']['content'] or []
+            pages.extend(record['id'] for record in content)
+            if len(content) < 20:
+                break
+            offset += 20
+        self.assertEqual([r['id'] for r in client.iter_submissions(username='user1')], pages)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from pycodechef import CachePolicy, MemoryCache, ProblemIndex
+
+from .support import make_client
+
+PROBLEMS = [
+    {'problemCode': 'FLOW001', 'problemName': 'Add Two Numbers', 'successfulSubmissions': '900', 'accuracy': 50, 'tags': ['basic', 'math']},
+    {'problemCode': 'FLOW002', 'problemName': 'Find Remainder', 'successfulSubmissions': 1200, 'accuracy': 70, 'tags': ['Basic']},
+    {'problemCode': 'GCD2', 'problemName': 'Flow of GCD', 'successfulSubmissions': 300, 'accuracy': None, 'tags': ['math', 'gcd']},
+    {'code': 'TREE1', 'tags': ['graph']},
+]
+
+
+class ProblemIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self.index = ProblemIndex()
+        self.index.add(PROBLEMS, category='easy')
+
+    def codes(self, **kwargs):
+        return [p['problemCode'] for p in self.index.search(**kwargs)]
+
+    def test_sorted_search(self):
+        self.assertEqual(self.codes(), ['FLOW002', 'FLOW001', 'GCD2', 'TREE1'])
+        self.assertEqual(self.codes(descending=False, limit=2), ['TREE1', 'GCD2'])
+        self.assertEqual(self.codes(sort_by='accuracy'), ['FLOW002', 'FLOW001', 'TREE1', 'GCD2'])
+        self.assertEqual(self.codes(sort_by='problemCode', descending=False), ['FLOW001', 'FLOW002', 'GCD2', 'TREE1'])
+        with self.assertRaises(ValueError):
+            self.index.search(sort_by='author')
+
+    def test_tags_and_prefix(self):
+        self.assertEqual(self.codes(tags=['BASIC', 'math']), ['FLOW001'])
+        self.assertEqual(self.codes(tags=['math'], sort_by='problemCode', descending=False), ['FLOW001', 'GCD2'])
+        self.assertEqual(self.codes(tags=['math', 'unknown']), [])
+        self.assertEqual(self.codes(prefix='flow'), ['FLOW002', 'FLOW001', 'GCD2'])
+        self.assertEqual(self.codes(prefix='fl', tags=['gcd']), ['GCD2'])
+
+    def test_merges_records_and_resorts(self):
+        self.index.add([{'code': 'TREE1', 'tags': ['dfs']}, {'problemCode': 'FLOW001', 'successfulSubmissions': 5000}])
+        self.assertEqual(self.index.get('TREE1')['tags'], ['dfs', 'graph'])
+        self.assertEqual(self.codes(limit=1), ['FLOW001'])
+        self.assertEqual(self.index.get('FLOW001')['problemName'], 'Add Two Numbers')
+
+    def test_sqlite_survives_restarts(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, 'problems.db')
+        index = ProblemIndex(path)
+        index.add(PROBLEMS)
+        index.close()
+        index = ProblemIndex(path)
+        self.addCleanup(index.close)
+        self.assertEqual(len(index), 4)
+        self.assertEqual([p['problemCode'] for p in index.search(tags=['gcd'])], ['GCD2'])
+
+
+class ClientProblemIndexTest(unittest.TestCase):
+
+    def test_refresh_drops_problems_that_left_a_category(self):
+        index = ProblemIndex()
+        index.add(PROBLEMS, category='easy')
+        self.assertEqual(index.refresh(make_client(), categories=['easy']), ['easy'])
+        self.assertEqual(len(index), 500)
+        self.assertNotIn('FLOW001', index)
+        self.assertEqual(index.refresh(make_client(), categories=['easy']), [])
+
+    def test_add_contest_leaves_cached_responses_intact(self):
+        client = make_client(cache=MemoryCache(), cache_policy=CachePolicy(default=60))
+        index = ProblemIndex()
+        self.assertTrue(index.add_contest(client, 'CON001'))
+        code = next(iter(index.problems))
+        self.assertNotIn('body', index.get(code))
+        self.assertEqual(index.get(code)['contestCode'], 'CON001')
+        self.assertIn('body', client.get_contest_problem('CON001', code)['result']['data']['content'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import time
+import unittest
+
+from pycodechef import Codechef, RateLimiter, RateLimitError
+from pycodechef.ratelimit import TokenBucket, endpoint_family, retry_after
+from pycodechef.transport import Response
+
+from .support import ScriptedTransport, error_body, make_client
+
+
+def limiter(**kwargs):
+    kwargs.setdefault('base_delay', 0.001)
+    kwargs.setdefault('max_delay', 0.002)
+    return RateLimiter(rate=1000, **kwargs)
+
+
+class HelpersTest(unittest.TestCase):
+
+    def test_endpoint_family(self):
+        self.assertEqual(endpoint_family('https://api.codechef.com/rankings/COOK99?offset=0'), 'rankings')
+
+    def test_retry_after(self):
+        self.assertEqual(retry_after(Response(429, headers={'Retry-After': '2'})), 2.0)
+        self.assertIsNone(retry_after(Response(429)))
+
+    def test_bucket_paces_requests(self):
+        bucket = TokenBucket(rate=50, capacity=1)
+        start = time.monotonic()
+        for _ in range(6):
+            bucket.acquire()
+        self.assertGreaterEqual(time.monotonic() - start, 0.09)
+
+
+class BackoffTest(unittest.TestCase):
+
+    def test_throttled_answers_are_retried(self):
+        transport = ScriptedTransport([(429, error_body()), (429, error_body(), {'Retry-After': '0'})])
+        client = make_client(transport, rate_limiter=limiter())
+        self.assertEqual(client.get_user('user1')['status'], 'OK')
+        self.assertEqual(transport.calls, 3)
+        self.assertEqual(client.rate_limiter.throttled, 2)
+
+    def test_gives_up_with_decoded_body(self):
+        transport = ScriptedTransport([(503, error_body('down'))] * 3)
+        client = make_client(transport, rate_limiter=limiter(max_attempts=3))
+        with self.assertRaises(RateLimitError) as raised:
+            client.get_user('user1')
+        self.assertEqual(transport.calls, 3)
+        self.assertEqual(raised.exception.response, error_body('down'))
+
+    def test_5xx_of_mutations_is_not_retried(self):
+        transport = ScriptedTransport([(503, error_body())])
+        client = make_client(transport, rate_limiter=limiter())
+        self.assertEqual(client.add_set('class-a', '')['status'], 'error')
+        self.assertEqual(transport.calls, 1)
+
+    def test_rate_limit_error_bodies_are_retried(self):
+        transport = ScriptedTransport([(200, error_body('Rate limit exhausted'))])
+        client = make_client(transport, rate_limiter=limiter())
+        self.assertEqual(client.get_user('user1')['status'], 'OK')
+        self.assertEqual(transport.calls, 2)
+
+    def test_session_leaves_5xx_to_the_limiter(self):
+        limited = Codechef('id', 'secret', rate_limiter=True)
+        plain = Codechef('id', 'secret')
+        self.addCleanup(limited.close)
+        self.addCleanup(plain.close)
+        self.assertFalse(limited.session.get_adapter('https://').max_retries.status_forcelist)
+        self.assertIn(503, plain.session.get_adapter('https://').max_retries.status_forcelist)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,158 @@
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from pycodechef import CachePolicy, CircuitBreaker, CircuitOpenError, Hedger, MemoryCache
+from pycodechef.mock_server import MockTransport
+from pycodechef.transport import Transport
+
+from .support import make_client
+
+URL = 'https://api.codechef.com/users/user1'
+
+
+class CircuitBreakerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=0.05)
+
+    def fail(self, times):
+        for _ in range(times):
+            self.breaker.before(URL)
+            self.breaker.record(URL, False)
+
+    def test_opens_after_consecutive_failures(self):
+        self.fail(1)
+        self.breaker.record(URL, True)
+        self.fail(1)
+        self.assertEqual(self.breaker.state(URL), 'closed')
+        self.fail(1)
+        self.assertEqual(self.breaker.state(URL), 'open')
+        with self.assertRaises(CircuitOpenError) as raised:
+            self.breaker.before(URL)
+        self.assertEqual(raised.exception.endpoint, '/users/{username}')
+        self.assertGreater(raised.exception.retry_in, 0)
+
+    def test_circuits_are_per_endpoint(self):
+        self.fail(2)
+        self.assertEqual(self.breaker.before('https://api.codechef.com/rankings/COOK99'), 'closed')
+
+    def test_half_open_trial_closes_on_success(self):
+        self.fail(2)
+        time.sleep(0.06)
+        self.assertEqual(self.breaker.before(URL), 'half_open')
+        with self.assertRaises(CircuitOpenError):
+            self.breaker.before(URL)
+        self.breaker.record(URL, True)
+        self.assertEqual(self.breaker.state(URL), 'closed')
+
+    def test_half_open_trial_reopens_on_failure(self):
+        self.fail(2)
+        time.sleep(0.06)
+        self.breaker.before(URL)
+        self.breaker.record(URL, False)
+        self.assertEqual(self.breaker.state(URL), 'open')
+
+
+class Outage(Transport):
+
+    def __init__(self):
+        self.inner = MockTransport()
+        self.down = False
+        self.refused = 0
+
+    def request(self, method, url, *args, **kwargs):
+        if self.down and not url.endswith('/oauth/token'):
+            self.refused += 1
+            raise ConnectionError('down')
+        return self.inner.request(method, url, *args, **kwargs)
+
+
+class ClientCircuitTest(unittest.TestCase):
+
+    def test_open_circuit_fails_fast_and_serves_stale_data(self):
+        transport = Outage()
+        client = make_client(transport, cache=MemoryCache(), cache_policy=CachePolicy(default=0.01),
+                             circuit_breaker=CircuitBreaker(failure_threshold=2, recovery_timeout=60))
+        cached = client.get_user('user1')
+        time.sleep(0.02)
+        transport.down = True
+        for _ in range(2):
+            with self.assertRaises(ConnectionError):
+                client.get_user('user2')
+        self.assertEqual(client.get_user('user1'), cached)
+        with self.assertRaises(CircuitOpenError):
+            client.get_user('user2')
+        self.assertEqual(transport.refused, 2)
+
+
+class Reply(object):
+
+    def close(self):
+        pass
+
+
+class HedgerTest(unittest.TestCase):
+
+    def warm(self, hedger, seconds=0.001):
+        for _ in range(hedger.min_samples):
+            hedger.call(URL, lambda: (time.sleep(seconds), Reply())[1])
+
+    def test_fast_duplicate_answers_a_stalled_request(self):
+        hedger = Hedger(min_samples=5, min_delay=0.01, budget=1.0)
+        self.addCleanup(hedger.close)
+        self.warm(hedger, 0.005)
+        closed = threading.Event()
+        stalled, fast = Reply(), Reply()
+        stalled.close = closed.set
+        calls = []
+
+        def send():
+            calls.append(1)
+            if len(calls) == 1:
+                time.sleep(1.0)
+                return stalled
+            time.sleep(0.05)
+            return fast
+
+        start = time.monotonic()
+        self.assertEqual(hedger.call(URL, send), (fast, True))
+        self.assertLess(time.monotonic() - start, 0.5)
+        self.assertEqual(hedger.stats()['won'], 1)
+        self.assertTrue(closed.wait(2))
+
+    def test_duplicate_replaces_a_failed_request(self):
+        hedger = Hedger(min_samples=5, min_delay=0.01, budget=1.0)
+        self.addCleanup(hedger.close)
+        self.warm(hedger)
+        reply = Reply()
+        calls = []
+
+        def send():
+            calls.append(1)
+            if len(calls) == 1:
+                time.sleep(0.05)
+                raise ConnectionError('reset')
+            return reply
+
+        self.assertEqual(hedger.call(URL, send), (reply, True))
+        self.assertEqual(hedger.stats()['won'], 1)
+
+    def test_budget_holds_under_concurrency(self):
+        hedger = Hedger(min_samples=20, budget=0.1)
+        self.addCleanup(hedger.close)
+        self.warm(hedger, 0.01)
+
+        def send():
+            time.sleep(0.02)
+            return Reply()
+
+        with ThreadPoolExecutor(64) as executor:
+            list(executor.map(lambda _: hedger.call(URL, send), range(300)))
+        stats = hedger.stats()
+        self.assertLessEqual(stats['hedged'], 0.1 * stats['requests'] + 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+import unittest
+
+from pycodechef.mock_server import MockTransport
+
+from .support import make_client
+
+
+class SyncSetTest(unittest.TestCase):
+
+    def setUp(self):
+        self.transport = MockTransport()
+        self.client = make_client(self.transport)
+        self.sets = self.transport.api.sets
+
+    def test_creates_missing_set(self):
+        result = self.client.sync_set('class-a', ['user1', 'user2'], 'Class A')
+        self.assertTrue(result.created)
+        self.assertEqual(sorted(result.added), ['user1', 'user2'])
+        self.assertEqual(self.sets['class-a']['description'], 'Class A')
+        self.assertEqual(self.sets['class-a']['members'], {'user1', 'user2'})
+
+    def test_applies_only_the_difference(self):
+        self.client.sync_set('class-a', ['user1', 'user2', 'user3'])
+        sent = self.transport.requests
+        result = self.client.sync_set('class-a', ['USER1', 'user2', 'user4'])
+        self.assertEqual((result.added, result.removed, result.failed), (['user4'], ['user3'], {}))
+        # set list, member list, one add and one delete
+        self.assertEqual(self.transport.requests - sent, 4)
+
+    def test_no_change_sends_no_mutation(self):
+        self.client.sync_set('class-a', ['user1'])
+        sent = self.transport.requests
+        result = self.client.sync_set('class-a', ['user1'])
+        self.assertEqual((result.added, result.removed), ([], []))
+        self.assertEqual(self.transport.requests - sent, 2)
+
+    def test_tuple_of_handles_is_a_member_list(self):
+        self.client.add_set('cls', 'Old')
+        reports = self.client.sync_sets({'cls': ('alice', 'bob'), 'new': ['carol']}, descriptions={'new': 'New'})
+        self.assertEqual(sorted(reports['cls'].added), ['alice', 'bob'])
+        self.assertFalse(reports['cls'].updated)
+        self.assertEqual(self.sets['cls'], {'description': 'Old', 'members': {'alice', 'bob'}})
+        self.assertEqual(self.sets['new']['description'], 'New')
+        with self.assertRaises(ValueError):
+            self.client.sync_sets({'cls': 'alice'})
+
+
+if __name__ == '__main__':
+    unittest.main()
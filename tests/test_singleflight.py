@@ -0,0 +1,90 @@
+import threading
+import unittest
+
+from pycodechef.singleflight import SingleFlight
+
+from .support import ScriptedTransport, make_client
+
+
+def run_threads(count, target):
+    results = [None] * count
+    errors = [None] * count
+
+    def call(i):
+        try:
+            results[i] = target()
+        except Exception as err:
+            errors[i] = err
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results, errors
+
+
+class SingleFlightTest(unittest.TestCase):
+
+    def test_concurrent_calls_share_one_result(self):
+        flight = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def slow():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return object()
+
+        leader = threading.Thread(target=flight.do, args=('k', slow))
+        leader.start()
+        started.wait(5)
+        timer = threading.Timer(0.1, release.set)
+        timer.start()
+        results, _ = run_threads(8, lambda: flight.do('k', slow))
+        leader.join()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(len(set(map(id, results))), 1)
+        self.assertEqual(flight.stats()['coalesced'], 8)
+
+    def test_errors_are_shared(self):
+        flight = SingleFlight()
+        release = threading.Event()
+
+        def failing():
+            release.wait(5)
+            raise ValueError('boom')
+
+        timer = threading.Timer(0.1, release.set)
+        timer.start()
+        _, errors = run_threads(4, lambda: flight.do('k', failing))
+        self.assertTrue(all(isinstance(err, ValueError) for err in errors))
+
+    def test_calls_after_completion_run_again(self):
+        flight = SingleFlight()
+        self.assertEqual(flight.do('k', lambda: 1), 1)
+        self.assertEqual(flight.do('k', lambda: 2), 2)
+
+
+class ClientCoalescingTest(unittest.TestCase):
+
+    def test_identical_gets_send_one_request(self):
+        transport = ScriptedTransport(delay=0.1)
+        client = make_client(transport)
+        client.auth.token()
+        results, errors = run_threads(8, lambda: client.get_user('user1'))
+        self.assertEqual(errors, [None] * 8)
+        self.assertEqual(transport.calls, 1)
+        self.assertTrue(all(r['status'] == 'OK' for r in results))
+
+    def test_disabled_coalescing_sends_every_request(self):
+        transport = ScriptedTransport(delay=0.05)
+        client = make_client(transport, coalesce=False)
+        client.auth.token()
+        run_threads(4, lambda: client.get_user('user1'))
+        self.assertEqual(transport.calls, 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import unittest
+
+from pycodechef.mock_server import MockTransport
+
+from .support import make_client
+
+
+class SyncTodoTest(unittest.TestCase):
+
+    def setUp(self):
+        self.transport = MockTransport()
+        self.client = make_client(self.transport)
+        self.todo = self.transport.api.todo
+
+    def codes(self):
+        return [p['problemCode'] for p in self.todo]
+
+    def test_applies_only_the_difference(self):
+        self.client.add_todo_many([('A', 'C1'), ('B', 'C1'), ('C', 'C1')])
+        result = self.client.sync_todo({'A': None, 'B': 'C2', 'D': 'C1'}, allow_clear=False)
+        self.assertEqual(dict(result.outcomes), {'A': 'kept', 'B': 'replaced', 'C': 'removed', 'D': 'added'})
+        self.assertEqual(result.calls, 4)
+        self.assertFalse(result.cleared)
+        self.assertEqual(sorted(self.codes()), ['A', 'B', 'D'])
+        self.assertEqual([p['contestCode'] for p in self.todo if p['problemCode'] == 'B'], ['C2'])
+
+    def test_clears_when_cheaper(self):
+        self.client.add_todo_many([('P{}'.format(i), 'C1') for i in range(6)])
+        result = self.client.sync_todo({'P0': None, 'N': 'C1'})
+        self.assertTrue(result.cleared)
+        self.assertEqual(result.calls, 3)
+        self.assertEqual(result.outcomes['P0'], 'readded')
+        self.assertEqual(result.outcomes['N'], 'added')
+        self.assertEqual(result.outcomes['P5'], 'removed')
+        self.assertEqual(sorted(self.codes()), ['N', 'P0'])
+        self.assertEqual([p['contestCode'] for p in self.todo if p['problemCode'] == 'P0'], ['C1'])
+
+    def test_bulk_helpers_are_idempotent(self):
+        self.client.add_todo_many({'A': 'C1'})
+        result = self.client.add_todo_many({'A': 'C1', 'B': 'C1'})
+        self.assertEqual(dict(result.outcomes), {'A': 'kept', 'B': 'added'})
+        self.assertEqual(result.calls, 1)
+        result = self.client.delete_todo_many(['B', 'Z'])
+        self.assertEqual(dict(result.outcomes), {'B': 'removed', 'Z': 'absent'})
+        self.assertEqual(self.codes(), ['A'])
+
+    def test_failures_are_reported_per_problem(self):
+        add = self.client.add_problem_todo
+        self.client.add_problem_todo = lambda code, contest: {'status': 'error'} if code == 'BAD' else add(code, contest)
+        result = self.client.sync_todo({'OK': 'C1', 'BAD': 'C1'})
+        self.assertEqual(result.outcomes['BAD'], 'failed')
+        self.assertIn('BAD', result.failed)
+        self.assertEqual(self.codes(), ['OK'])
+
+
+if __name__ == '__main__':
+    unittest.main()
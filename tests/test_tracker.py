@@ -0,0 +1,76 @@
+import unittest
+from datetime import datetime, timedelta
+
+from pycodechef import RanklistTracker
+
+START = datetime(2018, 1, 1, 21, 30)
+
+
+class FakeClient(object):
+
+    def __init__(self):
+        self.ranklist = []
+        self.details = {}
+
+    def iter_rankings(self, contest_code, fields, *args, **kwargs):
+        return iter([dict(row) for row in self.ranklist])
+
+    def get_contest_details(self, contest_code, fields):
+        return {'status': 'OK', 'result': {'data': {'content': self.details}}}
+
+
+def rows(*rows):
+    return [{'username': username, 'rank': rank, 'totalScore': score, 'penalty': penalty}
+            for username, rank, score, penalty in rows]
+
+
+class TrackerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.client = FakeClient()
+        self.now = START
+        self.tracker = RanklistTracker(self.client, 'COOK99', clock=lambda: self.now)
+
+    def test_emits_row_level_changes(self):
+        received = []
+        self.tracker.subscribe(received.append)
+        self.client.ranklist = rows(('a', 1, 100, 0), ('b', 2, 50, 0), ('c', 3, 10, 0))
+        self.assertEqual([c.kind for c in self.tracker.poll()], ['new', 'new', 'new'])
+
+        self.client.ranklist = rows(('b', 1, 150, 5), ('a', 2, 100, 0), ('d', 3, 20, 0))
+        changes = dict((c.username, c) for c in self.tracker.poll())
+        self.assertEqual(dict((name, c.kind) for name, c in changes.items()),
+                         {'b': 'score', 'a': 'rank', 'd': 'new', 'c': 'removed'})
+        self.assertEqual((changes['a'].old, changes['a'].new), ((1, 100, 0), (2, 100, 0)))
+        self.assertIsNone(changes['c'].new)
+
+        self.assertEqual(self.tracker.poll(), [])
+        self.assertEqual(len(received), 2)
+        self.assertEqual(self.tracker.polls, 3)
+
+    def test_phases_and_intervals(self):
+        self.client.details = {'startDate': '2018-01-01 21:30:00', 'endDate': '2018-01-02 00:00:00',
+                               'freezingTime': '2018-01-01 23:30:00'}
+        self.tracker.load_schedule()
+        self.now = START - timedelta(seconds=30)
+        self.assertEqual(self.tracker.phase(), 'upcoming')
+        self.assertEqual(self.tracker.next_interval(), 31)
+        self.now = START + timedelta(hours=1)
+        self.assertEqual(self.tracker.phase(), 'running')
+        self.assertEqual(self.tracker.next_interval(), 60)
+        self.now = START + timedelta(hours=2, minutes=10)
+        self.assertEqual(self.tracker.phase(), 'frozen')
+        self.now = START + timedelta(hours=3)
+        self.assertEqual(self.tracker.phase(), 'ended')
+        self.assertIsNone(self.tracker.next_interval())
+
+    def test_run_polls_once_after_the_end(self):
+        self.client.details = {'startDate': '2018-01-01 21:30:00', 'endDate': '2018-01-01 21:00:00'}
+        self.client.ranklist = rows(('a', 1, 100, 0))
+        self.tracker.run()
+        self.assertEqual(self.tracker.polls, 1)
+        self.assertIn('a', self.tracker.rows)
+
+
+if __name__ == '__main__':
+    unittest.main()
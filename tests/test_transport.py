@@ -0,0 +1,65 @@
+import json
+import unittest
+
+from pycodechef import APIError, Codechef
+from pycodechef.mock_server import MockServer
+from pycodechef.transport import HTTPXTransport
+
+from .support import make_client
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+
+class MockTransportTest(unittest.TestCase):
+
+    def test_unknown_transport_is_rejected(self):
+        with self.assertRaises(ValueError):
+            Codechef('client-id', 'client-secret', transport='ftp')
+
+    def test_stream_yields_the_body_in_chunks(self):
+        client = make_client()
+        expected = client.get_rankings('CON001', limit=50)
+        chunks = list(client.stream('/rankings/CON001', {'limit': 50}, chunk_size=512))
+        self.assertGreater(len(chunks), 1)
+        self.assertTrue(all(len(chunk) <= 512 for chunk in chunks))
+        self.assertEqual(json.loads(b''.join(chunks)), expected)
+
+    def test_stream_raises_on_errors(self):
+        with self.assertRaises(APIError):
+            list(make_client().stream('/problems/unknown'))
+
+
+class ServerTransportTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = MockServer()
+        cls.server.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def check_transport(self, transport):
+        client = Codechef('client-id', 'client-secret', base_url=self.server.url, transport=transport)
+        self.addCleanup(client.close)
+        self.assertEqual(client.get_user('user1')['result']['data']['content']['username'], 'user1')
+        self.assertEqual(client.add_set('class-a', 'Class A')['status'], 'OK')
+        self.assertEqual([s['setName'] for s in client.get_set_details()['result']['data']['content']], ['class-a'])
+        self.assertEqual(client.delete_set('class-a')['status'], 'OK')
+        body = b''.join(client.stream('/rankings/CON001', {'limit': 20}, chunk_size=256))
+        self.assertEqual(json.loads(body), client.get_rankings('CON001', limit=20))
+
+    def test_requests(self):
+        self.check_transport('requests')
+
+    @unittest.skipIf(httpx is None, 'httpx is not installed')
+    def test_httpx(self):
+        self.check_transport(HTTPXTransport(http2=False))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import time
+import unittest
+from datetime import datetime
+
+import requests
+
+from pycodechef import ContestWarmup, MemoryCache
+from pycodechef.mock_server import MockTransport
+
+from .support import make_client
+
+
+class WarmupTest(unittest.TestCase):
+
+    def setUp(self):
+        self.transport = MockTransport()
+        self.client = make_client(self.transport, cache=MemoryCache())
+
+    def test_needs_a_cache(self):
+        with self.assertRaises(ValueError):
+            ContestWarmup(make_client(), 'CON001')
+
+    def test_warm_fills_the_cache(self):
+        warmup = ContestWarmup(self.client, 'CON001')
+        fetched = warmup.warm()
+        self.assertTrue(fetched)
+        sent = self.transport.requests
+        for code in fetched:
+            self.client.get_contest_problem('CON001', code)
+        self.assertEqual(self.transport.requests, sent)
+        self.assertEqual(warmup.warm(), [])
+
+    def test_learns_the_end_without_end_date_field(self):
+        warmup = ContestWarmup(self.client, 'CON001', fields=['code', 'problemsList'])
+        warmup.refresh_details()
+        self.assertIsNotNone(warmup.end)
+
+    def test_request_errors_do_not_stop_the_refresh(self):
+        details = self.client.get_contest_details
+        calls = []
+
+        def flaky(*args):
+            calls.append(1)
+            if len(calls) == 2:
+                raise requests.ConnectionError('reset')
+            return details(*args)
+        self.client.get_contest_details = flaky
+        warmup = ContestWarmup(self.client, 'CON001', refresh_interval=0.01, clock=lambda: datetime(2000, 1, 1))
+        thread = warmup.start()
+        time.sleep(0.2)
+        self.assertTrue(thread.is_alive())
+        warmup.stop(5)
+        self.assertFalse(thread.is_alive())
+        self.assertGreater(len(calls), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import threading
+import time
+import unittest
+
+from pycodechef import UserChange, Watcher
+from pycodechef.mock_server import MockTransport
+
+from .support import make_client
+
+
+class WatcherTest(unittest.TestCase):
+
+    def setUp(self):
+        self.transport = MockTransport()
+        self.client = make_client(self.transport)
+        self.bump = 0
+        profile = self.transport.api._profile
+
+        def bumped(username):
+            content = profile(username)
+            if username == 'user3':
+                content['ratings']['allContest'] += self.bump
+            return content
+        self.transport.api._profile = bumped
+
+    def test_poll_emits_changes(self):
+        watcher = Watcher(self.client, ['user3'])
+        received = []
+        watcher.subscribe(received.extend)
+        self.assertEqual(watcher.poll(('user', 'user3')), [])
+        self.bump = 50
+        changes = watcher.poll(('user', 'user3'))
+        self.assertEqual(len(changes), 1)
+        self.assertIsInstance(changes[0], UserChange)
+        self.assertEqual((changes[0].field, changes[0].new - changes[0].old), ('allContest', 50))
+        self.assertEqual(received, changes)
+
+    def test_run_survives_errors_and_stops(self):
+        get_contest_list = self.client.get_contest_list
+        failures = []
+
+        def flaky(*args, **kwargs):
+            if not failures:
+                failures.append(1)
+                raise ConnectionError('down')
+            return get_contest_list(*args, **kwargs)
+        self.client.get_contest_list = flaky
+        watcher = Watcher(self.client, ['user{}'.format(i) for i in range(20)], hot_interval=0.01, idle_interval=0.01,
+                          max_workers=4)
+        stop = threading.Event()
+        thread = threading.Thread(target=watcher.run, args=(stop,))
+        thread.start()
+        time.sleep(0.3)
+        cpu = time.process_time()
+        time.sleep(0.2)
+        busy = time.process_time() - cpu
+        stop.set()
+        thread.join(5)
+        self.assertFalse(thread.is_alive())
+        self.assertGreater(watcher.polls, 20)
+        self.assertEqual(watcher.errors, 1)
+        self.assertLess(busy, 0.19)
+
+
+if __name__ == '__main__':
+    unittest.main()